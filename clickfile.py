@@ -9,6 +9,7 @@ from multiprocessing.dummy import Pool
 
 import os
 import re
+import shlex
 import shutil
 import subprocess
 import sys
@@ -40,6 +41,7 @@ try:
     from deploy.cli.github_api_client import GithubClient
     from deploy.cli.network_manager import NetworkManager
     from deploy.cli import dapps as dapps_cli
+    from deploy.cli import contracts as contracts_cli
 
     from utils import create_allure_environment_opts, time_measure
     from deploy.cli import infrastructure
@@ -51,6 +53,7 @@ try:
     from utils.prices import get_sol_price_with_retry
     from utils.helpers import wait_condition
     from utils.apiclient import JsonRPCSession
+    from utils.tx_corpus import generate_corpus
 except ImportError:
     print("Please run ./clickfile.py requirements to install all requirements")
 
@@ -529,6 +532,13 @@ def update_contracts(branch):
     # subprocess.check_call(f'npm ci --prefix {EXTERNAL_CONTRACT_PATH / "neon-contracts" / "ERC20ForSPL"}', shell=True)
 
 
+@cli.command(name="compile-contracts", help="Compile all contracts used by tests into ABI/bytecode bundle")
+@click.option("-j", "--jobs", type=int, help="Number of compiler processes [default: CPU count]")
+@catch_traceback
+def compile_contracts(jobs):
+    contracts_cli.build_contracts_bundle(jobs)
+
+
 @cli.command(help="Run any type of tests")
 @click.option("-n", "--network", type=click.Choice(EnvName),
               help="In which stand run tests")
@@ -598,6 +608,8 @@ def run(
         command = "py.test integration/tests/neon_evm"
         if numprocesses:
             command = f"{command} --numprocesses {numprocesses}"
+    elif name == "utils":
+        command = "py.test utils/tests"
     elif name == "oz":
         if not keep_error_log:
             error_log.clear()
@@ -787,30 +799,97 @@ def locust(ctx):
     help="NEON RPC entry point.",
     show_default=True,
 )
-def run(credentials, host, users, spawn_rate, run_time, tag, web_ui, locustfile, neon_rpc):
+@click.option(
+    "--arrival-rate",
+    type=float,
+    help="Open-loop mode for `proxy`: send this many transactions per second regardless of receipts, "
+         "users share the rate",
+)
+@click.option(
+    "--max-in-flight",
+    type=int,
+    help="Open-loop mode: max transactions waiting for receipts, later arrivals are counted as backlog",
+)
+@click.option(
+    "--corpus",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Replay pre-signed transactions from `./clickfile.py locust corpus` for `proxy`, "
+         "with --arrival-rate they are sent in open-loop mode",
+)
+@click.option(
+    "--workers",
+    type=int,
+    help="Distributed mode: run a master and this many local worker processes, 0 for one worker per CPU core",
+)
+def run(
+    credentials,
+    host,
+    users,
+    spawn_rate,
+    run_time,
+    tag,
+    web_ui,
+    locustfile,
+    neon_rpc,
+    arrival_rate,
+    max_in_flight,
+    corpus,
+    workers,
+):
     """Run `Neon` pipeline performance test
 
     path it's sub-folder and file name  `loadtesting/locustfile.py`.
     """
     base_path = Path(__file__).parent
     path = base_path / f"loadtesting/{locustfile}/locustfile.py"
+    if arrival_rate:
+        if locustfile != "proxy":
+            raise click.BadParameter("open-loop mode is supported for the `proxy` load test only", param_hint="-f")
+        path = base_path / "loadtesting/proxy/tests/open_loop.py"
+    elif corpus:
+        if locustfile != "proxy":
+            raise click.BadParameter("corpus replay is supported for the `proxy` load test only", param_hint="-f")
+        path = base_path / "loadtesting/proxy/tests/replay.py"
     if not (path.exists() and path.is_file()):
         raise FileNotFoundError(f"path doe's not exists. {path.resolve()}")
-    command = f"locust -f {path.as_posix()} --host={host} --users={users} --spawn-rate={spawn_rate}"
+    command = f"locust -f {path.as_posix()} --host={host}"
     if credentials:
         command += f" --credentials={credentials}"
     elif locustfile == "tracerapi":
         command += f" --credentials={base_path.absolute()}/loadtesting/tracerapi/envs.json"
-    if run_time:
-        command += f" --run-time={run_time}"
     if neon_rpc and locustfile == "tracerapi":
         command += f" --neon-rpc={neon_rpc}"
     if tag:
         command += f" --tags {' '.join(tag)}"
+    if arrival_rate:
+        command += f" --arrival-rate={arrival_rate}"
+    if max_in_flight:
+        command += f" --max-in-flight={max_in_flight}"
+    if corpus:
+        command += f" --corpus={Path(corpus).absolute()}"
+    # workers refuse --run-time, so it goes to the master only together with --headless and the users, the master
+    # sends workers their share of users
+    master_options = f" --users={users} --spawn-rate={spawn_rate}"
+    if run_time:
+        master_options += f" --run-time={run_time}"
     if not web_ui:
-        command += f" --headless"
+        master_options += f" --headless"
 
-    cmd = subprocess.run(command, shell=True)
+    if workers is None:
+        cmd = subprocess.run(command + master_options, shell=True)
+    else:
+        workers = workers or os.cpu_count()
+        worker_processes = [
+            subprocess.Popen(shlex.split(f"{command} --worker --master-host=127.0.0.1")) for _ in range(workers)
+        ]
+        try:
+            cmd = subprocess.run(f"{command} --master --expect-workers={workers}{master_options}", shell=True)
+        finally:
+            for process in worker_processes:
+                try:
+                    process.wait(timeout=30)
+                except subprocess.TimeoutExpired:
+                    process.terminate()
 
     if cmd.returncode != 0:
         sys.exit(cmd.returncode)
@@ -849,6 +928,22 @@ def prepare(credentials, host, users, spawn_rate, run_time, tag):
         sys.exit(cmd.returncode)
 
 
+@locust.command("corpus", help="Generate a corpus of pre-signed transactions for `proxy` load tests")
+@click.option("-n", "--network", default="night-stand", type=str, help="In which stand run tests")
+@click.option("-o", "--output", default="tx_corpus.bin", type=click.Path(dir_okay=False), show_default=True)
+@click.option("-a", "--accounts", default=20, help="How many sender accounts", show_default=True)
+@click.option("-p", "--per-account", default=1000, help="How many transactions of every sender", show_default=True)
+@click.option("-k", "--kind", type=click.Choice(["neon", "erc20"]), default="neon", show_default=True)
+def corpus(network, output, accounts, per_account, kind):
+    """Signed transactions are replayed by `./clickfile.py locust run --corpus`, nonces start from the
+    current ones of the senders, so a corpus can be replayed only once"""
+    network_object = network_manager.get_network_object(network)
+    web3_client = NeonChainWeb3Client(proxy_url=network_object["proxy_url"])
+    faucet = Faucet(faucet_url=network_object["faucet_url"], web3_client=web3_client)
+    count = generate_corpus(web3_client, faucet, output, accounts=accounts, per_account=per_account, kind=kind)
+    print(f"{count} transactions are saved to {output}")
+
+
 @cli.group("allure")
 @click.pass_context
 def allure_cli(ctx):
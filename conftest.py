@@ -18,8 +18,10 @@ from clickfile import TEST_GROUPS, EnvName
 from utils.types import TestGroup
 from utils.error_log import error_log
 from utils import create_allure_environment_opts, setup_logging
+from utils.helpers import get_poll_stats, merge_poll_stats
 from utils.faucet import Faucet
 from utils.accounts import EthAccounts
+from utils.account_pool import AccountPool
 from utils.web3client import NeonChainWeb3Client
 from utils.solana_client import SolanaClient
 
@@ -76,6 +78,12 @@ def pytest_addoption(parser: Parser):
     )
 
     parser.addoption("--envs", action="store", default="envs.json", help="Filename with environments")
+    parser.addoption(
+        "--account-pool-size",
+        type=int,
+        default=0,
+        help="Lease default accounts from a pool shared by xdist workers, refilled by this many accounts at once",
+    )
     parser.addoption(
         "--keep-error-log",
         action="store_true",
@@ -93,6 +101,45 @@ def pytest_sessionstart(session: pytest.Session):
     if COST_REPORT_DIR != pathlib.Path() and COST_REPORT_DIR.exists() and COST_REPORT_DIR.is_dir():
         shutil.rmtree(COST_REPORT_DIR)
 
+    if session.config.getoption("--account-pool-size") and "PYTEST_XDIST_WORKER" not in os.environ:
+        # accounts leased by the previous run are spent and swept at the end of this one, free ones are reused
+        AccountPool(NeonChainWeb3Client(session.config.environment.proxy_url), faucet=None).reset_leases()
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    """Sweep the account pool and show where tests spent time waiting in wait_condition"""
+    if session.config.getoption("--account-pool-size") and "PYTEST_XDIST_WORKER" not in os.environ:
+        sweep_account_pool(session.config)
+
+    if hasattr(session.config, "workeroutput"):
+        # xdist worker, the controller merges the stats in pytest_testnodedown and prints them
+        session.config.workeroutput["poll_stats"] = dict(get_poll_stats())
+        return
+    poll_stats = get_poll_stats(top=10)
+    if poll_stats:
+        print("\nwait_condition call sites by total wait time:")
+        for call_site, stats in poll_stats:
+            print(
+                f"  {call_site}: {stats['seconds']:.1f}s, {stats['calls']} calls, "
+                f"{stats['polls']} polls, {stats['timeouts']} timeouts"
+            )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    merge_poll_stats(getattr(node, "workeroutput", {}).get("poll_stats", {}))
+
+
+def sweep_account_pool(config: Config) -> None:
+    """Send balances of spent pool accounts to the bank account, without it they stay for the next run"""
+    bank_key = config.environment.eth_bank_account
+    if config.getoption("--network") == "mainnet":
+        bank_key = os.environ.get("ETH_BANK_PRIVATE_KEY_MAINNET")
+    if not bank_key:
+        return
+    web3_client = NeonChainWeb3Client(config.environment.proxy_url)
+    AccountPool(web3_client, faucet=None).sweep(web3_client.eth.account.from_key(bank_key))
+
 
 def pytest_runtest_protocol(item: Item, nextitem):
     ihook = item.ihook
@@ -252,5 +299,9 @@ def faucet(pytestconfig: Config, web3_client_session) -> Faucet:
 
 @pytest.fixture(scope="session")
 def accounts_session(pytestconfig: Config, web3_client_session, faucet, eth_bank_account):
-    accounts = EthAccounts(web3_client_session, faucet, eth_bank_account)
+    pool = None
+    pool_size = pytestconfig.getoption("--account-pool-size")
+    if pool_size:
+        pool = AccountPool(web3_client_session, faucet, eth_bank_account, refill_size=pool_size)
+    accounts = EthAccounts(web3_client_session, faucet, eth_bank_account, pool=pool)
     return accounts
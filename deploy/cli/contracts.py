@@ -0,0 +1,93 @@
+import datetime
+import importlib.metadata
+import pathlib
+import typing as tp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.compilation_cache import compilation_cache, contracts_bundle, contracts_manifest
+
+
+CONTRACTS_DIR = pathlib.Path("contracts")
+VYPER_CONTRACTS_DIR = CONTRACTS_DIR / "vyper"
+NEON_EVM_CONTRACTS_DIR = CONTRACTS_DIR / "neon_evm"
+NEON_EVM_DEFAULT_VERSION = "0.7.6"
+
+
+def referenced_contracts() -> tp.List[tp.Tuple[pathlib.Path, str, tp.Dict[str, str]]]:
+    """(contract, solc version, import remappings) of contracts compiled by test runs
+
+    The list comes from the contracts manifest which compile_contract fills on every call, contracts from
+    contracts/neon_evm are added with the get_contract_bin default version.
+    """
+    contracts = {}
+    for entry in contracts_manifest.read():
+        contract_path = pathlib.Path(entry["contract"])
+        if not contract_path.is_file():
+            print(f"Skip {contract_path} from {contracts_manifest.path}, the file doesn't exist")
+            continue
+        key = (str(contract_path.resolve()), entry["version"], tuple(sorted(entry["remappings"].items())))
+        contracts[key] = (contract_path.resolve(), entry["version"], entry["remappings"])
+
+    for contract_path in NEON_EVM_CONTRACTS_DIR.glob("*.sol"):
+        key = (str(contract_path.resolve()), NEON_EVM_DEFAULT_VERSION, ())
+        contracts.setdefault(key, (contract_path.resolve(), NEON_EVM_DEFAULT_VERSION, {}))
+    return [contracts[key] for key in sorted(contracts)]
+
+
+def compile_solc_contract(
+    contract_path: pathlib.Path, version: str, import_remapping: tp.Dict[str, str]
+) -> tp.Tuple[str, dict]:
+    from utils.helpers import compile_contract
+
+    import_remapping = import_remapping or None
+    key = compilation_cache.make_key(contract_path, version, import_remapping=import_remapping, optimize=True)
+    return key, compile_contract(contract_path, version, import_remapping=import_remapping)
+
+
+def compile_vyper_contract(contract_path: pathlib.Path) -> tp.Tuple[str, dict]:
+    import vyper
+
+    key = compilation_cache.make_vyper_key(contract_path)
+    interface = vyper.compile_code(contract_path.read_text(), output_formats=["abi", "bytecode"])
+    return key, interface
+
+
+def build_contracts_bundle(jobs: tp.Optional[int] = None) -> dict:
+    solc_contracts = referenced_contracts()
+    vyper_contracts = sorted(VYPER_CONTRACTS_DIR.glob("*.vy"))
+    if not contracts_manifest.read():
+        print(f"{contracts_manifest.path} is empty, only contracts/neon_evm is compiled; run tests once to fill it")
+    print(f"Compile {len(solc_contracts)} solidity contract/version pairs and {len(vyper_contracts)} vyper contracts")
+
+    bundle = {"solc": {}, "vyper": {}, "metadata": {}}
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(compile_solc_contract, path, version, remappings): ("solc", path, version)
+            for path, version, remappings in solc_contracts
+        }
+        futures.update(
+            {
+                executor.submit(compile_vyper_contract, path): ("vyper", path, importlib.metadata.version("vyper"))
+                for path in vyper_contracts
+            }
+        )
+        for future in as_completed(futures):
+            compiler, path, version = futures[future]
+            try:
+                key, compiled = future.result()
+            except Exception as e:
+                print(f"Can't compile {path} with {compiler} {version}: {e}")
+                failed.append(f"{path}@{version}")
+                continue
+            bundle[compiler][key] = compiled
+
+    bundle["metadata"] = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "solc_contracts": len(bundle["solc"]),
+        "vyper_contracts": len(bundle["vyper"]),
+        "failed": failed,
+    }
+    contracts_bundle.save(bundle)
+    print(f"Contracts bundle saved to {contracts_bundle.path}: {bundle['metadata']}")
+    return bundle
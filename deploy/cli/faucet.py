@@ -1,19 +1,18 @@
 from utils import web3client
 from utils import faucet
+from utils.funding import create_funded_accounts, fund_accounts
 
 
 def prepare_wallets_with_balance(settings, count=8, airdrop_amount=20000):
     print(f"Preparing {count} wallets with balances")
     web3_client = web3client.NeonChainWeb3Client(settings["proxy_url"])
     faucet_client = faucet.Faucet(settings["faucet_url"], web3_client)
-    private_keys = []
 
-    for i in range(count):
-        acc = web3_client.eth.account.create()
-        faucet_client.request_neon(acc.address, airdrop_amount)
-        if i == 0:
-            for _ in range(2):
-                faucet_client.request_neon(acc.address, airdrop_amount)
-        private_keys.append(acc.key.hex())
+    accounts = create_funded_accounts(web3_client, count, airdrop_amount, faucet=faucet_client)
+    if accounts:
+        # the first wallet gets three airdrops, one request is limited by the faucet
+        for _ in range(2):
+            fund_accounts(web3_client, [accounts[0].address], airdrop_amount, faucet=faucet_client)
+    private_keys = [acc.key.hex() for acc in accounts]
     print("All private keys: ", ",".join(private_keys))
     return private_keys
\ No newline at end of file
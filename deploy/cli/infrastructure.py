@@ -16,6 +16,7 @@ from solana.transaction import Signature
 from deploy.cli import faucet as faucet_cli
 from utils.web3client import NeonChainWeb3Client
 from utils.solana_client import SolanaClient
+from utils.solana_logs import parse_logs
 from python_terraform import Terraform
 
 
@@ -185,11 +186,8 @@ def get_solana_accounts_transactions_compute_units(eth_transaction):
             click.echo(f"WARNING: no log messages in transaction {solana_transaction_hash}: {solana_transaction}")
             continue
 
-        for message in log_messages[::-1]:
-            match = re.match(r'^.+consumed (\d+) of \d+ compute units$', message)
-            if match:
-                compute_units += int(match.group(1))
-                break
+        # the last "consumed" line as before, not the sum of all top level instructions
+        compute_units += parse_logs(log_messages).last_consumed or 0
 
     if tr.value.transaction.transaction.message.address_table_lookups:
         alt = tr.value.transaction.transaction.message.address_table_lookups
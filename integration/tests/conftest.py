@@ -161,6 +161,7 @@ def accounts(request, accounts_session, web3_client_session, pytestconfig: Confi
             for item in accounts_session.accounts_collector:
                 with allure.step(f"Restoring eth account balance from {item.key.hex()} account"):
                     web3_client_session.send_all_neons(item, eth_bank_account)
+    accounts_session.release_leased()
     accounts_session._accounts = []
 
 
@@ -184,7 +185,7 @@ def erc20_spl(
         solana_account=solana_account,
         mintable=False,
         bank_account=eth_bank_account,
-        account=accounts_session[0],
+        account=accounts_session.session_account(),
         evm_loader_id=pytestconfig.environment.evm_loader,
     )
     erc20.token_mint.approve(
@@ -206,7 +207,10 @@ def erc20_spl(
 @pytest.fixture(scope="session")
 def erc20_simple(web3_client_session, faucet, accounts_session, eth_bank_account):
     erc20 = ERC20(
-        web3_client=web3_client_session, faucet=faucet, bank_account=eth_bank_account, owner=accounts_session[0]
+        web3_client=web3_client_session,
+        faucet=faucet,
+        bank_account=eth_bank_account,
+        owner=accounts_session.session_account(),
     )
     yield erc20
 
@@ -230,7 +234,7 @@ def erc20_spl_mintable(
         solana_account=solana_account,
         mintable=True,
         bank_account=eth_bank_account,
-        account=accounts_session[0],
+        account=accounts_session.session_account(),
     )
     erc20.mint_tokens(erc20.account, erc20.account.address)
     yield erc20
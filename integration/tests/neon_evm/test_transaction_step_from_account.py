@@ -626,7 +626,7 @@ class TestAccountStepContractCallContractInteractions:
             additional_accounts.append(Pubkey.from_string(acc["pubkey"]))
 
         resp = evm_loader.execute_transaction_steps_from_account(
-            operator_keypair, treasury_pool, holder_acc, additional_accounts
+            operator_keypair, treasury_pool, holder_acc, additional_accounts, total_steps=result["steps_executed"]
         )
 
         check_holder_account_tag(holder_acc, FINALIZED_STORAGE_ACCOUNT_INFO_LAYOUT, TAG_FINALIZED_STATE)
@@ -641,7 +641,12 @@ class TestInstructionStepContractCallContractInteractions:
             additional_accounts.append(Pubkey.from_string(acc["pubkey"]))
 
         resp = evm_loader.execute_transaction_steps_from_instruction(
-            operator_keypair, treasury_pool, holder_acc, signed_tx, additional_accounts
+            operator_keypair,
+            treasury_pool,
+            holder_acc,
+            signed_tx,
+            additional_accounts,
+            total_steps=result["steps_executed"],
         )
 
         check_holder_account_tag(holder_acc, FINALIZED_STORAGE_ACCOUNT_INFO_LAYOUT, TAG_FINALIZED_STATE)
@@ -2,13 +2,13 @@ import typing as tp
 import pathlib
 
 import eth_abi
-import solcx
 from eth_account.datastructures import SignedTransaction
 from eth_utils import abi
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 
 from utils.evm_loader import EvmLoader
+from utils.helpers import compile_contract
 from utils.types import Caller, TreasuryPool, Contract
 from .constants import NEON_CORE_API_URL
 from .neon_api_client import NeonApiClient
@@ -16,7 +16,6 @@ from .transaction_checks import check_transaction_logs_have_text
 
 from .storage import create_holder
 from .ethereum import create_contract_address, make_eth_transaction
-from semantic_version import Version
 
 from web3.auto import w3
 
@@ -34,21 +33,13 @@ def get_contract_bin(
         else:
             contract_name = contract.rsplit(".", 1)[0]
 
-    solcx.install_solc(version)
-
     contract_path = (pathlib.Path.cwd() / "contracts" / "neon_evm" / contract).absolute()
     if not contract_path.exists():
         contract_path = (pathlib.Path.cwd() / "contracts" / f"{contract}").absolute()
 
     assert contract_path.exists(), f"Can't found contract: {contract_path}"
 
-    compiled = solcx.compile_files(
-        [contract_path],
-        output_values=["abi", "bin"],
-        solc_version=Version(version),
-        allow_paths=["."],
-        optimize=True,
-    )
+    compiled = compile_contract(contract_path, version)
     contract_abi = None
     for key in compiled.keys():
         if contract_name == key.rsplit(":")[-1]:
@@ -162,6 +153,8 @@ def deploy_contract(
     )
     evm_loader.write_transaction_to_holder_account(signed_tx, holder_acc, operator)
 
-    resp = evm_loader.execute_transaction_steps_from_account(operator, treasury_pool, holder_acc, additional_accounts)
+    resp = evm_loader.execute_transaction_steps_from_account(
+        operator, treasury_pool, holder_acc, additional_accounts, total_steps=emulate_result["steps_executed"]
+    )
     check_transaction_logs_have_text(resp, "exit_status=0x12")
     return contract
@@ -1,8 +1,8 @@
 import eth_abi
-import requests
 from eth_utils import abi
 
 from utils.evm_loader import CHAIN_ID
+from utils.http_session import get_shared_session
 from utils.types import Caller, Contract
 
 
@@ -10,6 +10,7 @@ class NeonApiClient:
     def __init__(self, url):
         self.url = url
         self.headers = {"Content-Type": "application/json"}
+        self.session = get_shared_session()
 
     def emulate(self, sender, contract, data=bytes(), chain_id=CHAIN_ID, value='0x0', max_steps_to_execute=500000, provide_account_info=None):
         if isinstance(data, bytes):
@@ -26,7 +27,7 @@ class NeonApiClient:
             "accounts": [],
             "provide_account_info": provide_account_info
         }
-        resp = requests.post(url=f"{self.url}/emulate", json=body, headers=self.headers)
+        resp = self.session.post(url=f"{self.url}/emulate", json=body, headers=self.headers)
         if resp.status_code == 200:
             return resp.json()["value"]
         else:
@@ -49,12 +50,12 @@ class NeonApiClient:
             "contract": contract_id,
             "index": index
         }
-        return requests.post(url=f"{self.url}/storage", json=body, headers=self.headers).json()
+        return self.session.post(url=f"{self.url}/storage", json=body, headers=self.headers).json()
 
 
     def get_holder(self, public_key):
         body = {"pubkey": f"{public_key}"}
-        return requests.post(url=f"{self.url}/holder", json=body, headers=self.headers).json()
+        return self.session.post(url=f"{self.url}/holder", json=body, headers=self.headers).json()
 
     def get_balance(self, ether, chain_id = CHAIN_ID):
         body = {
@@ -62,7 +63,7 @@ class NeonApiClient:
                 { "address": ether, "chain_id": chain_id }
             ]
         }
-        return requests.post(url=f"{self.url}/balance", json=body, headers=self.headers).json()
+        return self.session.post(url=f"{self.url}/balance", json=body, headers=self.headers).json()
 
     def call_contract_get_function(self, sender, contract, function_signature: str, args=None):
         data = abi.function_signature_to_4byte_selector(function_signature)
@@ -1,12 +1,12 @@
-import requests
-
 from utils.evm_loader import CHAIN_ID
+from utils.http_session import get_shared_session
 
 
 class NeonApiRpcClient:
     def __init__(self, url):
         self.url = url
         self.headers = {"Content-Type": "application/json"}
+        self.session = get_shared_session()
 
     def post(self, method, params):
         body = {
@@ -15,7 +15,7 @@ class NeonApiRpcClient:
             "method": method,
             "params": [params],
         }
-        resp = requests.post(url=f"{self.url}", json=body, headers=self.headers).json()
+        resp = self.session.post(url=f"{self.url}", json=body, headers=self.headers).json()
         if "result" in resp:
             return resp['result']
         else:
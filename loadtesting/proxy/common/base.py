@@ -1,4 +1,5 @@
 import os
+import inspect
 import json
 import logging
 import time
@@ -10,23 +11,55 @@ import web3.types
 import requests
 import gevent
 from eth_account.signers.local import LocalAccount
+from hexbytes import HexBytes
 from gevent.pool import Pool
 from locust import TaskSet, events, env
 
 from utils import helpers
 from utils.faucet import Faucet
+from utils.fee_oracle import FeeOracle
+from utils.http_session import make_session
+from utils.nonce_manager import nonce_manager
+from utils.receipt_watcher import ReceiptWatcher
 from utils.web3client import NeonChainWeb3Client
 
+from .distributed import process_users
 from .events import statistics_collector, save_transaction
+from .latency import TransactionTracer
 
 LOG = logging.getLogger(__name__)
 
+# gas price and base fee are served from memory for this many seconds
+FEE_CACHE_TTL = float(os.environ.get("NEON_FEE_CACHE_TTL", 5))
+# and refreshed in the background this often, so users don't wait for fee requests
+FEE_REFRESH_INTERVAL = float(os.environ.get("NEON_FEE_REFRESH_INTERVAL", FEE_CACHE_TTL))
+
+# share of successful calls reported to locust statistics
+METRICS_SAMPLE_RATE = float(os.environ.get("NEON_METRICS_SAMPLE_RATE", 1))
+SAVE_TRANSACTIONS = "SAVE_TRANSACTIONS" in os.environ
+METRICS_IGNORE_LIST = frozenset(
+    [
+        "create_account",
+        "_send_transaction",
+        "_send_raw_transaction",
+        "_sign_and_send",
+        "allocate_nonce",
+        "_wait_receipt",
+    ]
+)
+
 saved_transactions = []
 
+# one watcher for all users of the process checks pending receipts with a batch request
+receipt_watcher: tp.Optional[ReceiptWatcher] = None
+transaction_tracer: tp.Optional[TransactionTracer] = None
+# one fee cache for all users of the process
+fee_oracle: tp.Optional[FeeOracle] = None
+
 
 @events.test_stop.add_listener
 def save_transactions_list(environment: env.Environment, **kwargs):
-    if "SAVE_TRANSACTIONS" in os.environ:
+    if SAVE_TRANSACTIONS:
         web3_client = NeonWeb3ClientExt(
             environment.credentials["proxy_url"])
 
@@ -54,28 +87,43 @@ def save_transactions_list(environment: env.Environment, **kwargs):
 
 def init_session(size: int = 1000) -> requests.Session:
     """init request session with extended connection pool size"""
-    adapter = requests.adapters.HTTPAdapter(
-        pool_connections=size, pool_maxsize=size, pool_block=True)
-    session = requests.Session()
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    return session
+    # error statuses are not retried, they show proxy overload in statistics
+    return make_session(pool_size=size, pool_block=True, status_forcelist=())
 
 
 class NeonWeb3ClientExt(NeonChainWeb3Client):
-    """Extends Neon Web3 client adds statistics metrics"""
+    """Extends Neon Web3 client adds statistics metrics
+
+    Methods are wrapped on the first access and the wrappers are cached per client.
+    """
 
     def __getattribute__(self, item):
-        ignore_list = ["create_account", "_send_transaction"]
+        if item.startswith("__"):
+            return object.__getattribute__(self, item)
+        wrappers = object.__getattribute__(self, "__dict__").setdefault("_metrics_wrappers", {})
+        wrapped = wrappers.get(item)
+        if wrapped is not None:
+            return wrapped
         try:
             attr = object.__getattribute__(self, item)
         except AttributeError:
             attr = super(NeonWeb3ClientExt, self).__getattr__(item)
-        if callable(attr) and item not in ignore_list:
-            attr = statistics_collector()(attr)
-            if "SAVE_TRANSACTIONS" in os.environ:
-                attr = save_transaction(saved_transactions)(attr)
-        return attr
+        if not callable(attr) or item in METRICS_IGNORE_LIST:
+            return attr
+        wrapped = statistics_collector(sample_rate=METRICS_SAMPLE_RATE)(attr)
+        if SAVE_TRANSACTIONS:
+            wrapped = save_transaction(saved_transactions)(wrapped)
+        if inspect.ismethod(attr) and attr.__self__ is self:
+            # bound methods don't change, other callables are wrapped on every access as they may be replaced
+            wrappers[item] = wrapped
+        return wrapped
+
+    def _send_raw_transaction(self, address, raw_transaction: bytes) -> HexBytes:
+        started = time.perf_counter()
+        tx_hash = super()._send_raw_transaction(address, raw_transaction)
+        if transaction_tracer is not None:
+            transaction_tracer.sent(tx_hash, started)
+        return tx_hash
 
 
 class NeonProxyTasksSet(TaskSet):
@@ -103,14 +151,27 @@ class NeonProxyTasksSet(TaskSet):
     def on_start(self) -> None:
         """on_start is called when a Locust start before any task is scheduled"""
         # setup class once
-        session = init_session(
-            int(self.user.environment.parsed_options.num_users or self.user.environment.runner.target_user_count) * 100
-        )
+        session = init_session(process_users(self.user.environment) * 100)
         self.credentials = self.user.environment.credentials
         LOG.info(f"Create web3 client to: {self.credentials['proxy_url']}")
+        global receipt_watcher, transaction_tracer, fee_oracle
+        # plain clients, so batch polls of the watcher, fee refreshes and the tracer's own requests don't get
+        # into statistics
+        if fee_oracle is None:
+            fee_client = NeonChainWeb3Client(self.credentials["proxy_url"], session=session)
+            fee_oracle = fee_client.create_fee_oracle(FEE_CACHE_TTL, refresh_interval=FEE_REFRESH_INTERVAL)
         self.web3_client = NeonWeb3ClientExt(
-            self.credentials["proxy_url"]
+            self.credentials["proxy_url"], session=session, nonce_manager=nonce_manager, fee_oracle=fee_oracle
         )
+        if transaction_tracer is None:
+            transaction_tracer = TransactionTracer(NeonChainWeb3Client(self.credentials["proxy_url"], session=session))
+        if receipt_watcher is None:
+            # the tracer gets receipts from the watcher, so pipelined waits and watch futures are traced too
+            receipt_watcher = ReceiptWatcher(
+                NeonChainWeb3Client(self.credentials["proxy_url"], session=session),
+                on_receipt=transaction_tracer.received,
+            )
+        self.web3_client.enable_receipt_watcher(receipt_watcher)
         self.faucet = Faucet(
             self.credentials["faucet_url"], self.web3_client, session=session)
 
@@ -0,0 +1,156 @@
+"""Shared setup of distributed load tests
+
+Setup listeners decorated with setup_once deploy contracts and fund accounts on the master (or the single local
+process). Their results are sent to workers as a locust message before the workers get spawn messages, so a
+worker loads them instead of running the setup again.
+
+Workers don't get --users, the master sends the total number of users and workers in a locust message as well. A
+worker gets about users / workers of them, see process_users and utils.tx_corpus.user_slot.
+"""
+import functools
+import importlib
+import logging
+import typing as tp
+
+from eth_account.signers.local import LocalAccount
+from locust import events
+from locust.runners import MasterRunner, WorkerRunner
+from solana.rpc.api import Client
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from web3.contract import Contract
+
+from utils.faucet import Faucet
+from utils.solana_client import SolanaClient
+from utils.tx_corpus import worker_share
+from utils.web3client import NeonChainWeb3Client
+
+LOG = logging.getLogger(__name__)
+
+SETUP_MESSAGE = "neon_setup"
+USERS_MESSAGE = "neon_users"
+# objects of these packages are sent attribute by attribute, e.g. ERC20, ERC20Wrapper and spl Token
+SENT_OBJECT_PACKAGES = ("utils.", "spl.")
+
+
+def dump(value: tp.Any) -> tp.Any:
+    """Converts setup results to plain data which can be sent in a locust message"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [dump(item) for item in value]
+    if isinstance(value, dict):
+        return {"__dict__": [[dump(key), dump(item)] for key, item in value.items()]}
+    if isinstance(value, bytes):
+        return {"__bytes__": value.hex()}
+    if isinstance(value, LocalAccount):
+        return {"__account__": value.key.hex()}
+    if isinstance(value, Keypair):
+        return {"__keypair__": bytes(value).hex()}
+    if isinstance(value, Pubkey):
+        return {"__pubkey__": str(value)}
+    if isinstance(value, Contract):
+        return {"__contract__": value.address, "abi": value.abi}
+    # clients are not sent, workers use their own ones
+    if isinstance(value, NeonChainWeb3Client):
+        return {"__client__": "neon"}
+    if isinstance(value, Faucet):
+        return {"__client__": "faucet"}
+    if isinstance(value, Client):
+        return {"__client__": "solana"}
+    cls = type(value)
+    if cls.__module__.startswith(SENT_OBJECT_PACKAGES):
+        return {"__object__": f"{cls.__module__}:{cls.__qualname__}", "state": dump(vars(value))}
+    raise TypeError(f"Can't send {cls.__qualname__} to workers")
+
+
+class Loader:
+    """Restores setup results on a worker, clients are created once from the worker credentials"""
+
+    def __init__(self, credentials: tp.Dict[str, tp.Any]):
+        self.credentials = credentials
+
+    @functools.cached_property
+    def clients(self) -> tp.Dict[str, tp.Any]:
+        neon_client = NeonChainWeb3Client(self.credentials["proxy_url"])
+        return {
+            "neon": neon_client,
+            "faucet": Faucet(self.credentials["faucet_url"], neon_client),
+            "solana": SolanaClient(self.credentials["solana_url"]),
+        }
+
+    def load(self, value: tp.Any) -> tp.Any:
+        if isinstance(value, list):
+            return [self.load(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "__dict__" in value:
+            return {self.load(key): self.load(item) for key, item in value["__dict__"]}
+        if "__bytes__" in value:
+            return bytes.fromhex(value["__bytes__"])
+        if "__account__" in value:
+            return self.clients["neon"].eth.account.from_key(value["__account__"])
+        if "__keypair__" in value:
+            return Keypair.from_bytes(bytes.fromhex(value["__keypair__"]))
+        if "__pubkey__" in value:
+            return Pubkey.from_string(value["__pubkey__"])
+        if "__contract__" in value:
+            return self.clients["neon"].eth.contract(address=value["__contract__"], abi=value["abi"])
+        if "__client__" in value:
+            return self.clients[value["__client__"]]
+        module, name = value["__object__"].split(":")
+        cls = getattr(importlib.import_module(module), name)
+        obj = cls.__new__(cls)
+        vars(obj).update(self.load(value["state"]))
+        return obj
+
+
+@events.init.add_listener
+def register_setup_message(environment, **kwargs):
+    if isinstance(environment.runner, WorkerRunner):
+        environment.setup_results = {}
+        environment.runner.register_message(SETUP_MESSAGE, on_setup_message)
+        environment.runner.register_message(USERS_MESSAGE, on_users_message)
+
+
+def on_setup_message(environment, msg, **kwargs):
+    LOG.info(f"Received setup results of {', '.join(msg.data)}")
+    environment.setup_results.update(msg.data)
+
+
+def on_users_message(environment, msg, **kwargs):
+    LOG.info(f"Worker {environment.runner.worker_index} of {msg.data['workers']}, {msg.data['users']} users in total")
+    environment.total_users = msg.data["users"]
+    environment.workers = msg.data["workers"]
+
+
+@events.test_start.add_listener
+def send_users(environment, **kwargs):
+    # test_start listeners of the master run before the spawn messages, so workers know the split of their users
+    if isinstance(environment.runner, MasterRunner):
+        data = {"users": total_users(environment), "workers": environment.runner.worker_count}
+        environment.runner.send_message(USERS_MESSAGE, data)
+
+
+def total_users(environment) -> int:
+    """Users of the whole test, on a worker they are known from the master"""
+    if isinstance(environment.runner, WorkerRunner):
+        if not hasattr(environment, "total_users"):
+            raise AssertionError("The number of users is not received from the master")
+        return environment.total_users
+    return max(int(environment.parsed_options.num_users or environment.runner.target_user_count or 1), 1)
+
+
+def worker_position(environment) -> tp.Tuple[int, int]:
+    """Index of this process among workers and the number of workers, (0, 1) without workers"""
+    if isinstance(environment.runner, WorkerRunner):
+        if not hasattr(environment, "workers"):
+            raise AssertionError("The number of workers is not received from the master")
+        return environment.runner.worker_index, environment.workers
+    return 0, 1
+
+
+def process_users(environment) -> int:
+    """Users of this process, a worker's share of the users of the test"""
+    _, workers = worker_position(environment)
+    return worker_share(total_users(environment), workers)
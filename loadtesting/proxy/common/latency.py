@@ -0,0 +1,116 @@
+import logging
+import os
+import random
+import threading
+import time
+import typing as tp
+
+import web3.types
+from hexbytes import HexBytes
+from locust import events
+
+
+LOG = logging.getLogger(__name__)
+
+# share of transactions followed to finalization and counted in solana transactions
+TRACE_SAMPLE_RATE = float(os.environ.get("NEON_TX_TRACE_SAMPLE_RATE", 0.1))
+# accepted transactions nobody waits a receipt for are forgotten after this many seconds
+ACCEPTED_TTL = 600
+ACCEPTED_PRUNE_SIZE = 10000
+
+SEND_TO_ACCEPT = "Tx send to accept"
+ACCEPT_TO_RECEIPT = "Tx accept to receipt"
+RECEIPT_TO_FINALIZED = "Tx receipt to finalized"
+SOLANA_TRANSACTIONS = "Solana trx per Neon trx"
+
+
+def report(request_type: str, response_time: float, response_length: int = 0, exception=None) -> None:
+    events.request.fire(
+        request_type=request_type,
+        name="",
+        response_time=response_time,
+        response_length=response_length,
+        response=None,
+        exception=exception,
+        context={},
+    )
+
+
+class TransactionTracer:
+    """Splits transaction latency into stages reported to locust as separate request types
+
+    send to accept is the eth_sendRawTransaction call, accept to receipt lasts until the receipt is returned.
+    For sampled transactions receipt to finalized waits for the finalized block and the number of solana
+    transactions is reported as the response length of the "Solana trx per Neon trx" request type.
+    """
+
+    def __init__(self, web3_client, sample_rate: float = TRACE_SAMPLE_RATE, poll_interval: float = 1.0):
+        self.web3_client = web3_client
+        self.sample_rate = sample_rate
+        self.poll_interval = poll_interval
+        # tx hash -> perf_counter when the proxy accepted the transaction
+        self._accepted: tp.Dict[str, float] = {}
+        # tx hash -> (block number, perf_counter when the receipt was returned)
+        self._finalizing: tp.Dict[str, tp.Tuple[int, float]] = {}
+        # transactions to count solana transactions for, the count is taken in the tracer thread
+        self._counting: tp.List[str] = []
+        self._lock = threading.Lock()
+        self._thread: tp.Optional[threading.Thread] = None
+
+    def sent(self, tx_hash: tp.Union[str, bytes], started: float) -> None:
+        accepted_at = time.perf_counter()
+        report(SEND_TO_ACCEPT, (accepted_at - started) * 1000)
+        with self._lock:
+            self._accepted[HexBytes(tx_hash).hex()] = accepted_at
+            if len(self._accepted) > ACCEPTED_PRUNE_SIZE:
+                expired = [tx for tx, at in self._accepted.items() if accepted_at - at > ACCEPTED_TTL]
+                for tx in expired:
+                    del self._accepted[tx]
+
+    def received(self, tx_hash: tp.Union[str, bytes], receipt: web3.types.TxReceipt) -> None:
+        received_at = time.perf_counter()
+        tx_hash = HexBytes(tx_hash).hex()
+        with self._lock:
+            accepted_at = self._accepted.pop(tx_hash, None)
+        if accepted_at is None:
+            return
+        report(ACCEPT_TO_RECEIPT, (received_at - accepted_at) * 1000)
+        if random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            self._finalizing[tx_hash] = (receipt["blockNumber"], received_at)
+            self._counting.append(tx_hash)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="transaction-tracer", daemon=True)
+                self._thread.start()
+
+    def _report_solana_transactions(self, tx_hash: str) -> None:
+        started = time.perf_counter()
+        try:
+            response = self.web3_client.get_solana_trx_by_neon(tx_hash)
+            report(SOLANA_TRANSACTIONS, (time.perf_counter() - started) * 1000, len(response["result"]))
+        except Exception as e:
+            report(SOLANA_TRANSACTIONS, (time.perf_counter() - started) * 1000, exception=e)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._finalizing and not self._counting:
+                    self._thread = None
+                    return
+            time.sleep(self.poll_interval)
+            with self._lock:
+                counting, self._counting = self._counting, []
+            for tx_hash in counting:
+                self._report_solana_transactions(tx_hash)
+            try:
+                finalized = self.web3_client.eth.get_block("finalized")["number"]
+            except Exception as e:
+                LOG.warning(f"Can't get the finalized block: {e}")
+                continue
+            now = time.perf_counter()
+            with self._lock:
+                done = [tx for tx, (block, _) in self._finalizing.items() if block <= finalized]
+                received = [self._finalizing.pop(tx)[1] for tx in done]
+            for received_at in received:
+                report(RECEIPT_TO_FINALIZED, (now - received_at) * 1000)
@@ -9,6 +9,7 @@ from utils.web3client import NeonChainWeb3Client
 from utils.faucet import Faucet
 
 from loadtesting.proxy.common.base import NeonProxyTasksSet
+from loadtesting.proxy.common.distributed import setup_once
 
 LOG = logging.getLogger(__name__)
 
@@ -78,10 +79,11 @@ class ERC20TasksSet(NeonProxyTasksSet):
                 {erc20.contract.address: recipient_contract}
             )
             tx_receipt["contract"] = {"address": erc20.contract.address}
-        return tx_receipt, self.web3_client.get_nonce(self.account)
+        return tx_receipt
 
 
 @events.test_start.add_listener
+@setup_once("erc20_one")
 def prepare_one_contract_for_erc20(environment: "locust.env.Environment", **kwargs):
     if (
         environment.parsed_options.exclude_tags
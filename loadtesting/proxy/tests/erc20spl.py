@@ -6,6 +6,7 @@ from locust import User, events, tag, task, env
 from solders.keypair import Keypair
 
 from loadtesting.proxy.common.base import NeonProxyTasksSet
+from loadtesting.proxy.common.distributed import setup_once
 from utils.erc20wrapper import ERC20Wrapper
 from utils.faucet import Faucet
 from utils.web3client import NeonChainWeb3Client
@@ -14,6 +15,7 @@ LOG = logging.getLogger(__name__)
 
 
 @events.test_start.add_listener
+@setup_once("erc20_one")
 def prepare_one_contract_for_erc20(environment: env.Environment, **kwargs):
     neon_client = NeonChainWeb3Client(environment.credentials["proxy_url"])
     faucet = Faucet(environment.credentials["faucet_url"], neon_client)
@@ -72,7 +74,7 @@ class ERC20SPLTasksSet(NeonProxyTasksSet):
         receipt = dict(receipt)
         receipt["contract"] = {"address": contract.contract.address}
 
-        return receipt, self.web3_client.get_nonce(self.account)
+        return receipt
 
 
 class ERC20User(User):
@@ -10,6 +10,7 @@ from utils.web3client import NeonChainWeb3Client
 from utils.faucet import Faucet
 
 from loadtesting.proxy.common.base import NeonProxyTasksSet
+from loadtesting.proxy.common.distributed import setup_once
 
 LOG = logging.getLogger(__name__)
 
@@ -20,6 +21,7 @@ ROUTER_ADDRESS = "0xafa9ba8282db9ee8c89a63c99b093a9843436767"
 
 
 @events.test_start.add_listener
+@setup_once("moraswap")
 def prepare_moraswap_contracts(environment: "locust.env.Environment", **kwargs):
     LOG.info("Prepare moraswap contracts")
     if environment.parsed_options.exclude_tags and "moraswap" in environment.parsed_options.exclude_tags:
@@ -92,7 +94,6 @@ class MoraswapTaskSet(NeonProxyTasksSet):
             ).build_transaction(
                 {
                     "from": self.account.address,
-                    "nonce": self.web3_client.get_nonce(self.account.address),
                     "gasPrice": self.web3_client.gas_price(),
                 }
             )
@@ -113,7 +114,6 @@ class MoraswapTaskSet(NeonProxyTasksSet):
         ).build_transaction(
             {
                 "from": self.account.address,
-                "nonce": self.web3_client.get_nonce(self.account.address),
                 "gasPrice": self.web3_client.gas_price(),
                 "value": web3.Web3.to_wei(1, "ether"),
             }
@@ -0,0 +1,193 @@
+"""Open-loop load: transactions are sent at a constant arrival rate regardless of how fast receipts come
+
+Transactions are signed ahead of time into a queue, so signing is out of the timed path. Every second the number
+of transactions waiting for receipts and the number of arrivals which are due but not sent yet are reported as
+the response length of the "Open loop in flight" and "Open loop backlog" request types.
+With --corpus the queue is fed from a pre-signed corpus instead of signing.
+
+A transaction the proxy doesn't accept leaves a nonce gap, so later queued transactions of its sender are dropped.
+Signed senders continue from the nonce of the chain with a fresh gas price, corpus senders leave the rotation.
+"""
+import logging
+import random
+import time
+import typing as tp
+
+import gevent
+import gevent.queue
+import web3
+from eth_account.signers.local import LocalAccount
+from locust import User, events, tag, task
+
+from loadtesting.proxy.common.base import NeonProxyTasksSet
+from loadtesting.proxy.common.distributed import total_users
+from loadtesting.proxy.common.latency import report
+from loadtesting.proxy.tests.replay import user_records
+from utils.funding import TRANSFER_GAS_MULTIPLIER, fund_accounts
+
+LOG = logging.getLogger(__name__)
+
+TRANSACTION = "Open loop transaction"
+IN_FLIGHT = "Open loop in flight"
+BACKLOG = "Open loop backlog"
+TRANSFER_VALUE = web3.Web3.to_wei(0.0001, "ether")
+
+
+@events.init_command_line_parser.add_listener
+def open_loop_arguments(parser):
+    parser.add_argument(
+        "--arrival-rate",
+        type=float,
+        default=10,
+        env_var="NEON_ARRIVAL_RATE",
+        help="Transactions per second sent by all open-loop users together",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=10000,
+        help="Max transactions waiting for receipts, later arrivals stay in the backlog",
+    )
+    parser.add_argument(
+        "--open-loop-accounts",
+        type=int,
+        default=20,
+        help="Sender accounts per open-loop user, transactions of one account go with sequential nonces",
+    )
+
+
+@tag("open_loop")
+class NeonOpenLoopTasksSet(NeonProxyTasksSet):
+    """Sends pre-signed NEON transfers at the arrival rate"""
+
+    def on_start(self) -> None:
+        super().on_start()
+        options = self.user.environment.parsed_options
+        # workers share the rate too, it is the rate of the whole test
+        self.rate = options.arrival_rate / total_users(self.user.environment)
+        self.max_in_flight = options.max_in_flight
+        # about two seconds of transactions are signed ahead
+        self.signed = gevent.queue.Queue(maxsize=max(int(self.rate * 2), 100))
+        self.in_flight = 0
+        self.backlog = 0
+        # queued transactions of an older generation of their sender are dropped
+        self.generations: tp.Dict[str, int] = {}
+        self.retired: tp.Set[str] = set()
+        self.from_corpus = bool(options.corpus)
+        self.exhausted = False
+        if options.corpus:
+            gevent.spawn(self._read_corpus, *user_records(self.user.environment))
+        else:
+            self.senders = [self.web3_client.create_account() for _ in range(options.open_loop_accounts)]
+            fund_accounts(self.web3_client, [account.address for account in self.senders], 1000, faucet=self.faucet)
+            self.recipients = [self.web3_client.create_account().address for _ in range(10)]
+            self.nonces = {account.address: 0 for account in self.senders}
+            self.gas_price = self.web3_client.gas_price()
+            # all transfers are alike, the gas is estimated once for the user
+            gas = self.web3_client.eth.estimate_gas(
+                {"from": self.senders[0].address, "to": self.recipients[0], "value": TRANSFER_VALUE}
+            )
+            self.transfer_gas = int(gas * TRANSFER_GAS_MULTIPLIER)
+            gevent.spawn(self._sign_ahead)
+        gevent.spawn(self._report_counters)
+
+    def _read_corpus(self, senders: tp.List[str], records: tp.Iterator[tp.Tuple[int, bytes]]) -> None:
+        for sender, raw in records:
+            self.signed.put((senders[sender], 0, raw))
+        LOG.info("Corpus is over, no more transactions to send")
+        self.exhausted = True
+
+    def _sign_ahead(self) -> None:
+        while True:
+            account = random.choice(self.senders)
+            generation = self.generations.get(account.address, 0)
+            transaction = {
+                "chainId": self.web3_client.chain_id,
+                "from": account.address,
+                "to": random.choice(self.recipients),
+                "value": TRANSFER_VALUE,
+                "gas": self.transfer_gas,
+                "gasPrice": self.gas_price,
+                "nonce": self.nonces[account.address],
+            }
+            self.nonces[account.address] += 1
+            raw = self.web3_client.eth.account.sign_transaction(transaction, account.key).rawTransaction
+            self.signed.put((account, generation, raw))
+
+    def _report_counters(self) -> None:
+        while not (self.exhausted and self.signed.empty() and self.in_flight == 0):
+            gevent.sleep(1)
+            report(IN_FLIGHT, 0, self.in_flight)
+            report(BACKLOG, 0, self.backlog)
+
+    def _resync(self, address: str) -> None:
+        """Drops queued transactions of the sender after a failed send"""
+        if self.from_corpus:
+            self.retired.add(address)
+            LOG.warning(f"Sender {address} leaves the rotation after a failed send")
+            return
+        # eth is not wrapped by metrics, these requests don't get into statistics
+        try:
+            nonce = self.web3_client.eth.get_transaction_count(address, "pending")
+            gas_price = self.web3_client.eth.gas_price
+        except Exception as e:
+            LOG.warning(f"Can't resync sender {address}: {e}")
+            return
+        # no switch between greenlets here, the signer sees the nonce and the generation together
+        self.nonces[address] = nonce
+        self.gas_price = gas_price
+        self.generations[address] = self.generations.get(address, 0) + 1
+
+    def _send(self, account: tp.Union[LocalAccount, str], raw: bytes) -> None:
+        address = account if isinstance(account, str) else account.address
+        started = time.perf_counter()
+        try:
+            # not the public methods, they are reported to statistics by themselves
+            try:
+                tx_hash = self.web3_client._send_raw_transaction(account, raw)  # noqa
+            except Exception:
+                self._resync(address)
+                raise
+            receipt = self.web3_client._wait_receipt(tx_hash)  # noqa
+            exception = None if receipt["status"] == 1 else AssertionError(f"Transaction failed: {receipt}")
+            report(TRANSACTION, (time.perf_counter() - started) * 1000, exception=exception)
+        except Exception as e:
+            report(TRANSACTION, (time.perf_counter() - started) * 1000, exception=e)
+        finally:
+            self.in_flight -= 1
+
+    def _is_stale(self, account: tp.Union[LocalAccount, str], generation: int) -> bool:
+        address = account if isinstance(account, str) else account.address
+        return address in self.retired or generation != self.generations.get(address, 0)
+
+    @task
+    def task_open_loop(self) -> None:
+        """Keeps sending at the arrival rate until the user or the corpus stops"""
+        started = time.monotonic()
+        sent = 0
+        while True:
+            if self.exhausted and self.signed.empty():
+                # no arrivals are due after the corpus is over, the user stops when the receipts come
+                self.backlog = 0
+                if self.in_flight == 0:
+                    LOG.info("Corpus is over, the user stops")
+                    self.user.stop()
+                    return
+                gevent.sleep(0.5)
+                continue
+            due = int((time.monotonic() - started) * self.rate) + 1
+            while sent < due and self.in_flight < self.max_in_flight and not self.signed.empty():
+                account, generation, raw = self.signed.get()
+                if self._is_stale(account, generation):
+                    continue
+                self.in_flight += 1
+                gevent.spawn(self._send, account, raw)
+                sent += 1
+            self.backlog = due - sent
+            wait = max(started + due / self.rate - time.monotonic(), 0)
+            # with a backlog check the capacity and the queue more often than arrivals come
+            gevent.sleep(min(wait, 0.05) if self.backlog else wait)
+
+
+class NeonOpenLoopUser(User):
+    tasks = {NeonOpenLoopTasksSet: 1}
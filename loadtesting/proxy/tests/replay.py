@@ -0,0 +1,67 @@
+import itertools
+import logging
+import typing as tp
+
+from locust import User, events, tag, task
+
+from loadtesting.proxy.common.base import NeonProxyTasksSet
+from loadtesting.proxy.common.distributed import total_users, worker_position
+from utils.tx_corpus import iter_corpus, read_header, user_slot
+
+LOG = logging.getLogger(__name__)
+
+# slots split corpus senders between users, so nonces of a sender go from one user in order
+_user_slots = itertools.count()
+
+
+@events.init_command_line_parser.add_listener
+def corpus_arguments(parser):
+    parser.add_argument(
+        "--corpus",
+        type=str,
+        env_var="NEON_TX_CORPUS",
+        default="",
+        help="Pre-signed transactions corpus made by `./clickfile.py locust corpus`",
+    )
+
+
+def user_records(environment) -> tp.Tuple[tp.List[str], tp.Iterator[tp.Tuple[int, bytes]]]:
+    """Sender addresses of the corpus and records of the senders which belong to the next user
+
+    Senders of a slot no user takes, when a worker gets fewer users than its share, are not replayed.
+    """
+    path = environment.parsed_options.corpus
+    header = read_header(path)
+    users = total_users(environment)
+    if len(header["senders"]) < users:
+        raise AssertionError(f"Corpus {path} has {len(header['senders'])} senders for {users} users")
+    worker_index, workers = worker_position(environment)
+    slot, slots = user_slot(next(_user_slots), worker_index, users, workers)
+    senders = {index for index in range(len(header["senders"])) if index % slots == slot}
+    if not senders:
+        LOG.warning(f"Corpus {path} has no senders for slot {slot} of {slots}")
+    return header["senders"], iter_corpus(path, senders)
+
+
+@tag("replay")
+class NeonReplayTasksSet(NeonProxyTasksSet):
+    """Sends transactions from a pre-signed corpus, no signing or ABI encoding in the timed path"""
+
+    def on_start(self) -> None:
+        super().on_start()
+        self.senders, self.records = user_records(self.user.environment)
+
+    @task
+    def task_replay(self) -> None:
+        record = next(self.records, None)
+        if record is None:
+            LOG.info("Corpus is over, the user stops")
+            self.user.stop()
+            return
+        sender, raw = record
+        tx_hash = self.web3_client.send_raw_transaction(self.senders[sender], raw)
+        self.web3_client.wait_for_transaction_receipt(tx_hash)
+
+
+class NeonReplayUser(User):
+    tasks = {NeonReplayTasksSet: 1}
@@ -20,14 +20,12 @@ class NeonTasksSet(NeonProxyTasksSet):
         super().setup()
         self.log = logging.getLogger(
             "neon-consumer[%s]" % self.account.address[-8:])
-        self.nonce = self.web3_client.get_nonce(self.account)
         self.recipient = self.get_account()
     
     def get_balances(self):
-        sender_balance = self.web3_client.get_balance(
-            self.account.address)
-        recipient_balance = self.web3_client.get_balance(
-            self.recipient.address)
+        # both balances in one batch request
+        sender_balance, recipient_balance = self.web3_client.get_balances(
+            [self.account.address, self.recipient.address])
         return sender_balance, recipient_balance
 
     def get_account(self):
@@ -40,18 +38,13 @@ class NeonTasksSet(NeonProxyTasksSet):
     @execute_before("task_block_number")
     def task_send_neon(self):
         """Transferring funds to a random account"""
-        # add credits to account
-        self.nonce = self.web3_client.get_nonce(self.account)
+        # nonce is allocated by the shared nonce manager when the transaction is sent
         self.recipient = self.get_account()
-        self.log.info(
-            f"Send `neon` from {str(self.account.address)[-8:]} to {str(self.recipient.address)[-8:]}. nonce {self.nonce}"
-        )
+        self.log.info(f"Send `neon` from {str(self.account.address)[-8:]} to {str(self.recipient.address)[-8:]}")
 
-        tx = self.web3_client.send_neon(
-            self.account, self.recipient, amount=1, nonce=self.nonce
-        )
+        tx = self.web3_client.send_neon(self.account, self.recipient, amount=1)
 
-        return tx, self.web3_client.get_nonce(self.account)
+        return tx
 
 
 class NeonUser(User):
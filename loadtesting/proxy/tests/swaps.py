@@ -16,6 +16,7 @@ from utils.faucet import Faucet
 
 from utils import helpers
 from utils.erc20wrapper import ERC20Wrapper
+from loadtesting.proxy.common.distributed import setup_once
 
 
 LOG = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ MAX_UINT_64 = 0xFFFFFFFFFFFFFFFF
 
 
 @events.test_start.add_listener
+@setup_once("uniswap", "users")
 def deploy_uniswap_contracts(environment: env.Environment, **kwargs):
     """
     Deploy next pairs:
@@ -177,7 +177,6 @@ class UniswapTransaction(NeonProxyTasksSet):
             ).build_transaction(
                 {
                     "from": self.account.address,
-                    "nonce": self.web3_client.get_nonce(self.account.address),
                     "gasPrice": self.web3_client.gas_price(),
                 }
             )
@@ -209,7 +208,6 @@ class UniswapTransaction(NeonProxyTasksSet):
         ).build_transaction(
             {
                 "from": self.account.address,
-                "nonce": self.web3_client.get_nonce(self.account.address),
                 "gasPrice": self.web3_client.gas_price(),
             }
         )
@@ -231,7 +229,6 @@ class UniswapTransaction(NeonProxyTasksSet):
         ).build_transaction(
             {
                 "from": self.account.address,
-                "nonce": self.web3_client.get_nonce(self.account.address),
                 "gasPrice": self.web3_client.gas_price(),
             }
         )
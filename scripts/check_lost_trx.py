@@ -1,15 +1,17 @@
+import asyncio
 import itertools
 import json
 import pathlib
-from concurrent.futures import ThreadPoolExecutor
 
 from solana.transaction import Signature
 
-from utils.web3client import NeonChainWeb3Client
-from utils.solana_client import SolanaClient
+from utils.async_solana_client import AsyncSolanaClient
+from utils.async_web3client import AsyncNeonChainWeb3Client
 
 NETWORK_NAME = "testnet"
 BASE_PATH = pathlib.Path(__file__).parent.parent
+# max requests in flight to each of the endpoints
+CONCURRENCY = 200
 
 
 def load_creds(network_name):
@@ -20,8 +22,8 @@ def load_creds(network_name):
 
 def get_web3_clients():
     creds = load_creds(NETWORK_NAME)
-    w = NeonChainWeb3Client(creds["proxy_url"])
-    s = SolanaClient(creds["solana_url"])
+    w = AsyncNeonChainWeb3Client(creds["proxy_url"], pool_size=CONCURRENCY)
+    s = AsyncSolanaClient(creds["solana_url"])
     return w, s
 
 
@@ -33,44 +35,51 @@ def load_transactions_list():
     return txs
 
 
-def check_neon_tx(tx, web3_client: NeonChainWeb3Client):
+async def check_neon_txs(txs, web3_client: AsyncNeonChainWeb3Client):
+    txs = list(txs)
+    # items of a batch are checked one by one, a failed lookup doesn't stop the scan
+    responses = await web3_client.batch_rpc([("eth_getTransactionReceipt", [tx]) for tx in txs])
+    found = 0
+    for tx, response in zip(txs, responses):
+        if "error" in response:
+            print(f"TX: {tx} is not found: {response['error']}")
+        elif response["result"] is None:
+            print(f"TX: {tx} is not found")
+        else:
+            found += 1
+    return found
+
+
+async def check_sol_tx(tx, solana_client: AsyncSolanaClient, semaphore: asyncio.Semaphore):
     try:
-        web3_client._web3.eth.get_transaction_receipt(tx)
-        return True
+        async with semaphore:
+            res = await solana_client.get_transaction(Signature.from_string(tx))
     except Exception as e:
-        print(f"TX: {tx} is not found")
+        print(f"Solana TRx {tx} not found: {e}")
         return False
-
-
-def check_sol_tx(tx, solana_client: SolanaClient):
-    res = solana_client.get_transaction(Signature.from_string(tx))
     if res.value is None:
         print(f"Solana TRx {tx} not found")
         return False
     return True
 
 
-def run():
+async def run():
     txs = load_transactions_list()
     w3, sol = get_web3_clients()
-    success_neon = 0
-    success_sol = 0
 
-    print("Start check NEON txs")
-    with ThreadPoolExecutor(10) as executor:
-        for res in executor.map(check_neon_tx, txs.keys(), [w3]*len(txs)):
-            if res is True:
-                success_neon += 1
+    async with w3:
+        print("Start check NEON txs")
+        success_neon = await check_neon_txs(txs.keys(), w3)
 
     sol_txs = list(itertools.chain(*txs.values()))
     print("Start check Solana txs")
-    with ThreadPoolExecutor(10) as executor:
-        for res in executor.map(check_sol_tx, sol_txs, [sol]*len(txs)):
-            if res is True:
-                success_sol += 1
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    async with sol:
+        results = await asyncio.gather(*(check_sol_tx(tx, sol, semaphore) for tx in sol_txs))
+    success_sol = sum(results)
     print(f"NEON TX count: {len(txs)}, success got receipts: {success_neon}")
     print(f"SOL TX count: {len(sol_txs)}, success got receipts: {success_sol}")
 
 
 if __name__ == "__main__":
-    run()
+    asyncio.run(run())
@@ -0,0 +1,46 @@
+"""Compare construct layouts with utils.fast_layouts on random account data
+
+python -m scripts.layouts_benchmark [count]
+"""
+import os
+import sys
+import timeit
+
+from utils import fast_layouts, layouts
+
+
+LAYOUTS = [
+    "HOLDER_ACCOUNT_INFO_LAYOUT",
+    "CONTRACT_ACCOUNT_LAYOUT",
+    "BALANCE_ACCOUNT_LAYOUT",
+    "OPERATOR_BALANCE_ACCOUNT_LAYOUT",
+    "STORAGE_CELL_LAYOUT",
+]
+
+
+def bench(name: str, count: int) -> None:
+    slow = getattr(layouts, name)
+    fast = getattr(fast_layouts, name)
+    assert slow.sizeof() == fast.sizeof(), f"{name}: size mismatch"
+    buffers = [os.urandom(fast.sizeof()) for _ in range(count)]
+
+    for data in buffers[:100]:
+        expected = slow.parse(data)
+        record = fast.parse(data)
+        assert all(expected[field] == record[field] for field in fast.fields), f"{name}: decoded values differ"
+
+    results = {
+        "construct": timeit.timeit(lambda: [slow.parse(data) for data in buffers], number=1),
+        "struct": timeit.timeit(lambda: fast.parse_many(buffers), number=1),
+    }
+    joined = b"".join(buffers)
+    results["numpy"] = timeit.timeit(lambda: fast.parse_array(joined), number=1)
+
+    line = ", ".join(f"{kind} {seconds * 1e6 / count:.2f} us" for kind, seconds in results.items())
+    print(f"{name}: {line}, speedup x{results['construct'] / results['struct']:.1f}")
+
+
+if __name__ == "__main__":
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for layout_name in LAYOUTS:
+        bench(layout_name, records)
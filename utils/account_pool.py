@@ -0,0 +1,133 @@
+import contextlib
+import json
+import logging
+import os
+import typing as tp
+from pathlib import Path
+
+import pydantic
+import web3
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from filelock import FileLock
+
+from utils.consts import InputTestConstants
+from utils.funding import create_funded_accounts
+
+
+LOG = logging.getLogger(__name__)
+
+ACCOUNT_POOL_FILE = "accounts_pool.json"
+
+
+class AccountPoolModel(pydantic.BaseModel):
+    proxy_url: str = ""
+    balance: float = 0
+    free: list[str] = []
+    leased: dict[str, str] = {}
+    # used accounts, their balances are sent to the bank account by sweep
+    spent: list[str] = []
+
+
+class AccountPool:
+    """Pre-funded accounts shared between pytest-xdist workers through a file guarded by FileLock
+
+    When the pool is empty, the worker which needs an account funds refill_size accounts at once,
+    other workers wait on the lock and take accounts from the same batch. Free accounts stay in the pool
+    between runs, used ones are kept as spent until sweep sends their balances to the bank account.
+    """
+
+    def __init__(
+        self,
+        web3_client,
+        faucet,
+        bank_account: tp.Optional[LocalAccount] = None,
+        refill_size: int = 20,
+        balance: float = InputTestConstants.NEW_USER_REQUEST_AMOUNT.value,
+        file_path: str = ACCOUNT_POOL_FILE,
+    ):
+        self.web3_client = web3_client
+        self.faucet = faucet
+        self.bank_account = bank_account
+        self.refill_size = refill_size
+        self.balance = balance
+        self.owner = os.environ.get("PYTEST_XDIST_WORKER", "master")
+        self.root_dir: Path = Path(__file__).resolve().parent.parent
+        self.file_path: Path = self.root_dir / file_path
+        self.lock = FileLock(lock_file=self.file_path.with_suffix(self.file_path.suffix + ".lock"), is_singleton=True)
+
+    def read(self) -> AccountPoolModel:
+        if not self.file_path.exists():
+            return AccountPoolModel(proxy_url=self.web3_client._proxy_url, balance=self.balance)  # noqa
+        with self.file_path.open() as f:
+            pool = AccountPoolModel(**json.load(f))
+        if pool.proxy_url != self.web3_client._proxy_url or pool.balance != self.balance:  # noqa
+            # accounts of another stand or with another balance
+            return AccountPoolModel(proxy_url=self.web3_client._proxy_url, balance=self.balance)  # noqa
+        return pool
+
+    @contextlib.contextmanager
+    def _update(self) -> tp.Generator[AccountPoolModel, None, None]:
+        with self.lock:
+            pool = self.read()
+
+            yield pool
+
+            self.file_path.write_text(pool.model_dump_json(indent=4))
+
+    def reset_leases(self) -> None:
+        """Mark accounts leased by previous runs as spent, call it once before workers start"""
+        with self._update() as pool:
+            pool.spent.extend(pool.leased)
+            pool.leased = {}
+
+    def fill(self, count: int) -> None:
+        with self._update() as pool:
+            self._fill(pool, count)
+
+    def _fill(self, pool: AccountPoolModel, count: int) -> None:
+        accounts = create_funded_accounts(
+            self.web3_client, count, self.balance, faucet=self.faucet, bank_account=self.bank_account
+        )
+        pool.free.extend(account.key.hex() for account in accounts)
+        LOG.info(f"Account pool is filled with {count} accounts")
+
+    def lease(self) -> LocalAccount:
+        with self._update() as pool:
+            if not pool.free:
+                self._fill(pool, self.refill_size)
+            key = pool.free.pop()
+            pool.leased[key] = self.owner
+        return Account.from_key(key)
+
+    def release(self, account: LocalAccount) -> bool:
+        """Return the account to the pool if it wasn't used, otherwise keep it as spent
+
+        An account is unused while it has no transactions and the balance it was funded with,
+        so the next test gets the same fresh account.
+        """
+        key = account.key.hex()
+        funded_balance = web3.Web3.to_wei(self.balance, "ether")
+        returned = (
+            self.web3_client.get_nonce(account.address) == 0
+            and self.web3_client.get_balance(account.address) == funded_balance
+        )
+        with self._update() as pool:
+            pool.leased.pop(key, None)
+            if returned:
+                pool.free.append(key)
+            else:
+                pool.spent.append(key)
+        return returned
+
+    def sweep(self, bank_account: LocalAccount) -> None:
+        """Send leftover balances of spent accounts to the bank account, free accounts stay for the next run"""
+        with self._update() as pool:
+            failed = []
+            for key in pool.spent:
+                try:
+                    self.web3_client.send_all_neons(Account.from_key(key), bank_account)
+                except Exception as e:
+                    LOG.warning(f"Can't sweep pool account {Account.from_key(key).address}: {e}")
+                    failed.append(key)
+            pool.spent = failed
@@ -0,0 +1,56 @@
+import typing as tp
+
+import solana.rpc.api
+from construct import Struct
+from solana.rpc.commitment import Commitment, Confirmed
+from solders.account import Account
+from solders.pubkey import Pubkey
+
+from utils.fast_layouts import FastLayout
+
+# getMultipleAccounts accepts up to 100 addresses
+MAX_ACCOUNTS_PER_REQUEST = 100
+
+T = tp.TypeVar("T")
+
+
+def get_multiple_accounts(
+    client: solana.rpc.api.Client,
+    pubkeys: tp.Sequence[Pubkey],
+    commitment: Commitment = Confirmed,
+) -> tp.List[tp.Optional[Account]]:
+    """Accounts in the order of pubkeys, None for accounts which don't exist"""
+    accounts = []
+    for start in range(0, len(pubkeys), MAX_ACCOUNTS_PER_REQUEST):
+        chunk = list(pubkeys[start: start + MAX_ACCOUNTS_PER_REQUEST])
+        accounts.extend(client.get_multiple_accounts(chunk, commitment=commitment, encoding="base64").value)
+    return accounts
+
+
+def read_accounts(
+    client: solana.rpc.api.Client,
+    pubkeys: tp.Sequence[Pubkey],
+    layout: tp.Union[Struct, FastLayout, tp.Callable[[bytes], T]],
+    commitment: Commitment = Confirmed,
+) -> tp.List[tp.Optional[T]]:
+    """Fetch and decode many accounts, layout is a construct Struct, a FastLayout or any decoder of account data"""
+    is_layout = isinstance(layout, (Struct, FastLayout))
+    decode = layout.parse if is_layout else layout
+    records = []
+    for pubkey, account in zip(pubkeys, get_multiple_accounts(client, pubkeys, commitment)):
+        if account is None:
+            records.append(None)
+            continue
+        if is_layout and len(account.data) < layout.sizeof():
+            raise Exception("Wrong data length for account data {}".format(pubkey))
+        records.append(decode(account.data))
+    return records
+
+
+def get_lamports(
+    client: solana.rpc.api.Client,
+    pubkeys: tp.Sequence[Pubkey],
+    commitment: Commitment = Confirmed,
+) -> tp.List[int]:
+    accounts = get_multiple_accounts(client, pubkeys, commitment)
+    return [account.lamports if account is not None else 0 for account in accounts]
@@ -2,30 +2,64 @@ import allure
 from eth_account.signers.local import LocalAccount
 
 from utils.consts import InputTestConstants
+from utils.funding import create_funded_accounts
 from .web3client import NeonChainWeb3Client
 
 
 class EthAccounts:
-    def __init__(self, web3_client: NeonChainWeb3Client, faucet, eth_bank_account):
+    def __init__(self, web3_client: NeonChainWeb3Client, faucet, eth_bank_account, pool=None):
         self._web3_client = web3_client
         self._faucet = faucet
         self._bank_account = eth_bank_account
+        # AccountPool with pre-funded accounts of the default balance
+        self._pool = pool
         self._accounts: list[LocalAccount] = []
+        # accounts leased from the pool and addresses of the ones session fixtures keep using
+        self._leased: list[LocalAccount] = []
+        self._kept: set[str] = set()
         self.accounts_collector = []
 
     def __getitem__(self, item) -> LocalAccount:
-        if len(self._accounts) < (item + 1):
-            for _ in range(item + 1 - len(self._accounts)):
-                with allure.step("Create new account with default balance"):
-                    account = self._web3_client.create_account_with_balance(
-                        self._faucet, bank_account=self._bank_account
-                    )
-
+        missing = item + 1 - len(self._accounts)
+        if missing > 1 and self._pool is None:
+            self._accounts.extend(self.create_accounts(missing))
+        else:
+            for _ in range(missing):
+                account = self._create_default_account()
                 self._accounts.append(account)
                 self.accounts_collector.append(account)
         return self._accounts[item]
 
+    def _create_default_account(self) -> LocalAccount:
+        if self._pool is not None:
+            with allure.step("Lease account with default balance from the pool"):
+                account = self._pool.lease()
+                self._leased.append(account)
+                return account
+        with allure.step("Create new account with default balance"):
+            return self._web3_client.create_account_with_balance(self._faucet, bank_account=self._bank_account)
+
+    def session_account(self, item: int = 0) -> LocalAccount:
+        """Account for session fixtures, it is not returned to the pool after the class"""
+        account = self[item]
+        self._kept.add(account.address)
+        return account
+
+    def release_leased(self) -> None:
+        """Return accounts leased from the pool, so next classes and other xdist workers reuse them"""
+        released = [account for account in self._leased if account.address not in self._kept]
+        self._leased = [account for account in self._leased if account.address in self._kept]
+        addresses = {account.address for account in released}
+        self.accounts_collector = [account for account in self.accounts_collector if account.address not in addresses]
+        for account in released:
+            with allure.step(f"Return account {account.address} to the pool"):
+                self._pool.release(account)
+
     def create_account(self, balance=InputTestConstants.NEW_USER_REQUEST_AMOUNT.value):
+        if self._pool is not None and balance == InputTestConstants.NEW_USER_REQUEST_AMOUNT.value:
+            account = self._create_default_account()
+            self.accounts_collector.append(account)
+            return account
         with allure.step(f"Create new account with balance {balance}"):
             if balance > 0:
                 account = self._web3_client.create_account_with_balance(
@@ -35,3 +69,12 @@ class EthAccounts:
                 account = self._web3_client.create_account()
             self.accounts_collector.append(account)
             return account
+
+    def create_accounts(self, count: int, balance=InputTestConstants.NEW_USER_REQUEST_AMOUNT.value):
+        """Create and fund count accounts at once"""
+        with allure.step(f"Create {count} new accounts with balance {balance}"):
+            accounts = create_funded_accounts(
+                self._web3_client, count, balance, faucet=self._faucet, bank_account=self._bank_account
+            )
+            self.accounts_collector.extend(accounts)
+            return accounts
@@ -2,9 +2,58 @@ import time
 import typing as tp
 import random
 
+import requests
 from requests import Session
 
 
+RpcCall = tp.Tuple[str, tp.Optional[tp.Any]]
+
+
+def make_rpc_request(method: str, params: tp.Optional[tp.Any], req_id: int) -> tp.Dict:
+    body = {"jsonrpc": "2.0", "method": method, "id": req_id}
+    if params is not None:
+        if not isinstance(params, (list, tuple)):
+            params = [params]
+        body["params"] = list(params)
+    return body
+
+
+def send_rpc_batch(
+    session: tp.Optional[Session],
+    url: str,
+    calls: tp.Sequence[RpcCall],
+    max_batch_size: int = 100,
+    timeout: float = 60,
+) -> tp.List[tp.Dict]:
+    """Send calls as JSON-RPC batches and return response bodies in the order of calls
+
+    Responses of a batch can come in any order, so they are matched to calls by id.
+    Every response body contains 'result' or 'error' the same way as for a single request.
+    """
+    if session is None:
+        session = requests
+    responses = []
+    for start in range(0, len(calls), max_batch_size):
+        chunk = calls[start: start + max_batch_size]
+        body = [make_rpc_request(method, params, req_id) for req_id, (method, params) in enumerate(chunk)]
+        resp = session.post(url, json=body, timeout=timeout)
+        resp.raise_for_status()
+        response_body = resp.json()
+        if not isinstance(response_body, list):
+            # the whole batch is rejected, e.g. it's too big
+            raise AssertionError(f"Batch request failed: {response_body}")
+
+        by_id = {item.get("id"): item for item in response_body}
+        for req_id, (method, _) in enumerate(chunk):
+            if req_id not in by_id:
+                raise AssertionError(f"No response for {method} in batch")
+            item = by_id[req_id]
+            if "result" not in item and "error" not in item:
+                raise AssertionError("Request must contains 'result' or 'error' field")
+            responses.append(item)
+    return responses
+
+
 class JsonRPCSession(Session):
     def __init__(self, url):
         super(JsonRPCSession, self).__init__()
@@ -39,6 +88,10 @@ class JsonRPCSession(Session):
 
         return response_body
 
+    def send_rpc_batch(self, calls: tp.Sequence[RpcCall], max_batch_size: int = 100) -> tp.List[tp.Dict]:
+        """Send many (method, params) calls in one round-trip per max_batch_size calls"""
+        return send_rpc_batch(self, self.url, calls, max_batch_size=max_batch_size)
+
     def get_contract_code(self, contract_address: str) -> str:
         response = self.send_rpc("eth_getCode", [contract_address, "latest"])
         return response["result"]
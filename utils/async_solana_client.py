@@ -0,0 +1,124 @@
+import asyncio
+import json
+import typing as tp
+import uuid
+
+import httpx
+import polling2
+import solana.rpc.async_api
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solana.rpc.commitment import Commitment, Confirmed, Finalized
+from solana.rpc.types import TxOpts
+from solders.rpc.errors import InternalErrorMessage
+from solders.rpc.responses import GetTransactionResp, RequestAirdropResp
+from solders.signature import Signature
+from solders.system_program import TransferParams, transfer
+from solana.transaction import Transaction
+
+from utils.helpers import step_exponential, wait_condition_async
+from utils.solana_client import SolanaClient
+
+
+class AsyncSolanaClient(solana.rpc.async_api.AsyncClient):
+    """asyncio counterpart of SolanaClient built on solana AsyncClient"""
+
+    def __init__(self, endpoint, account_seed_version="\3"):
+        super().__init__(endpoint=endpoint, timeout=120)
+        self.endpoint = endpoint
+        self.account_seed_version = (
+            bytes(account_seed_version, encoding="utf-8").decode("unicode-escape").encode("utf-8")
+        )
+        self._http: tp.Optional[httpx.AsyncClient] = None
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.aclose()
+        await super().close()
+
+    ether2bytes = staticmethod(SolanaClient.ether2bytes)
+    get_erc_auth_address = SolanaClient.get_erc_auth_address
+
+    async def request_airdrop(
+            self,
+            pubkey: Pubkey,
+            lamports: int,
+            commitment: tp.Optional[Commitment] = None,
+    ) -> RequestAirdropResp:
+        airdrop_resp = None
+        for _ in range(5):
+            airdrop_resp = await super().request_airdrop(pubkey, lamports, commitment=Finalized)
+            if isinstance(airdrop_resp, InternalErrorMessage):
+                await asyncio.sleep(10)
+                print(f"Get error from solana airdrop: {airdrop_resp}")
+            else:
+                break
+        else:
+            raise AssertionError(f"Can't get airdrop from solana: {airdrop_resp}")
+
+        async def balance_is_enough():
+            return (await self.get_balance(pubkey)).value >= lamports
+
+        await wait_condition_async(
+            balance_is_enough, timeout_sec=30, step_function=step_exponential(), max_delay=3, jitter=0.2
+        )
+        return airdrop_resp
+
+    async def send_sol(self, from_: Keypair, to: Pubkey, amount_lamports: int):
+        tx = Transaction().add(
+            transfer(TransferParams(from_pubkey=from_.pubkey(), to_pubkey=to, lamports=amount_lamports))
+        )
+        await self.send_tx_and_check_status_ok(tx, from_)
+
+    async def send_tx_and_check_status_ok(self, tx, *signers):
+        opts = TxOpts(skip_preflight=True, skip_confirmation=False)
+        sig = (await self.send_transaction(tx, *signers, opts=opts)).value
+        statuses_resp = await self.confirm_transaction(sig, commitment=Confirmed)
+        sig_status = json.loads(statuses_resp.to_json())
+        assert sig_status["result"]["value"][0]["status"] == {"Ok": None}, f"error:{sig_status}"
+
+    async def send_tx(self, trx: Transaction, *signers: Keypair, wait_status=Confirmed):
+        result = await self.send_transaction(
+            trx, *signers, opts=TxOpts(skip_confirmation=True, preflight_commitment=wait_status)
+        )
+        await self.confirm_transaction(result.value, commitment=Confirmed)
+        return await self.get_transaction(result.value, commitment=Confirmed)
+
+    async def wait_transaction(self, tx):
+        async def get_transaction():
+            return await self.get_transaction(Signature.from_string(tx), max_supported_transaction_version=0)
+
+        try:
+            return await wait_condition_async(
+                get_transaction,
+                check_success=lambda resp: resp != GetTransactionResp(None),
+                first_delay=0.2,
+                step_function=step_exponential(1.5),
+                max_delay=2,
+                jitter=0.2,
+            )
+        except polling2.TimeoutException:
+            return None
+
+    async def account_exists(self, account_address: Pubkey) -> bool:
+        try:
+            account_info = await self.get_account_info(account_address)
+            return account_info.value is not None
+        except Exception as e:
+            print(f"An error occurred: {e}")
+
+    async def get_account_whole_info(
+            self,
+            pubkey: Pubkey,
+    ):
+        # get_account_info method returns cut data
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=120)
+        body = {
+            "jsonrpc": "2.0",
+            "id": str(uuid.uuid4()),
+            "method": "getAccountInfo",
+            "params": [f"{pubkey}", {"encoding": "base64", "commitment": "confirmed"}],
+        }
+        response = await self._http.post(self.endpoint, json=body, headers={"Content-Type": "application/json"})
+        return response.json()
@@ -0,0 +1,294 @@
+import asyncio
+import typing as tp
+from decimal import Decimal
+
+import logging
+import aiohttp
+import eth_account.signers.local
+import web3
+import web3.types
+from eth_typing import BlockIdentifier
+from hexbytes import HexBytes
+from web3.exceptions import TransactionNotFound
+
+from utils.apiclient import RpcCall, make_rpc_request
+from utils.consts import InputTestConstants, Unit
+from utils.http_session import POOL_SIZE
+
+
+LOG = logging.getLogger(__name__)
+
+Account = tp.Union[eth_account.signers.local.LocalAccount, str]
+
+
+def _address(account: Account) -> str:
+    return account if isinstance(account, str) else account.address
+
+
+class AsyncWeb3Client:
+    """asyncio counterpart of Web3Client built on web3 AsyncHTTPProvider
+
+    One client with one connection pool can drive thousands of concurrent requests, use it as
+    `async with AsyncWeb3Client(url) as client:` to close the pool at the end.
+    """
+
+    def __init__(self, proxy_url: str, tracer_url: tp.Optional[tp.Any] = None, pool_size: int = POOL_SIZE):
+        self._proxy_url = proxy_url
+        self._tracer_url = tracer_url
+        self._chain_id = None
+        self._pool_size = pool_size
+        self._session: tp.Optional[aiohttp.ClientSession] = None
+        self._web3 = web3.AsyncWeb3(web3.AsyncHTTPProvider(proxy_url, request_kwargs={"timeout": 30}))
+
+    def __getattr__(self, item):
+        return getattr(self._web3, item)
+
+    async def __aenter__(self) -> "AsyncWeb3Client":
+        await self.session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._pool_size),
+                timeout=aiohttp.ClientTimeout(total=60),
+            )
+            await self._web3.provider.cache_async_session(self._session)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    @property
+    def native_token_name(self):
+        if self._proxy_url.split("/")[-1] != "solana":
+            return self._proxy_url.split("/")[-1].upper()
+        else:
+            return "NEON"
+
+    async def get_chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = await self._web3.eth.chain_id
+        return self._chain_id
+
+    async def _rpc(self, method: str, params: tp.Optional[tp.Any] = None) -> tp.Dict:
+        session = await self.session()
+        async with session.post(self._proxy_url, json=make_rpc_request(method, params, 0)) as resp:
+            resp.raise_for_status()
+            return await resp.json(content_type=None)
+
+    async def batch_rpc(self, calls: tp.Sequence[RpcCall], max_batch_size: int = 100) -> tp.List[tp.Dict]:
+        """Same as Web3Client.batch_rpc, chunks are sent concurrently"""
+        session = await self.session()
+
+        async def send_chunk(chunk: tp.Sequence[RpcCall]) -> tp.List[tp.Dict]:
+            body = [make_rpc_request(method, params, req_id) for req_id, (method, params) in enumerate(chunk)]
+            async with session.post(self._proxy_url, json=body) as resp:
+                resp.raise_for_status()
+                response_body = await resp.json(content_type=None)
+            if not isinstance(response_body, list):
+                raise AssertionError(f"Batch request failed: {response_body}")
+            by_id = {item.get("id"): item for item in response_body}
+            for req_id, (method, _) in enumerate(chunk):
+                if req_id not in by_id:
+                    raise AssertionError(f"No response for {method} in batch")
+            return [by_id[req_id] for req_id in range(len(chunk))]
+
+        chunks = [calls[start: start + max_batch_size] for start in range(0, len(calls), max_batch_size)]
+        responses = await asyncio.gather(*(send_chunk(chunk) for chunk in chunks))
+        return [response for chunk_responses in responses for response in chunk_responses]
+
+    async def _batch_results(self, calls: tp.Sequence[RpcCall]) -> tp.List[tp.Any]:
+        results = []
+        for (method, params), response in zip(calls, await self.batch_rpc(calls)):
+            if "error" in response:
+                raise ValueError(f"{method}{params} failed: {response['error']}")
+            results.append(response["result"])
+        return results
+
+    async def get_proxy_version(self):
+        return await self._rpc("neon_proxyVersion")
+
+    async def get_cli_version(self):
+        return await self._rpc("neon_coreVersion")
+
+    async def get_neon_versions(self):
+        return await self._rpc("neon_versions")
+
+    async def get_evm_version(self):
+        return await self._rpc("web3_clientVersion")
+
+    async def get_neon_emulate(self, params):
+        return await self._rpc("neon_emulate", [params])
+
+    async def get_solana_trx_by_neon(self, tr_id: str):
+        return await self._rpc("neon_getSolanaTransactionByNeonTransaction", [tr_id])
+
+    async def get_transaction_by_hash(self, transaction_hash):
+        try:
+            return await self._web3.eth.get_transaction(transaction_hash)
+        except TransactionNotFound:
+            return None
+
+    async def gas_price(self) -> int:
+        return await self._web3.eth.gas_price
+
+    async def base_fee_per_gas(self) -> int:
+        latest_block: web3.types.BlockData = await self._web3.eth.get_block(block_identifier="latest")  # noqa
+        return latest_block.baseFeePerGas  # noqa
+
+    async def max_priority_fee(self) -> int:
+        return await self._web3.eth.max_priority_fee
+
+    async def get_token_usd_gas_price(self):
+        resp = await self._rpc("neon_gasPrice")
+        return int(resp["result"]["tokenPriceUsd"], 16) / 100000
+
+    async def gas_price_to_eip1559_params(self, gas_price: int) -> tuple[int, int]:
+        base_fee_per_gas = await self.base_fee_per_gas()
+
+        msg = f"gas_price {gas_price} is lower than the baseFeePerGas {base_fee_per_gas}"
+        assert gas_price >= base_fee_per_gas, msg
+
+        max_fee_per_gas = gas_price
+        max_priority_fee_per_gas = max_fee_per_gas - base_fee_per_gas
+        return max_priority_fee_per_gas, max_fee_per_gas
+
+    def create_account(self) -> eth_account.signers.local.LocalAccount:
+        return self._web3.eth.account.create()
+
+    async def get_block_number(self):
+        return await self._web3.eth.get_block_number()
+
+    async def get_block_number_by_id(self, block_identifier):
+        return await self._web3.eth.get_block(block_identifier)
+
+    async def get_nonce(self, address: Account, block: BlockIdentifier = "pending") -> int:
+        return await self._web3.eth.get_transaction_count(_address(address), block)
+
+    async def get_nonces(self, addresses: tp.Sequence[Account], block: BlockIdentifier = "pending") -> tp.List[int]:
+        results = await self._batch_results(
+            [("eth_getTransactionCount", [_address(address), block]) for address in addresses]
+        )
+        return [int(result, 16) for result in results]
+
+    async def get_balance(self, address: Account, unit=Unit.WEI):
+        balance = await self._web3.eth.get_balance(_address(address), "pending")
+        if unit != Unit.WEI:
+            balance = self._web3.from_wei(balance, unit.value)
+        return balance
+
+    async def get_balances(self, addresses: tp.Sequence[Account], unit=Unit.WEI) -> tp.List[tp.Union[int, Decimal]]:
+        results = await self._batch_results(
+            [("eth_getBalance", [_address(address), "pending"]) for address in addresses]
+        )
+        balances = [int(result, 16) for result in results]
+        if unit != Unit.WEI:
+            balances = [self._web3.from_wei(balance, unit.value) for balance in balances]
+        return balances
+
+    async def get_transaction_receipts(
+        self, tx_hashes: tp.Sequence[tp.Union[str, bytes]]
+    ) -> tp.List[tp.Optional[dict]]:
+        tx_hashes = [tx_hash if isinstance(tx_hash, str) else HexBytes(tx_hash).hex() for tx_hash in tx_hashes]
+        return await self._batch_results([("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes])
+
+    async def wait_for_transaction_receipt(self, tx_hash, timeout=120) -> web3.types.TxReceipt:
+        return await self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
+    async def make_raw_tx(
+        self,
+        from_: Account,
+        to: tp.Optional[Account] = None,
+        amount: tp.Optional[tp.Union[int, float, Decimal]] = None,
+        gas: tp.Optional[int] = None,
+        gas_price: tp.Optional[int] = None,
+        nonce: tp.Optional[int] = None,
+        chain_id: tp.Optional[int] = None,
+        data: tp.Optional[tp.Union[str, bytes]] = None,
+        estimate_gas=False,
+    ) -> dict:
+        """Legacy transaction, the same as Web3Client.make_raw_tx"""
+        transaction = {"from": _address(from_)}
+        if to:
+            transaction["to"] = _address(to)
+        if amount:
+            transaction["value"] = amount
+        if data:
+            transaction["data"] = data
+        transaction["nonce"] = await self.get_nonce(from_) if nonce is None else nonce
+
+        if chain_id is None:
+            transaction["chainId"] = await self.get_chain_id()
+        elif chain_id:
+            transaction["chainId"] = chain_id
+
+        transaction["gasPrice"] = await self.gas_price() if gas_price is None else gas_price
+        if estimate_gas and not gas:
+            gas = await self._web3.eth.estimate_gas(transaction)
+        if gas:
+            transaction["gas"] = gas
+        return transaction
+
+    async def send_transaction(
+        self,
+        account: eth_account.signers.local.LocalAccount,
+        transaction: tp.Dict,
+        timeout: int = 120,
+    ) -> web3.types.TxReceipt:
+        signed_tx = self._web3.eth.account.sign_transaction(transaction, account.key)
+        tx_hash = await self._web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+        return await self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
+    async def send_tokens(
+        self,
+        from_: eth_account.signers.local.LocalAccount,
+        to: Account,
+        value: int,
+        gas: tp.Optional[int] = None,
+        gas_price: tp.Optional[int] = None,
+        nonce: tp.Optional[int] = None,
+    ) -> web3.types.TxReceipt:
+        transaction = await self.make_raw_tx(
+            from_, to, amount=value, gas=gas, gas_price=gas_price, nonce=nonce, estimate_gas=True
+        )
+        return await self.send_transaction(from_, transaction)
+
+    @staticmethod
+    def to_atomic_currency(amount):
+        return web3.Web3.to_wei(amount, "ether")
+
+    def to_main_currency(self, value):
+        return web3.Web3.from_wei(value, "ether")
+
+
+class AsyncNeonChainWeb3Client(AsyncWeb3Client):
+    async def create_account_with_balance(
+        self,
+        faucet,
+        amount: int = InputTestConstants.NEW_USER_REQUEST_AMOUNT.value,
+        bank_account=None,
+    ) -> eth_account.signers.local.LocalAccount:
+        """Creates a new account with balance, faucet is an AsyncFaucet"""
+        account = self.create_account()
+        if bank_account is not None:
+            await self.send_neon(bank_account, account, amount)
+        else:
+            await faucet.request_neon(account.address, amount=amount)
+        return account
+
+    async def send_neon(
+        self,
+        from_: eth_account.signers.local.LocalAccount,
+        to: Account,
+        amount: tp.Union[int, float, Decimal],
+        gas: tp.Optional[int] = None,
+        gas_price: tp.Optional[int] = None,
+        nonce: int = None,
+    ) -> web3.types.TxReceipt:
+        value = web3.Web3.to_wei(amount, "ether")
+        return await self.send_tokens(from_, to, value, gas, gas_price, nonce)
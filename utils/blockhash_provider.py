@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+import typing as tp
+
+from solana.rpc.commitment import Commitment, Finalized
+from solders.hash import Hash
+
+from utils.helpers import observed_slot_time
+
+
+LOG = logging.getLogger(__name__)
+
+# a blockhash is valid for 150 blocks, refreshing every 20 slots keeps a cached one far from expiration
+REFRESH_SLOTS = 20
+
+
+class BlockhashProvider:
+    """Recent blockhash shared by all transactions of an endpoint instead of getLatestBlockhash per transaction
+
+    The background thread refreshes the blockhash every refresh_slots slots of the observed slot time and
+    stops when nobody asked for a blockhash during an hour.
+    """
+
+    def __init__(self, solana_client, commitment: Commitment = Finalized, refresh_slots: int = REFRESH_SLOTS):
+        self.solana_client = solana_client
+        self.commitment = commitment
+        self.refresh_slots = refresh_slots
+        self._blockhash: tp.Optional[Hash] = None
+        self._updated_at = 0.0
+        self._requested_at = 0.0
+        self._lock = threading.Lock()
+        self._refresher: tp.Optional[threading.Thread] = None
+
+    @property
+    def refresh_interval(self) -> float:
+        return self.refresh_slots * observed_slot_time(self.solana_client)
+
+    def get(self, exclude: tp.Optional[Hash] = None) -> Hash:
+        """Cached blockhash, with exclude waits for a blockhash which differs from it"""
+        self._requested_at = time.monotonic()
+        self._start()
+        blockhash = self._blockhash
+        if blockhash is None or time.monotonic() - self._updated_at > self.refresh_interval:
+            blockhash = self.refresh()
+        for _ in range(self.refresh_slots):
+            if blockhash != exclude:
+                break
+            time.sleep(observed_slot_time(self.solana_client))
+            blockhash = self.refresh()
+        return blockhash
+
+    def refresh(self) -> Hash:
+        blockhash = self.solana_client.get_latest_blockhash(self.commitment).value.blockhash
+        with self._lock:
+            self._blockhash = blockhash
+            self._updated_at = time.monotonic()
+        return blockhash
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, name="blockhash-refresher", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while time.monotonic() - self._requested_at < 3600:
+            time.sleep(self.refresh_interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                LOG.warning(f"Can't refresh blockhash: {e}")
+        with self._lock:
+            self._refresher = None
+
+
+_providers: tp.Dict[str, BlockhashProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_blockhash_provider(solana_client) -> BlockhashProvider:
+    """One provider per endpoint, so all tests and locust users of a process share the blockhash"""
+    with _providers_lock:
+        provider = _providers.get(solana_client.endpoint)
+        if provider is None:
+            provider = _providers[solana_client.endpoint] = BlockhashProvider(solana_client)
+        return provider
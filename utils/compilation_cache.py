@@ -0,0 +1,272 @@
+import contextlib
+import copy
+import hashlib
+import importlib.metadata
+import json
+import os
+import pathlib
+import re
+import tempfile
+import typing as tp
+import logging
+
+from filelock import FileLock
+
+
+LOG = logging.getLogger(__name__)
+
+ROOT_DIR = pathlib.Path(__file__).resolve().parent.parent
+CACHE_DIR = pathlib.Path(os.environ.get("NEON_TESTS_COMPILE_CACHE_DIR", ROOT_DIR / ".compile_cache"))
+CACHE_MAX_SIZE = int(os.environ.get("NEON_TESTS_COMPILE_CACHE_MAX_SIZE", 512 * 1024 * 1024))
+CACHE_FORMAT_VERSION = 1
+BUNDLE_PATH = pathlib.Path(os.environ.get("NEON_TESTS_CONTRACTS_BUNDLE", ROOT_DIR / "contracts_bundle.json"))
+MANIFEST_PATH = pathlib.Path(os.environ.get("NEON_TESTS_CONTRACTS_MANIFEST", ROOT_DIR / "contracts_manifest.json"))
+
+IMPORT_PATTERN = re.compile(r"""^\s*import\s+(?:[^;]*?\bfrom\s+)?["']([^"']+)["']""", re.MULTILINE)
+
+
+def normalize_remappings(import_remapping: tp.Optional[tp.Union[dict, list, str]]) -> tp.Dict[str, str]:
+    if not import_remapping:
+        return {}
+    if isinstance(import_remapping, dict):
+        return {str(k): str(v) for k, v in import_remapping.items()}
+    if isinstance(import_remapping, str):
+        import_remapping = [import_remapping]
+    return dict(item.split("=", 1) for item in import_remapping)
+
+
+def resolve_import(
+    source_path: pathlib.Path, import_path: str, remappings: tp.Dict[str, str]
+) -> tp.Optional[pathlib.Path]:
+    """Resolve solidity import the same way as solc does with base path `.`"""
+    if import_path.startswith("./") or import_path.startswith("../"):
+        candidates = [source_path.parent / import_path]
+    else:
+        for prefix, target in remappings.items():
+            if import_path.startswith(prefix):
+                import_path = target + import_path[len(prefix):]
+                break
+        candidates = [
+            pathlib.Path(import_path),
+            pathlib.Path.cwd() / import_path,
+            pathlib.Path.cwd() / "contracts" / import_path,
+            pathlib.Path.cwd() / "node_modules" / import_path,
+        ]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve()
+    return None
+
+
+def relative_path(path: pathlib.Path) -> str:
+    """Keep cache keys the same for checkouts in different directories"""
+    try:
+        return str(path.relative_to(pathlib.Path.cwd()))
+    except ValueError:
+        return str(path)
+
+
+def collect_sources(contract_path: pathlib.Path, remappings: tp.Dict[str, str]) -> tp.List[tp.Tuple[str, str]]:
+    """Return (path, sha256) pairs for the contract and all its transitive imports"""
+    sources = {}
+    queue = [contract_path.resolve()]
+    while queue:
+        path = queue.pop()
+        if relative_path(path) in sources:
+            continue
+        content = path.read_bytes()
+        sources[relative_path(path)] = hashlib.sha256(content).hexdigest()
+        for import_path in IMPORT_PATTERN.findall(content.decode("utf-8", errors="ignore")):
+            resolved = resolve_import(path, import_path, remappings)
+            if resolved is None:
+                LOG.debug(f"Can't resolve import {import_path} from {path}, use import path in cache key")
+                sources[f"unresolved:{import_path}"] = ""
+                continue
+            queue.append(resolved)
+    return sorted(sources.items())
+
+
+class CompilationCache:
+    """Content-addressed on-disk cache of solc output shared between processes"""
+
+    def __init__(self, cache_dir: pathlib.Path = CACHE_DIR, max_size: int = CACHE_MAX_SIZE):
+        self.cache_dir = pathlib.Path(cache_dir)
+        self.max_size = max_size
+        self.lock = FileLock(self.cache_dir / ".eviction.lock", is_singleton=True)
+        self.compile_lock = FileLock(self.cache_dir / ".compile.lock", is_singleton=True)
+
+    def _make_dir(self) -> None:
+        # the directory is created on first use, so importing the module doesn't touch the disk
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(
+        self,
+        contract_path: pathlib.Path,
+        version: str,
+        import_remapping: tp.Optional[tp.Union[dict, list, str]] = None,
+        optimize: bool = True,
+        **extra: tp.Any,
+    ) -> str:
+        remappings = normalize_remappings(import_remapping)
+        data = {
+            "format": CACHE_FORMAT_VERSION,
+            "contract": relative_path(contract_path.resolve()),
+            "sources": collect_sources(contract_path, remappings),
+            "version": str(version),
+            "remappings": sorted(remappings.items()),
+            "optimize": optimize,
+            "extra": sorted((k, repr(v)) for k, v in extra.items()),
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def make_vyper_key(contract_path: pathlib.Path) -> str:
+        # importlib.metadata is used because importing vyper changes decimal precision
+        data = {
+            "format": CACHE_FORMAT_VERSION,
+            "contract": relative_path(contract_path.resolve()),
+            "source": hashlib.sha256(contract_path.read_bytes()).hexdigest(),
+            "version": importlib.metadata.version("vyper"),
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}.json"
+
+    @contextlib.contextmanager
+    def lock_key(self, key: str) -> tp.Generator[None, None, None]:
+        """Only one process compiles at a time, others wait and read the result
+
+        One lock file is shared by all keys, so the cache directory doesn't fill with lock files. Cache hits are read
+        before taking the lock, so only compilations wait for each other.
+        """
+        self._make_dir()
+        with self.compile_lock:
+            yield
+
+    def get(self, key: str) -> tp.Optional[dict]:
+        path = self._entry_path(key)
+        try:
+            with path.open() as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        with contextlib.suppress(FileNotFoundError):
+            os.utime(path)
+        return data
+
+    def set(self, key: str, compiled: dict) -> None:
+        self._make_dir()
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(compiled, f)
+        os.replace(tmp_path, self._entry_path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used entries while the cache is bigger than max_size"""
+        self._make_dir()
+        with self.lock:
+            entries = []
+            total_size = 0
+            for path in self.cache_dir.glob("*.json"):
+                with contextlib.suppress(FileNotFoundError):
+                    stat = path.stat()
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total_size += stat.st_size
+            if total_size <= self.max_size:
+                return
+            for _, size, path in sorted(entries):
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+                total_size -= size
+                if total_size <= self.max_size:
+                    break
+
+    def clear(self) -> None:
+        self._make_dir()
+        with self.lock:
+            for path in self.cache_dir.glob("*.json"):
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+
+
+class ContractsBundle:
+    """Prebuilt ABI/bytecode of all contracts used by tests, created by `clickfile.py compile-contracts`"""
+
+    def __init__(self, path: pathlib.Path = BUNDLE_PATH):
+        self.path = pathlib.Path(path)
+        self._data: tp.Optional[dict] = None
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = {"solc": {}, "vyper": {}, "metadata": {}}
+            if self.path.is_file():
+                with self.path.open() as f:
+                    self._data = json.load(f)
+                LOG.info(f"Loaded contracts bundle {self.path}: {self._data['metadata']}")
+        return self._data
+
+    def get_solc(self, key: str) -> tp.Optional[dict]:
+        return copy.deepcopy(self.data["solc"].get(key))
+
+    def get_vyper(self, key: str) -> tp.Optional[dict]:
+        return copy.deepcopy(self.data["vyper"].get(key))
+
+    def save(self, data: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._data = data
+
+
+class ContractsManifest:
+    """Solidity contracts compiled by test runs, `clickfile.py compile-contracts` builds the bundle from them
+
+    Every compile_contract call records its contract, solc version and import remappings, so the manifest lists
+    the contracts deployed with versions from variables and fixture parameters too.
+    """
+
+    def __init__(self, path: pathlib.Path = MANIFEST_PATH):
+        self.path = pathlib.Path(path)
+        self.lock = FileLock(self.path.with_suffix(self.path.suffix + ".lock"), is_singleton=True)
+        self._recorded: tp.Set[str] = set()
+
+    def read(self) -> tp.List[dict]:
+        if not self.path.is_file():
+            return []
+        with self.path.open() as f:
+            return json.load(f)
+
+    def record(
+        self,
+        contract_path: pathlib.Path,
+        version: str,
+        import_remapping: tp.Optional[tp.Union[dict, list, str]] = None,
+    ) -> None:
+        entry = {
+            "contract": relative_path(contract_path.resolve()),
+            "version": str(version),
+            "remappings": normalize_remappings(import_remapping),
+        }
+        entry_id = json.dumps(entry, sort_keys=True)
+        if entry_id in self._recorded:
+            return
+        with self.lock:
+            entries = self.read()
+            if entry not in entries:
+                entries.append(entry)
+                entries.sort(key=lambda item: json.dumps(item, sort_keys=True))
+                fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entries, f, indent=2)
+                    f.write("\n")
+                os.replace(tmp_path, self.path)
+        self._recorded.add(entry_id)
+
+
+compilation_cache = CompilationCache()
+contracts_bundle = ContractsBundle()
+contracts_manifest = ContractsManifest()
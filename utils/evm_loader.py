@@ -1,19 +1,26 @@
+import functools
 import json
+import logging
 import typing
 from typing import Union
 
 import spl
 import typing as tp
+from concurrent.futures import ThreadPoolExecutor
 
 from eth_keys import keys as eth_keys
 from eth_account.datastructures import SignedTransaction
+from solders.hash import Hash
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 import solders.system_program as sp
 from solana.rpc.commitment import Confirmed
+from solana.exceptions import SolanaRpcException
+from solana.rpc.core import RPCException
 from solana.rpc.types import TxOpts
-from solana.transaction import Transaction
+from solana.transaction import PACKET_DATA_SIZE, Transaction
 from solders.rpc.responses import SendTransactionResp, GetTransactionResp
+from solders.signature import Signature
 from spl.token.instructions import get_associated_token_address, MintToParams, ApproveParams, approve
 from spl.token.constants import TOKEN_PROGRAM_ID
 
@@ -22,6 +29,7 @@ from integration.tests.neon_evm.utils.constants import (
     NEON_TOKEN_MINT_ID,
     CHAIN_ID,
 )
+from utils.account_reader import read_accounts
 from utils.consts import LAMPORT_PER_SOL, wSOL
 from utils.instructions import (
     TransactionWithComputeBudget,
@@ -36,18 +44,31 @@ from utils.instructions import (
     make_wSOL,
     make_OperatorBalanceAccount,
 )
-from utils.layouts import BALANCE_ACCOUNT_LAYOUT, CONTRACT_ACCOUNT_LAYOUT, STORAGE_CELL_LAYOUT
+from utils.helpers import BLOCKHASH_NOT_FOUND
+from utils.fast_layouts import BALANCE_ACCOUNT_LAYOUT, CONTRACT_ACCOUNT_LAYOUT, STORAGE_CELL_LAYOUT
+from utils.pda import find_program_address, find_program_addresses
 from utils.solana_client import SolanaClient
+from utils.step_executor import StepExecutor, plan_speculation
 from utils.types import Caller
 
+LOG = logging.getLogger(__name__)
+
 EVM_STEPS = 500
 
 
+@functools.lru_cache(maxsize=256)
+def operator_ether_address(secret: bytes) -> bytes:
+    """Ethereum address of an operator key, secp256k1 multiplication is too slow to repeat on every step"""
+    return eth_keys.PrivateKey(secret).public_key.to_canonical_address()
+
+
 class EvmLoader(SolanaClient):
     def __init__(self, program_id, endpoint):
         super().__init__(endpoint)
         EvmLoader.loader_id = Pubkey.from_string(program_id)
         self.loader_id = EvmLoader.loader_id
+        # compute units of each step transaction of the last iterative transaction, see StepExecutor
+        self.step_compute_units: tp.List[tp.Optional[int]] = []
 
     def create_balance_account(self, ether: Union[str, bytes], sender, chain_id=CHAIN_ID) -> Pubkey:
         account_pubkey = self.ether2balance(ether, chain_id)
@@ -62,7 +83,7 @@ class EvmLoader(SolanaClient):
         return account_pubkey
 
     def create_treasury_pool_address(self, pool_index):
-        return Pubkey.find_program_address(
+        return find_program_address(
             [bytes(TREASURY_POOL_SEED, "utf8"), pool_index.to_bytes(4, "little")], self.loader_id
         )[0]
 
@@ -88,7 +109,7 @@ class EvmLoader(SolanaClient):
         address_bytes = self.ether2bytes(ether_address)
         key = bytes(keypair.pubkey())
         chain_id_bytes = chain_id.to_bytes(32, "big")
-        return Pubkey.find_program_address(
+        return find_program_address(
             [self.account_seed_version, key, address_bytes, chain_id_bytes], self.loader_id
         )[0]
 
@@ -120,6 +141,23 @@ class EvmLoader(SolanaClient):
 
         return int.from_bytes(layout.balance, byteorder="little")
 
+    def get_neon_balances(self, accounts: tp.Sequence[Union[str, bytes]], chain_id=CHAIN_ID) -> tp.List[int]:
+        """get_neon_balance for many accounts with getMultipleAccounts, 0 for accounts which don't exist"""
+        records = read_accounts(self, self.ether2balances(accounts, chain_id), BALANCE_ACCOUNT_LAYOUT)
+        return [int.from_bytes(record.balance, byteorder="little") if record else 0 for record in records]
+
+    def get_neon_nonces(self, accounts: tp.Sequence[Union[str, bytes]], chain_id=CHAIN_ID) -> tp.List[int]:
+        records = read_accounts(self, self.ether2balances(accounts, chain_id), BALANCE_ACCOUNT_LAYOUT)
+        return [record.trx_count if record else 0 for record in records]
+
+    def get_contract_account_revisions(self, addresses: tp.Sequence[Pubkey]) -> tp.List[tp.Optional[int]]:
+        records = read_accounts(self, addresses, CONTRACT_ACCOUNT_LAYOUT)
+        return [record.revision if record else None for record in records]
+
+    def get_data_account_revisions(self, addresses: tp.Sequence[Pubkey]) -> tp.List[tp.Optional[int]]:
+        records = read_accounts(self, addresses, STORAGE_CELL_LAYOUT)
+        return [record.revision if record else None for record in records]
+
     def get_contract_account_revision(self, address):
         account_data = self.get_solana_account_data(address, CONTRACT_ACCOUNT_LAYOUT.sizeof())
         return CONTRACT_ACCOUNT_LAYOUT.parse(account_data).revision
@@ -128,33 +166,80 @@ class EvmLoader(SolanaClient):
         account_data = self.get_solana_account_data(address, STORAGE_CELL_LAYOUT.sizeof())
         return STORAGE_CELL_LAYOUT.parse(account_data).revision
 
+    def holder_chunk_size(self, operator: Keypair, holder_account: Pubkey, tx_hash: bytes) -> int:
+        """The biggest WriteHolder payload which keeps the transaction within the packet size"""
+        trx = Transaction(recent_blockhash=Hash.default(), fee_payer=operator.pubkey())
+        trx.add(make_WriteHolder(operator.pubkey(), self.loader_id, holder_account, tx_hash, 0, b""))
+        trx.sign(operator)
+        # the instruction data length is a compact-u16, it takes one more byte for a payload above 127 bytes
+        return PACKET_DATA_SIZE - len(trx.serialize()) - 1
+
     def write_transaction_to_holder_account(
         self,
         signed_tx: SignedTransaction,
         holder_account: Pubkey,
         operator: Keypair,
+        max_attempts: int = 3,
+        max_in_flight: int = 16,
+        timeout: float = 60,
     ):
-        offset = 0
-        receipts = []
-        rest = signed_tx.rawTransaction
-        while len(rest):
-            (part, rest) = (rest[:920], rest[920:])
-            trx = Transaction()
-            trx.add(make_WriteHolder(operator.pubkey(), self.loader_id, holder_account, signed_tx.hash, offset, part))
-            receipts.append(
-                self.send_transaction(
-                    trx,
-                    operator,
-                    opts=TxOpts(skip_confirmation=True, preflight_commitment=Confirmed),
+        """Send all WriteHolder chunks at once with one blockhash, confirm them together and resend dropped ones
+
+        Chunks which are not sent or haven't landed before the blockhash expires are resent, a chunk which landed
+        with an error fails at once, resending it would fail the same way.
+        """
+        data = signed_tx.rawTransaction
+        chunk_size = self.holder_chunk_size(operator, holder_account, signed_tx.hash)
+        pending = {offset: data[offset: offset + chunk_size] for offset in range(0, len(data), chunk_size)}
+
+        def send(blockhash: Hash, offset: int) -> tp.Optional[Signature]:
+            trx = Transaction(recent_blockhash=blockhash, fee_payer=operator.pubkey())
+            trx.add(
+                make_WriteHolder(
+                    operator.pubkey(), self.loader_id, holder_account, signed_tx.hash, offset, pending[offset]
                 )
             )
-            offset += len(part)
-
-        for rcpt in receipts:
-            self.confirm_transaction(rcpt.value, commitment=Confirmed)
+            trx.sign(operator)
+            try:
+                return self.send_raw_transaction(
+                    trx.serialize(), opts=TxOpts(skip_confirmation=True, preflight_commitment=Confirmed)
+                ).value
+            except RPCException as e:
+                # program errors found at preflight are not retried, they keep their message for callers
+                if BLOCKHASH_NOT_FOUND not in str(e):
+                    raise
+                LOG.warning(f"WriteHolder at offset {offset} is not sent: {e}")
+                return None
+            except SolanaRpcException as e:
+                # transport errors and timeouts, the chunk is resent in the next attempt
+                LOG.warning(f"WriteHolder at offset {offset} is not sent: {e}")
+                return None
+
+        errors = {}
+        blockhash = None
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="write-holder") as executor:
+            for _ in range(max_attempts):
+                # resent chunks need another blockhash, otherwise they are the same transactions
+                blockhash = self.blockhash_provider.get(exclude=blockhash)
+                offsets = list(pending)
+                signatures = dict(zip(offsets, executor.map(lambda offset: send(blockhash, offset), offsets)))
+                sent = [signature for signature in signatures.values() if signature is not None]
+                statuses = dict(zip(sent, self.wait_signatures(sent, commitment=Confirmed, timeout=timeout)))
+                for offset, signature in signatures.items():
+                    status = statuses.get(signature)
+                    if status is None:
+                        errors[offset] = "not sent" if signature is None else "not confirmed"
+                    elif status.err is not None:
+                        raise AssertionError(f"WriteHolder at offset {offset} failed: {status.err}")
+                    else:
+                        del pending[offset]
+                if not pending:
+                    return
+        failed = {offset: errors[offset] for offset in pending}
+        raise AssertionError(f"WriteHolder failed after {max_attempts} attempts: {failed}")
 
     def ether2program(self, ether: tp.Union[str, bytes]) -> tp.Tuple[str, int]:
-        items = Pubkey.find_program_address([self.account_seed_version, self.ether2bytes(ether)], self.loader_id)
+        items = find_program_address([self.account_seed_version, self.ether2bytes(ether)], self.loader_id)
         return str(items[0]), items[1]
 
     def ether2balance(self, address: tp.Union[str, bytes], chain_id=CHAIN_ID) -> Pubkey:
@@ -162,12 +247,18 @@ class EvmLoader(SolanaClient):
         address_bytes = self.ether2bytes(address)
 
         chain_id_bytes = chain_id.to_bytes(32, "big")
-        return Pubkey.find_program_address(
+        return find_program_address(
             [self.account_seed_version, address_bytes, chain_id_bytes], self.loader_id
         )[0]
 
+    def ether2balances(self, addresses: tp.Sequence[tp.Union[str, bytes]], chain_id=CHAIN_ID) -> tp.List[Pubkey]:
+        """ether2balance for many addresses, see pda.find_program_addresses"""
+        chain_id_bytes = chain_id.to_bytes(32, "big")
+        seeds_list = [[self.account_seed_version, self.ether2bytes(address), chain_id_bytes] for address in addresses]
+        return [address for address, _ in find_program_addresses(seeds_list, self.loader_id)]
+
     def get_operator_balance_pubkey(self, operator: Keypair):
-        operator_ether = eth_keys.PrivateKey(operator.secret()[:32]).public_key.to_canonical_address()
+        operator_ether = operator_ether_address(operator.secret()[:32])
         return self.ether2operator_balance(operator, operator_ether)
 
     def execute_trx_from_instruction(
@@ -291,7 +382,7 @@ class EvmLoader(SolanaClient):
         signers = [signer, *additional_signers] if additional_signers else [signer]
         return self.send_tx(trx, *signers)
 
-    def send_transaction_step_from_instruction(
+    def make_step_from_instruction(
         self,
         operator: Keypair,
         operator_balance_pubkey,
@@ -300,11 +391,10 @@ class EvmLoader(SolanaClient):
         instruction: SignedTransaction,
         additional_accounts,
         steps_count,
-        signer: Keypair,
         system_program=sp.ID,
         index=0,
         tag=0x34,
-    ) -> GetTransactionResp:
+    ) -> Transaction:
         trx = TransactionWithComputeBudget(operator)
 
         trx.add(
@@ -322,7 +412,34 @@ class EvmLoader(SolanaClient):
                 tag
             )
         )
+        return trx
 
+    def send_transaction_step_from_instruction(
+        self,
+        operator: Keypair,
+        operator_balance_pubkey,
+        treasury,
+        storage_account,
+        instruction: SignedTransaction,
+        additional_accounts,
+        steps_count,
+        signer: Keypair,
+        system_program=sp.ID,
+        index=0,
+        tag=0x34,
+    ) -> GetTransactionResp:
+        trx = self.make_step_from_instruction(
+            operator,
+            operator_balance_pubkey,
+            treasury,
+            storage_account,
+            instruction,
+            additional_accounts,
+            steps_count,
+            system_program,
+            index,
+            tag,
+        )
         return self.send_tx(trx, signer)
 
     def execute_transaction_steps_from_instruction(
@@ -333,38 +450,36 @@ class EvmLoader(SolanaClient):
         instruction: SignedTransaction,
         additional_accounts,
         signer: Keypair = None,
+        total_steps: tp.Optional[int] = None,
     ) -> GetTransactionResp:
+        """total_steps from emulation lets several step transactions go at once, see StepExecutor"""
         signer = operator if signer is None else signer
         operator_balance_pubkey = self.get_operator_balance_pubkey(operator)
-        index = 0
-        receipt = None
-        done = False
-        while not done:
-            receipt = self.send_transaction_step_from_instruction(
+        executor = StepExecutor(
+            self,
+            lambda index, steps: self.make_step_from_instruction(
                 operator,
                 operator_balance_pubkey,
                 treasury,
                 storage_account,
                 instruction,
                 additional_accounts,
-                EVM_STEPS,
-                signer,
+                steps,
                 index=index,
-            )
-            index += 1
-
-            if receipt.value.transaction.meta.err:
-                raise AssertionError(f"Transaction failed with error: {receipt.value.transaction.meta.err}")
-            for log in receipt.value.transaction.meta.log_messages:
-                if "exit_status" in log:
-                    done = True
-                    break
-                if "ExitError" in log:
-                    raise AssertionError(f"EVM Return error in logs: {receipt}")
+            ),
+            [signer],
+            EVM_STEPS,
+            speculation=plan_speculation(total_steps, EVM_STEPS),
+        )
+        return self._run_steps(executor)
 
-        return receipt
+    def _run_steps(self, executor: StepExecutor) -> GetTransactionResp:
+        try:
+            return executor.run()
+        finally:
+            self.step_compute_units = executor.compute_units
 
-    def send_transaction_step_from_account(
+    def make_step_from_account(
         self,
         operator: Keypair,
         operator_balance_pubkey,
@@ -372,12 +487,11 @@ class EvmLoader(SolanaClient):
         storage_account,
         additional_accounts,
         steps_count,
-        signer: Keypair,
         system_program=sp.ID,
         compute_unit_price=None,
         tag=0x35,
         index=0,
-    ) -> GetTransactionResp:
+    ) -> Transaction:
         trx = TransactionWithComputeBudget(operator, compute_unit_price=compute_unit_price)
         trx.add(
             make_ExecuteTrxFromAccountDataIterativeOrContinue(
@@ -393,6 +507,34 @@ class EvmLoader(SolanaClient):
                 tag
             )
         )
+        return trx
+
+    def send_transaction_step_from_account(
+        self,
+        operator: Keypair,
+        operator_balance_pubkey,
+        treasury,
+        storage_account,
+        additional_accounts,
+        steps_count,
+        signer: Keypair,
+        system_program=sp.ID,
+        compute_unit_price=None,
+        tag=0x35,
+        index=0,
+    ) -> GetTransactionResp:
+        trx = self.make_step_from_account(
+            operator,
+            operator_balance_pubkey,
+            treasury,
+            storage_account,
+            additional_accounts,
+            steps_count,
+            system_program,
+            compute_unit_price,
+            tag,
+            index,
+        )
         return self.send_tx(trx, signer)
 
     def execute_transaction_steps_from_account(
@@ -402,77 +544,70 @@ class EvmLoader(SolanaClient):
         storage_account,
         additional_accounts,
         signer: Keypair = None,
-        compute_unit_price=None
+        compute_unit_price=None,
+        total_steps: tp.Optional[int] = None,
     ) -> GetTransactionResp:
-        signer = operator if signer is None else signer
-        operator_balance_pubkey = self.get_operator_balance_pubkey(operator)
-
-        index = 0
-        receipt = None
-        done = False
-        while not done:
-            receipt = self.send_transaction_step_from_account(
-                operator,
-                operator_balance_pubkey,
-                treasury,
-                storage_account,
-                additional_accounts,
-                EVM_STEPS,
-                signer,
-                index=index,
-                compute_unit_price=compute_unit_price
-            )
-            index += 1
-
-            if receipt.value.transaction.meta.err:
-                raise AssertionError(f"Can't deploy contract: {receipt.value.transaction.meta.err}")
-            for log in receipt.value.transaction.meta.log_messages:
-                if "exit_status" in log:
-                    done = True
-                    break
-                if "ExitError" in log:
-                    raise AssertionError(f"EVM Return error in logs: {receipt}")
-
-        return receipt
+        return self._execute_steps_from_account(
+            operator,
+            treasury,
+            storage_account,
+            additional_accounts,
+            signer,
+            compute_unit_price=compute_unit_price,
+            total_steps=total_steps,
+        )
 
     def execute_transaction_steps_from_account_no_chain_id(
-        self, operator: Keypair, treasury, storage_account, additional_accounts, signer: Keypair = None
+        self,
+        operator: Keypair,
+        treasury,
+        storage_account,
+        additional_accounts,
+        signer: Keypair = None,
+        total_steps: tp.Optional[int] = None,
+    ) -> GetTransactionResp:
+        return self._execute_steps_from_account(
+            operator, treasury, storage_account, additional_accounts, signer, tag=0x36, total_steps=total_steps
+        )
+
+    def _execute_steps_from_account(
+        self,
+        operator: Keypair,
+        treasury,
+        storage_account,
+        additional_accounts,
+        signer: tp.Optional[Keypair],
+        compute_unit_price=None,
+        tag=0x35,
+        total_steps: tp.Optional[int] = None,
     ) -> GetTransactionResp:
         signer = operator if signer is None else signer
         operator_balance_pubkey = self.get_operator_balance_pubkey(operator)
-        index = 0
-        receipt = None
-        done = False
-        while not done:
-            receipt = self.send_transaction_step_from_account(
+        executor = StepExecutor(
+            self,
+            lambda index, steps: self.make_step_from_account(
                 operator,
                 operator_balance_pubkey,
                 treasury,
                 storage_account,
                 additional_accounts,
-                EVM_STEPS,
-                signer,
-                tag=0x36,
-                index=index
-            )
-            index += 1
-
-            if receipt.value.transaction.meta.err:
-                raise AssertionError(f"Can't deploy contract: {receipt.value.transaction.meta.err}")
-            for log in receipt.value.transaction.meta.log_messages:
-                if "exit_status" in log:
-                    done = True
-                    break
-                if "ExitError" in log:
-                    raise AssertionError(f"EVM Return error in logs: {receipt}")
-
-        return receipt
+                steps,
+                compute_unit_price=compute_unit_price,
+                tag=tag,
+                index=index,
+            ),
+            [signer],
+            EVM_STEPS,
+            speculation=plan_speculation(total_steps, EVM_STEPS),
+            error_prefix="Can't deploy contract",
+        )
+        return self._run_steps(executor)
 
     def deposit_neon(self, operator_keypair: Keypair, ether_address: Union[str, bytes], amount: int):
         balance_pubkey = self.ether2balance(ether_address)
         contract_pubkey = Pubkey.from_string(self.ether2program(ether_address)[0])
 
-        evm_token_authority = Pubkey.find_program_address([b"Deposit"], self.loader_id)[0]
+        evm_token_authority = find_program_address([b"Deposit"], self.loader_id)[0]
         evm_pool_key = get_associated_token_address(evm_token_authority, NEON_TOKEN_MINT_ID)
 
         token_pubkey = get_associated_token_address(operator_keypair.pubkey(), NEON_TOKEN_MINT_ID)
@@ -547,7 +682,7 @@ class EvmLoader(SolanaClient):
         balance_pubkey = self.ether2balance(neon_account.address, chain_id)
         contract_pubkey = Pubkey.from_string(self.ether2program(neon_account.address)[0])
         associated_token_address = get_associated_token_address(solana_account.pubkey(), mint)
-        authority_pool = Pubkey.find_program_address([b"Deposit"], self.loader_id)[0]
+        authority_pool = find_program_address([b"Deposit"], self.loader_id)[0]
 
         pool = get_associated_token_address(authority_pool, mint)
 
@@ -0,0 +1,136 @@
+"""struct based decoders of the layouts from utils/layouts.py
+
+They parse the same bytes into lightweight records with the same field names and are much faster
+than construct, which matters when thousands of accounts are decoded. parse_array decodes a buffer
+of consecutive records into a NumPy structured array.
+"""
+import struct
+import typing as tp
+
+import numpy as np
+
+
+class Record:
+    """Base of generated records, fields are available as attributes and items like in construct Container"""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, item: str):
+        return getattr(self, item)
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(getattr(self, f) == getattr(other, f) for f in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def as_dict(self) -> tp.Dict[str, tp.Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+# struct format -> numpy dtype, bytes fields become uint8 sub-arrays to keep trailing zeros
+NUMPY_TYPES = {"B": "u1", "H": "<u2", "I": "<u4", "Q": "<u8"}
+
+
+class FastLayout:
+    def __init__(self, name: str, fields: tp.Sequence[tp.Tuple[str, str]]):
+        self.name = name
+        self.fields = [field for field, _ in fields]
+        self.formats = [fmt for _, fmt in fields]
+        self.struct = struct.Struct("<" + "".join(self.formats))
+        self.record_type: tp.Type[Record] = type(name, (Record,), {"__slots__": tuple(self.fields)})
+
+    def sizeof(self) -> int:
+        return self.struct.size
+
+    def parse(self, data: tp.Union[bytes, bytearray, memoryview]) -> Record:
+        """Decode the head of data, longer account data is fine as for construct parse"""
+        return self.record_type(*self.struct.unpack_from(data))
+
+    def parse_many(self, buffers: tp.Iterable[tp.Union[bytes, bytearray, memoryview]]) -> tp.List[Record]:
+        unpack_from = self.struct.unpack_from
+        record_type = self.record_type
+        return [record_type(*unpack_from(data)) for data in buffers]
+
+    def iter_unpack(self, data: tp.Union[bytes, bytearray, memoryview]) -> tp.List[Record]:
+        """Decode consecutive records without copying the buffer"""
+        record_type = self.record_type
+        return [record_type(*values) for values in self.struct.iter_unpack(memoryview(data))]
+
+    @property
+    def dtype(self) -> np.dtype:
+        items = []
+        for field, fmt in zip(self.fields, self.formats):
+            if fmt.endswith("s"):
+                items.append((field, "u1", (int(fmt[:-1]),)))
+            else:
+                items.append((field, NUMPY_TYPES[fmt]))
+        return np.dtype(items)
+
+    def parse_array(self, data: tp.Union[bytes, bytearray, memoryview]):
+        """Decode consecutive records into a NumPy structured array sharing memory with data"""
+        return np.frombuffer(data, dtype=self.dtype)
+
+    def stack(self, buffers: tp.Iterable[tp.Union[bytes, bytearray, memoryview]]):
+        """Structured array from heads of many account data buffers"""
+        size = self.sizeof()
+        return self.parse_array(b"".join(bytes(memoryview(data)[:size]) for data in buffers))
+
+
+HOLDER_ACCOUNT_INFO_LAYOUT = FastLayout(
+    "HolderAccountInfo",
+    [("tag", "B"), ("header_version", "B"), ("owner", "32s"), ("hash", "32s"), ("len", "Q"), ("heap_offset", "Q")],
+)
+
+FINALIZED_STORAGE_ACCOUNT_INFO_LAYOUT = FastLayout(
+    "FinalizedStorageAccountInfo",
+    [("tag", "B"), ("header_version", "B"), ("owner", "32s"), ("hash", "32s")],
+)
+
+CONTRACT_ACCOUNT_LAYOUT = FastLayout(
+    "ContractAccount",
+    [
+        ("type", "B"),
+        ("header_version", "B"),
+        ("address", "20s"),
+        ("chain_id", "Q"),
+        ("generation", "I"),
+        ("revision", "I"),
+    ],
+)
+
+BALANCE_ACCOUNT_LAYOUT = FastLayout(
+    "BalanceAccount",
+    [
+        ("type", "B"),
+        ("header_version", "B"),
+        ("address", "20s"),
+        ("chain_id", "Q"),
+        ("trx_count", "Q"),
+        ("balance", "32s"),
+    ],
+)
+
+OPERATOR_BALANCE_ACCOUNT_LAYOUT = FastLayout(
+    "OperatorBalanceAccount",
+    [
+        ("type", "B"),
+        ("header_version", "B"),
+        ("owner", "32s"),
+        ("address", "20s"),
+        ("chain_id", "Q"),
+        ("balance", "32s"),
+    ],
+)
+
+STORAGE_CELL_LAYOUT = FastLayout(
+    "StorageCell",
+    [("type", "B"), ("header_version", "B"), ("revision", "I")],
+)
+
+COUNTER_ACCOUNT_LAYOUT = FastLayout("CounterAccount", [("count", "Q")])
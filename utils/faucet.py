@@ -1,10 +1,17 @@
-import time
+import asyncio
 
 import requests
 import typing as tp
 import urllib.parse
 
-from utils.helpers import wait_condition
+from utils.helpers import (
+    BLOCKHASH_NOT_FOUND,
+    retry_on_blockhash_not_found,
+    step_exponential,
+    wait_condition,
+    wait_condition_async,
+)
+from utils.http_session import get_shared_session
 from utils.web3client import NeonChainWeb3Client
 
 
@@ -16,23 +23,62 @@ class Faucet:
         session: tp.Optional[tp.Any] = None,
     ):
         self._url = faucet_url
-        self._session = session or requests.Session()
+        self._session = session or get_shared_session()
         self.web3_client = web3_client
 
-    def request_neon(self, address: str, amount: int = 100) -> requests.Response:
+    def request_neon(self, address: str, amount: int = 100, wait_balance: bool = True) -> requests.Response:
+        """Without wait_balance the caller checks balances itself, e.g. for many accounts with one batch request"""
         assert address.startswith("0x")
         url = urllib.parse.urljoin(self._url, "request_neon")
-        balance_before = self.web3_client.get_balance(address)
-        response = self._session.post(url, json={"amount": amount, "wallet": address})
-        counter = 0
-        while "Blockhash not found" in response.text and counter < 3:
-            time.sleep(3)
-            response = self._session.post(url, json={"amount": amount, "wallet": address})
-            counter += 1
+        balance_before = self.web3_client.get_balance(address) if wait_balance else None
+        response = retry_on_blockhash_not_found(
+            lambda: self._session.post(url, json={"amount": amount, "wallet": address}),
+            result_text=lambda r: r.text,
+        )
         assert (
             response.ok
         ), "Faucet returned error: {}, status code: {}, url: {}".format(
             response.text, response.status_code, response.url
         )
-        wait_condition(lambda: self.web3_client.get_balance(address) > balance_before)
+        if not wait_balance:
+            return response
+        # the faucet answers after sending the transaction, so the balance usually changes in a moment
+        wait_condition(
+            lambda: self.web3_client.get_balance(address) > balance_before,
+            first_delay=0.1,
+            step_function=step_exponential(1.5),
+            max_delay=3,
+            jitter=0.2,
+        )
         return response
+
+
+class AsyncFaucet:
+    """asyncio counterpart of Faucet, web3_client is an AsyncNeonChainWeb3Client"""
+
+    def __init__(self, faucet_url: str, web3_client):
+        self._url = faucet_url
+        self.web3_client = web3_client
+
+    async def request_neon(self, address: str, amount: int = 100) -> str:
+        assert address.startswith("0x")
+        url = urllib.parse.urljoin(self._url, "request_neon")
+        balance_before = await self.web3_client.get_balance(address)
+        session = await self.web3_client.session()
+        for _ in range(4):
+            async with session.post(url, json={"amount": amount, "wallet": address}) as response:
+                text = await response.text()
+                ok = response.ok
+                status = response.status
+            if BLOCKHASH_NOT_FOUND not in text:
+                break
+            await asyncio.sleep(3)
+        assert ok, "Faucet returned error: {}, status code: {}, url: {}".format(text, status, url)
+
+        async def balance_changed():
+            return await self.web3_client.get_balance(address) > balance_before
+
+        await wait_condition_async(
+            balance_changed, first_delay=0.1, step_function=step_exponential(1.5), max_delay=3, jitter=0.2
+        )
+        return text
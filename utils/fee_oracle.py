@@ -0,0 +1,80 @@
+import logging
+import threading
+import time
+import typing as tp
+
+
+LOG = logging.getLogger(__name__)
+
+
+class FeeOracle:
+    """In-memory cache of chain fee parameters
+
+    A value is fetched from the chain when it's older than ttl. With a background refresher values are
+    kept fresh by the refresher thread, and a value up to max_staleness old is served without a request.
+    """
+
+    def __init__(
+        self,
+        fetchers: tp.Dict[str, tp.Callable[[], int]],
+        ttl: float = 1.0,
+        refresh_interval: tp.Optional[float] = None,
+        max_staleness: tp.Optional[float] = None,
+    ):
+        self._fetchers = fetchers
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness or max(ttl, 3 * (refresh_interval or 0))
+        self._values: tp.Dict[str, tp.Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresher: tp.Optional[threading.Thread] = None
+
+    def get(self, name: str) -> int:
+        cached = self._values.get(name)
+        if cached is not None:
+            value, updated_at = cached
+            age = time.monotonic() - updated_at
+            if age < self.ttl or (self.is_refreshing and age < self.max_staleness):
+                return value
+        return self.refresh(name)
+
+    def refresh(self, name: str) -> int:
+        value = self._fetchers[name]()
+        with self._lock:
+            self._values[name] = (value, time.monotonic())
+        return value
+
+    def invalidate(self, name: tp.Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
+
+    @property
+    def is_refreshing(self) -> bool:
+        return self._refresher is not None and self._refresher.is_alive()
+
+    def start(self) -> None:
+        if self.refresh_interval is None or self.is_refreshing:
+            return
+        self._stop_event.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="fee-oracle-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._refresher is not None:
+            self._refresher.join(timeout=self.refresh_interval)
+        self._refresher = None
+
+    def _refresh_loop(self) -> None:
+        while not self._stop_event.is_set():
+            # refresh only values somebody asked for
+            for name in list(self._values):
+                try:
+                    self.refresh(name)
+                except Exception as e:
+                    LOG.warning(f"Can't refresh {name}: {e}")
+            self._stop_event.wait(self.refresh_interval)
@@ -0,0 +1,100 @@
+import logging
+import typing as tp
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import web3
+from eth_account.signers.local import LocalAccount
+
+from utils.helpers import step_exponential, wait_condition
+from utils.nonce_manager import account_file_lock
+from utils.web3client import NeonChainWeb3Client
+
+
+LOG = logging.getLogger(__name__)
+
+TRANSFER_GAS_MULTIPLIER = 1.2
+
+
+@allure.step("Fund accounts")
+def fund_accounts(
+    web3_client: NeonChainWeb3Client,
+    addresses: tp.Sequence[str],
+    amount: tp.Union[int, float],
+    faucet=None,
+    bank_account: tp.Optional[LocalAccount] = None,
+    max_in_flight: int = 16,
+    timeout: float = 120,
+) -> None:
+    """Send amount NEON to every address and wait until all balances are updated
+
+    With bank_account transfers are sent back-to-back with locally counted nonces under a lock of the bank account
+    shared by processes, otherwise faucet requests go in parallel. In both cases balances are confirmed by batched
+    eth_getBalance sweeps instead of per-account polls.
+    """
+    if not addresses:
+        return
+    value = web3.Web3.to_wei(amount, "ether")
+    expected = [balance + value for balance in web3_client.get_balances(addresses)]
+
+    if bank_account is not None:
+        _fund_from_bank(web3_client, addresses, value, bank_account, max_in_flight, timeout)
+    elif faucet is not None:
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="faucet") as executor:
+            list(executor.map(lambda address: faucet.request_neon(address, amount, wait_balance=False), addresses))
+    else:
+        raise ValueError("Faucet or bank account is required to fund accounts")
+
+    def all_funded() -> bool:
+        balances = web3_client.get_balances(addresses)
+        return all(balance >= expected_balance for balance, expected_balance in zip(balances, expected))
+
+    wait_condition(all_funded, timeout_sec=timeout, first_delay=0.2, step_function=step_exponential(1.5), max_delay=3)
+    LOG.info(f"Funded {len(addresses)} accounts with {amount} NEON")
+
+
+def _fund_from_bank(
+    web3_client: NeonChainWeb3Client,
+    addresses: tp.Sequence[str],
+    value: int,
+    bank_account: LocalAccount,
+    max_in_flight: int,
+    timeout: float,
+) -> None:
+    # plain transfers cost the same, so gas is estimated once for all of them
+    gas = web3_client.eth.estimate_gas({"from": bank_account.address, "to": addresses[0], "value": value})
+    gas = int(gas * TRANSFER_GAS_MULTIPLIER)
+    transactions = [{"to": address, "value": value, "gas": gas} for address in addresses]
+    # nonces are counted from one eth_getTransactionCount, other xdist workers wait until the transfers are mined
+    with account_file_lock(bank_account.address):
+        futures = web3_client.send_transactions_pipelined(
+            bank_account, transactions, max_in_flight=max_in_flight, timeout=timeout
+        )
+    # sending stops on the first error, then the last future keeps it
+    for address, future in zip(addresses, futures):
+        receipt = future.result()
+        assert receipt["status"] == 1, f"Transfer to {address} failed: {receipt}"
+
+
+@allure.step("Create funded accounts")
+def create_funded_accounts(
+    web3_client: NeonChainWeb3Client,
+    count: int,
+    amount: tp.Union[int, float],
+    faucet=None,
+    bank_account: tp.Optional[LocalAccount] = None,
+    max_in_flight: int = 16,
+    timeout: float = 120,
+) -> tp.List[LocalAccount]:
+    accounts = [web3_client.create_account() for _ in range(count)]
+    if amount > 0:
+        fund_accounts(
+            web3_client,
+            [account.address for account in accounts],
+            amount,
+            faucet=faucet,
+            bank_account=bank_account,
+            max_in_flight=max_in_flight,
+            timeout=timeout,
+        )
+    return accounts
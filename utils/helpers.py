@@ -1,7 +1,12 @@
+import asyncio
+import collections
 import os
 import pathlib
+import time
 import random
 import string
+import sys
+import threading
 import typing
 import typing as tp
 import logging
@@ -18,6 +23,8 @@ from solcx import link_code
 import polling2
 from semantic_version import Version
 
+from utils.compilation_cache import compilation_cache, contracts_bundle, contracts_manifest
+
 
 T = tp.TypeVar('T')
 
@@ -29,6 +36,34 @@ def get_contract_abi(name, compiled):
             return compiled[key]
 
 
+def compile_contract(
+    contract_path: pathlib.Path,
+    version: str,
+    import_remapping: tp.Optional[dict] = None,
+) -> dict:
+    """Take compiled contract from the contracts bundle or the compilation cache or compile it with solc"""
+    contracts_manifest.record(contract_path, version, import_remapping=import_remapping)
+    key = compilation_cache.make_key(contract_path, version, import_remapping=import_remapping, optimize=True)
+    compiled = contracts_bundle.get_solc(key) or compilation_cache.get(key)
+    if compiled is not None:
+        return compiled
+
+    with compilation_cache.lock_key(key):
+        compiled = compilation_cache.get(key)
+        if compiled is None:
+            solcx.install_solc(version)
+            compiled = solcx.compile_files(
+                [contract_path],
+                output_values=["abi", "bin"],
+                solc_version=Version(version),
+                import_remappings=import_remapping,
+                allow_paths=["."],
+                optimize=True,
+            )  # this allow_paths isn't very good...
+            compilation_cache.set(key, compiled)
+    return compiled
+
+
 @allure.step("Get contract interface")
 def get_contract_interface(
     contract: str,
@@ -45,7 +80,6 @@ def get_contract_interface(
         else:
             contract_name = contract.rsplit(".", 1)[0]
 
-    solcx.install_solc(version)
     if contract.startswith("/"):
         contract_path = pathlib.Path(contract)
     else:
@@ -55,14 +89,7 @@ def get_contract_interface(
 
     assert contract_path.exists(), f"Can't found contract: {contract_path}"
 
-    compiled = solcx.compile_files(
-        [contract_path],
-        output_values=["abi", "bin"],
-        solc_version=Version(version),
-        import_remappings=import_remapping,
-        allow_paths=["."],
-        optimize=True,
-    )  # this allow_paths isn't very good...
+    compiled = compile_contract(contract_path, version, import_remapping=import_remapping)
     contract_interface = get_contract_abi(contract_name, compiled)
     if libraries:
         contract_interface["bin"] = link_code(contract_interface["bin"], libraries)
@@ -93,11 +120,131 @@ def generate_text(min_len: int = 2, max_len: int = 200, simple: bool = True) ->
     return "".join(random.choice(chars) for _i in range(length)).strip()
 
 
+# call site -> counters of wait_condition calls made from it
+POLL_STATS: tp.Dict[str, tp.Dict[str, float]] = collections.defaultdict(
+    lambda: {"calls": 0, "polls": 0, "seconds": 0.0, "timeouts": 0}
+)
+_poll_stats_lock = threading.Lock()
+# (kind, endpoint) -> (block or slot time, when it was measured)
+_block_time_cache: tp.Dict[tp.Tuple[str, str], tp.Tuple[float, float]] = {}
+BLOCK_TIME_CACHE_TTL = 60
+
+
+def step_exponential(factor: float = 2.0) -> tp.Callable[[float], float]:
+    """Step function for wait_condition, use it with max_delay to cap the growth"""
+    return lambda step: step * factor
+
+
+def make_step_schedule(
+        delay: float,
+        step_function: tp.Callable[[float], float] = polling2.step_constant,
+        first_delay: tp.Optional[float] = None,
+        max_delay: tp.Optional[float] = None,
+        jitter: float = 0.0,
+) -> tp.Tuple[float, tp.Callable[[float], float]]:
+    """Return the first sleep and the step function for polling2
+
+    first_delay is a short sleep before the second probe, after it sleeps go as delay, step_function(delay), ...
+    Each sleep is capped by max_delay and multiplied by a random factor from [1 - jitter, 1 + jitter],
+    the jitter is not accumulated between steps.
+    """
+    base = delay
+    first_pending = first_delay is not None
+
+    def shape(value: float) -> float:
+        if max_delay is not None:
+            value = min(value, max_delay)
+        if jitter:
+            value *= random.uniform(1 - jitter, 1 + jitter)
+        return value
+
+    def next_step(_: float) -> float:
+        nonlocal base, first_pending
+        if first_pending:
+            first_pending = False
+        else:
+            base = step_function(base)
+            if max_delay is not None:
+                base = min(base, max_delay)
+        return shape(base)
+
+    initial = first_delay if first_delay is not None else shape(delay)
+    return initial, next_step
+
+
+def _call_site() -> str:
+    """file:line of the code which called wait_condition, skipping allure step wrappers"""
+    frame = sys._getframe(1)  # noqa
+    while frame is not None and (frame.f_code.co_filename == __file__ or "allure" in frame.f_code.co_filename):
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{os.path.relpath(frame.f_code.co_filename)}:{frame.f_lineno}"
+
+
+def _record_poll_stats(call_site: str, polls: int, seconds: float, timed_out: bool) -> None:
+    with _poll_stats_lock:
+        stats = POLL_STATS[call_site]
+        stats["calls"] += 1
+        stats["polls"] += polls
+        stats["seconds"] += seconds
+        stats["timeouts"] += int(timed_out)
+
+
+def merge_poll_stats(stats: tp.Dict[str, tp.Dict[str, float]]) -> None:
+    """Add stats of another process, e.g. of a pytest-xdist worker, to POLL_STATS"""
+    with _poll_stats_lock:
+        for call_site, site_stats in stats.items():
+            for key, value in site_stats.items():
+                POLL_STATS[call_site][key] += value
+
+
+def get_poll_stats(top: tp.Optional[int] = None) -> tp.List[tp.Tuple[str, tp.Dict[str, float]]]:
+    """wait_condition call sites sorted by the total time spent in polling"""
+    with _poll_stats_lock:
+        items = [(call_site, dict(stats)) for call_site, stats in POLL_STATS.items()]
+    items.sort(key=lambda item: item[1]["seconds"], reverse=True)
+    return items[:top] if top is not None else items
+
+
+def observed_block_time(web3_client: tp.Any, blocks: int = 10, default: float = 0.5) -> float:
+    """Average time between the last neon blocks, cached for BLOCK_TIME_CACHE_TTL seconds"""
+    key = ("neon", web3_client._proxy_url)  # noqa
+    cached = _block_time_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < BLOCK_TIME_CACHE_TTL:
+        return cached[0]
+    try:
+        latest = web3_client.get_block_number_by_id("latest")
+        earlier = web3_client.get_block_number_by_id(max(latest.number - blocks, 0))
+        block_time = (latest.timestamp - earlier.timestamp) / max(latest.number - earlier.number, 1)
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Can't measure block time, use {default}: {e}")
+        return default
+    _block_time_cache[key] = (block_time, time.monotonic())
+    return block_time
+
+
+def observed_slot_time(solana_client: tp.Any, default: float = 0.5) -> float:
+    """Average solana slot time from the last performance sample, cached for BLOCK_TIME_CACHE_TTL seconds"""
+    key = ("solana", solana_client.endpoint)
+    cached = _block_time_cache.get(key)
+    if cached is not None and time.monotonic() - cached[1] < BLOCK_TIME_CACHE_TTL:
+        return cached[0]
+    try:
+        sample = solana_client.get_recent_performance_samples(1).value[0]
+        slot_time = sample.sample_period_secs / max(sample.num_slots, 1)
+    except Exception as e:
+        logging.getLogger(__name__).debug(f"Can't measure slot time, use {default}: {e}")
+        return default
+    _block_time_cache[key] = (slot_time, time.monotonic())
+    return slot_time
+
+
 @allure.step("Wait condition")
 def wait_condition(
         func_cond: tp.Callable[..., T],
         timeout_sec: float = 15,
-        delay: float = 0.5,
+        delay: tp.Union[float, tp.Callable[[], float]] = 0.5,
         args: tp.Tuple = (),
         kwargs: tp.Optional[dict[str, tp.Any]] = None,
         max_tries: tp.Optional[int] = None,
@@ -107,23 +254,118 @@ def wait_condition(
         poll_forever: bool = False,
         collect_values: tp.Optional[Queue] = None,
         log: int = logging.NOTSET,
-        log_error: int = logging.NOTSET
+        log_error: int = logging.NOTSET,
+        first_delay: tp.Optional[float] = None,
+        max_delay: tp.Optional[float] = None,
+        jitter: float = 0.0,
 ):
-    return polling2.poll(
-        target=func_cond,
-        timeout=timeout_sec,
-        step=delay,
-        args=args,
-        kwargs=kwargs,
-        max_tries=max_tries,
-        check_success=check_success,
-        step_function=step_function,
-        ignore_exceptions=ignore_exceptions,
-        poll_forever=poll_forever,
-        collect_values=collect_values,
-        log=log,
-        log_error=log_error,
-    )
+    """polling2.poll with adaptive delays
+
+    delay can be a callable, e.g. `lambda: observed_slot_time(sol_client)`, to wait in slots instead of seconds.
+    See make_step_schedule for first_delay, max_delay and jitter. Poll counts are collected in POLL_STATS.
+    """
+    call_site = _call_site()
+    if callable(delay):
+        delay = delay()
+    step, step_function = make_step_schedule(delay, step_function, first_delay, max_delay, jitter)
+    polls = 0
+
+    def target(*target_args, **target_kwargs):
+        nonlocal polls
+        polls += 1
+        return func_cond(*target_args, **target_kwargs)
+
+    started = time.monotonic()
+    timed_out = False
+    try:
+        return polling2.poll(
+            target=target,
+            timeout=timeout_sec,
+            step=step,
+            args=args,
+            kwargs=kwargs,
+            max_tries=max_tries,
+            check_success=check_success,
+            step_function=step_function,
+            ignore_exceptions=ignore_exceptions,
+            poll_forever=poll_forever,
+            collect_values=collect_values,
+            log=log,
+            log_error=log_error,
+        )
+    except (polling2.TimeoutException, polling2.MaxCallException):
+        timed_out = True
+        raise
+    finally:
+        _record_poll_stats(call_site, polls, time.monotonic() - started, timed_out)
+
+
+async def wait_condition_async(
+        func_cond: tp.Callable[..., tp.Awaitable[T]],
+        timeout_sec: float = 15,
+        delay: float = 0.5,
+        check_success: tp.Callable[[T], bool] = polling2.is_truthy,
+        step_function: tp.Callable[[float], float] = polling2.step_constant,
+        ignore_exceptions: tp.Tuple[Exception, ...] = (KeyError,),
+        first_delay: tp.Optional[float] = None,
+        max_delay: tp.Optional[float] = None,
+        jitter: float = 0.0,
+) -> T:
+    """wait_condition for coroutine functions, raises polling2.TimeoutException as the sync one"""
+    call_site = _call_site()
+    step, step_function = make_step_schedule(delay, step_function, first_delay, max_delay, jitter)
+    started = time.monotonic()
+    deadline = started + timeout_sec
+    last_value = None
+    polls = 0
+    timed_out = False
+    try:
+        while True:
+            polls += 1
+            try:
+                last_value = await func_cond()
+                if check_success(last_value):
+                    return last_value
+            except ignore_exceptions:
+                pass
+            if time.monotonic() + step > deadline:
+                timed_out = True
+                raise polling2.TimeoutException(Queue(), last=last_value)
+            await asyncio.sleep(step)
+            step = step_function(step)
+    finally:
+        _record_poll_stats(call_site, polls, time.monotonic() - started, timed_out)
+
+
+BLOCKHASH_NOT_FOUND = "Blockhash not found"
+
+
+def retry_on_blockhash_not_found(
+        send: tp.Callable[[], T],
+        attempts: int = 4,
+        delay: float = 3,
+        result_text: tp.Optional[tp.Callable[[T], str]] = None,
+        on_retry: tp.Optional[tp.Callable[[], tp.Any]] = None,
+) -> T:
+    """Repeat send while it fails with "Blockhash not found"
+
+    The error is looked for in the exception message and, with result_text, in the text of the result.
+    on_retry is called before every next attempt, e.g. to take a fresh blockhash instead of the sleep.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            result = send()
+        except Exception as e:
+            if attempt == attempts or BLOCKHASH_NOT_FOUND not in str(e):
+                raise
+        else:
+            if attempt == attempts or result_text is None or BLOCKHASH_NOT_FOUND not in result_text(result):
+                return result
+        logging.getLogger(__name__).info(f"{BLOCKHASH_NOT_FOUND}, attempt {attempt} of {attempts}")
+        if on_retry is not None:
+            on_retry()
+        else:
+            time.sleep(delay)
 
 
 @allure.step("Decode function signature")
@@ -0,0 +1,56 @@
+import os
+import threading
+import typing as tp
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+POOL_SIZE = int(os.environ.get("NEON_TESTS_HTTP_POOL_SIZE", 100))
+RETRIES = int(os.environ.get("NEON_TESTS_HTTP_RETRIES", 3))
+BACKOFF_FACTOR = float(os.environ.get("NEON_TESTS_HTTP_BACKOFF", 0.3))
+# load balancer errors, retried only for idempotent methods: the backend may have processed the request
+RETRY_STATUSES = (502, 503, 504)
+
+_shared_session: tp.Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def make_session(
+    pool_size: int = POOL_SIZE,
+    retries: int = RETRIES,
+    backoff_factor: float = BACKOFF_FACTOR,
+    pool_block: bool = False,
+    status_forcelist: tp.Collection[int] = RETRY_STATUSES,
+) -> requests.Session:
+    """Session with keep-alive connection pool and retries of failed connections
+
+    Read errors and error statuses of POST are not retried: a JSON-RPC call which reached the server
+    may not be idempotent.
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry, pool_block=pool_block)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """Process-wide session, so small calls of all clients reuse already opened TLS connections"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = make_session()
+    return _shared_session
@@ -10,8 +10,9 @@ def k6_prepare_accounts(erc20, account_manager, users, balance, erc20_balance):
 
     # We create 2 accounts for each k6 virtual user: sender and receiver.
     # We need to create 2*VU accounts cause we want to make sure account's nonces is not overlapping.
-    for i in range(2*int(users)):
-        account_sender = account_manager.create_account(balance=int(balance))
+    # senders are funded all together, receivers don't need a balance
+    senders = account_manager.create_accounts(2*int(users), balance=int(balance))
+    for i, account_sender in enumerate(senders):
         account_receiver = account_manager.create_account(balance=0)
         accounts[i] = {"sender_address": str(account_sender.address), 
                        "sender_key": str(account_sender.key.hex())[2:], 
@@ -12,6 +12,7 @@ from solana.transaction import AccountMeta, Instruction
 import enum
 
 from utils.helpers import wait_condition
+from utils.pda import find_program_address
 
 
 METADATA_PROGRAM_ID = Pubkey.from_string('metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s')
@@ -189,14 +190,14 @@ CreateInstruction = Struct(
 
 
 def get_metadata_account(mint_key: Pubkey):
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b'metadata', bytes(METADATA_PROGRAM_ID), bytes(mint_key)],
         METADATA_PROGRAM_ID
     )[0]
 
 
 def get_edition(mint_key: Pubkey):
-    return Pubkey.find_program_address(
+    return find_program_address(
         [b'metadata', bytes(METADATA_PROGRAM_ID), bytes(mint_key), b"edition"],
         METADATA_PROGRAM_ID
     )[0]
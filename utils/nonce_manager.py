@@ -0,0 +1,70 @@
+import logging
+import pathlib
+import tempfile
+import threading
+import typing as tp
+
+from filelock import FileLock
+
+
+LOG = logging.getLogger(__name__)
+
+NONCE_ERRORS = ("nonce too low", "nonce too high", "nonce has already been used", "invalid nonce")
+# the proxy rejected the transaction for its nonce or price, so the nonce is not used on chain
+RESYNC_ERRORS = NONCE_ERRORS + ("underpriced",)
+
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+
+def is_resync_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in RESYNC_ERRORS)
+
+
+class NonceManager:
+    """Hands out sequential nonces per account without eth_getTransactionCount on every transaction
+
+    The first nonce of an account is taken from the chain, next ones are counted locally.
+    The lock is a threading one, so it is gevent-safe after locust monkey patching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._account_locks: tp.Dict[tp.Tuple[int, str], threading.Lock] = {}
+        self._nonces: tp.Dict[tp.Tuple[int, str], int] = {}
+
+    def _account_lock(self, key: tp.Tuple[int, str]) -> threading.Lock:
+        with self._lock:
+            return self._account_locks.setdefault(key, threading.Lock())
+
+    def allocate(self, web3_client, address: str) -> int:
+        key = (web3_client.chain_id, address.lower())
+        with self._account_lock(key):
+            if key not in self._nonces:
+                self._nonces[key] = web3_client.get_nonce(address)
+                LOG.debug(f"Nonce for {address} synced from chain: {self._nonces[key]}")
+            nonce = self._nonces[key]
+            self._nonces[key] += 1
+        return nonce
+
+    def reset(self, web3_client, address: str) -> None:
+        """Forget local nonce, the next allocate syncs it from the chain"""
+        key = (web3_client.chain_id, address.lower())
+        with self._account_lock(key):
+            self._nonces.pop(key, None)
+        LOG.info(f"Nonce for {address} will be re-synced from chain")
+
+
+def account_file_lock(address: str) -> FileLock:
+    """Lock of an account shared by processes, e.g. the bank account all pytest-xdist workers send from
+
+    Hold it from reading the nonce until the transactions are in the chain, so processes don't send the same nonces.
+    """
+    path = pathlib.Path(tempfile.gettempdir()) / f"neon-tests-account-{address.lower()}.lock"
+    return FileLock(path, is_singleton=True)
+
+
+nonce_manager = NonceManager()
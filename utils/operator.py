@@ -6,11 +6,13 @@ import typing as tp
 import solana.rpc.api
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from solana.rpc.commitment import Confirmed, Commitment
+from solana.rpc.commitment import Confirmed
 from eth_keys import keys as eth_keys
 
+from utils.account_reader import get_lamports, read_accounts
 from utils.consts import OPERATOR_KEYPAIR_PATH
-from utils.layouts import OPERATOR_BALANCE_ACCOUNT_LAYOUT
+from utils.fast_layouts import OPERATOR_BALANCE_ACCOUNT_LAYOUT
+from utils.pda import find_program_address
 from utils.web3client import NeonChainWeb3Client
 
 
@@ -55,28 +57,19 @@ class Operator:
             operator_pubkey_bytes,
             operator_ether,
             w3_client.chain_id.to_bytes(32, byteorder="big"))
-        balance_account, _ = Pubkey.find_program_address(seed_list, Pubkey.from_string(self.evm_loader))
+        balance_account, _ = find_program_address(seed_list, Pubkey.from_string(self.evm_loader))
         return balance_account
 
     def get_solana_balance(self):
-        balances = []
-        for keypair in self.operator_keypairs:
-            balance = self.sol.get_balance(keypair.pubkey(), commitment=Confirmed)
-            if isinstance(balance, dict):
-                balance = balance["result"]["value"]
-            else:
-                balance = balance.value
-            balances.append(balance)
-        return sum(balances)
+        pubkeys = [keypair.pubkey() for keypair in self.operator_keypairs]
+        return sum(get_lamports(self.sol, pubkeys, commitment=Confirmed))
 
     def get_token_balance(self, w3_client=None):
         if w3_client is None:
             w3_client = self.web3
-        balances = []
-        for operator in self.operator_keypairs:
-            token_addr = self.get_operator_balance_account(operator, w3_client)
-            info: bytes = self.sol.get_account_info(token_addr, commitment=Commitment("confirmed")).value.data
-            layout = OPERATOR_BALANCE_ACCOUNT_LAYOUT.parse(info)
-            amount = int.from_bytes(layout.balance, byteorder="little")
-            balances.append(amount)
-        return sum(balances)
+        token_addrs = [self.get_operator_balance_account(operator, w3_client) for operator in self.operator_keypairs]
+        records = read_accounts(self.sol, token_addrs, OPERATOR_BALANCE_ACCOUNT_LAYOUT, commitment=Confirmed)
+        missing = [str(addr) for addr, record in zip(token_addrs, records) if record is None]
+        if missing:
+            raise AssertionError(f"Operator balance accounts don't exist: {', '.join(missing)}")
+        return sum(int.from_bytes(record.balance, byteorder="little") for record in records)
@@ -0,0 +1,86 @@
+import collections
+import os
+import threading
+import typing as tp
+from concurrent.futures import ProcessPoolExecutor
+
+from solders.pubkey import Pubkey
+
+
+PDA_CACHE_SIZE = int(os.environ.get("NEON_TESTS_PDA_CACHE_SIZE", 65536))
+# below this number of misses the process pool start costs more than the derivation
+BULK_PROCESS_POOL_THRESHOLD = 512
+
+CacheKey = tp.Tuple[tp.Tuple[bytes, ...], bytes]
+
+_cache: "collections.OrderedDict[CacheKey, tp.Tuple[Pubkey, int]]" = collections.OrderedDict()
+_lock = threading.Lock()
+
+
+def _key(seeds: tp.Sequence[bytes], program_id: Pubkey) -> CacheKey:
+    return tuple(bytes(seed) for seed in seeds), bytes(program_id)
+
+
+def _get(key: CacheKey) -> tp.Optional[tp.Tuple[Pubkey, int]]:
+    with _lock:
+        value = _cache.get(key)
+        if value is not None:
+            _cache.move_to_end(key)
+        return value
+
+
+def _put(key: CacheKey, value: tp.Tuple[Pubkey, int]) -> None:
+    with _lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > PDA_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def find_program_address(seeds: tp.Sequence[bytes], program_id: Pubkey) -> tp.Tuple[Pubkey, int]:
+    """Pubkey.find_program_address with a bounded LRU cache, derivations are pure so they never go stale"""
+    key = _key(seeds, program_id)
+    value = _get(key)
+    if value is None:
+        value = Pubkey.find_program_address(list(key[0]), program_id)
+        _put(key, value)
+    return value
+
+
+def _derive_chunk(keys: tp.List[CacheKey]) -> tp.List[tp.Tuple[bytes, int]]:
+    results = []
+    for seeds, program_id in keys:
+        address, bump = Pubkey.find_program_address(list(seeds), Pubkey.from_bytes(program_id))
+        results.append((bytes(address), bump))
+    return results
+
+
+def find_program_addresses(
+    seeds_list: tp.Sequence[tp.Sequence[bytes]],
+    program_id: Pubkey,
+    processes: tp.Optional[int] = None,
+) -> tp.List[tp.Tuple[Pubkey, int]]:
+    """Derive many addresses of one program, misses are spread over a process pool when there are many of them"""
+    keys = [_key(seeds, program_id) for seeds in seeds_list]
+    results: tp.List[tp.Optional[tp.Tuple[Pubkey, int]]] = [_get(key) for key in keys]
+    missing = list(dict.fromkeys(key for key, result in zip(keys, results) if result is None))
+
+    if len(missing) < BULK_PROCESS_POOL_THRESHOLD or processes == 1:
+        derived = _derive_chunk(missing)
+    else:
+        processes = processes or os.cpu_count() or 1
+        chunk_size = -(-len(missing) // processes)
+        chunks = [missing[start: start + chunk_size] for start in range(0, len(missing), chunk_size)]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            derived = [item for chunk_result in executor.map(_derive_chunk, chunks) for item in chunk_result]
+
+    derived_by_key = {}
+    for key, (address, bump) in zip(missing, derived):
+        derived_by_key[key] = (Pubkey.from_bytes(address), bump)
+        _put(key, derived_by_key[key])
+    return [result if result is not None else derived_by_key[key] for key, result in zip(keys, results)]
+
+
+def cache_info() -> tp.Dict[str, int]:
+    with _lock:
+        return {"size": len(_cache), "max_size": PDA_CACHE_SIZE}
@@ -0,0 +1,185 @@
+import functools
+import json
+import logging
+import threading
+import time
+import typing as tp
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import web3.types
+from hexbytes import HexBytes
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+from web3.exceptions import TimeExhausted
+
+
+LOG = logging.getLogger(__name__)
+
+
+class ReceiptWatcher:
+    """Waits for receipts of many transactions with one request per block instead of one poll loop per transaction
+
+    Pending hashes are checked together by a JSON-RPC batch of eth_getTransactionReceipt. With ws_url the check
+    runs on every newHeads notification from eth_subscribe, otherwise every poll_interval seconds.
+    The watcher thread runs only while there are pending transactions. on_receipt is called with the hash and the
+    receipt of every watched transaction, whether it is waited by wait, wait_all or a future from watch.
+    """
+
+    def __init__(
+        self,
+        web3_client,
+        poll_interval: float = 0.5,
+        ws_url: tp.Optional[str] = None,
+        max_batch_size: int = 100,
+        on_receipt: tp.Optional[tp.Callable[[str, web3.types.TxReceipt], None]] = None,
+    ):
+        self.web3_client = web3_client
+        self.poll_interval = poll_interval
+        self.ws_url = ws_url
+        self.max_batch_size = max_batch_size
+        self.on_receipt = on_receipt
+        # tx hash -> (future, time when the watcher stops looking for it)
+        self._pending: tp.Dict[str, tp.Tuple[Future, float]] = {}
+        self._lock = threading.Lock()
+        self._new_block = threading.Event()
+        self._thread: tp.Optional[threading.Thread] = None
+
+    def watch(self, tx_hash: tp.Union[str, bytes], timeout: float = 120) -> "Future[web3.types.TxReceipt]":
+        tx_hash = tx_hash if isinstance(tx_hash, str) else HexBytes(tx_hash).hex()
+        expires_at = time.monotonic() + timeout
+        with self._lock:
+            if tx_hash in self._pending:
+                future, pending_expires_at = self._pending[tx_hash]
+                self._pending[tx_hash] = (future, max(expires_at, pending_expires_at))
+            else:
+                future = Future()
+                if self.on_receipt is not None:
+                    future.add_done_callback(functools.partial(self._notify, tx_hash))
+                self._pending[tx_hash] = (future, expires_at)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="receipt-watcher", daemon=True)
+                self._thread.start()
+        return future
+
+    def wait(self, tx_hash: tp.Union[str, bytes], timeout: float = 120) -> web3.types.TxReceipt:
+        """Drop-in replacement of web3 wait_for_transaction_receipt"""
+        future = self.watch(tx_hash, timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise self._timeout_error(tx_hash, timeout)
+
+    def wait_all(
+        self, tx_hashes: tp.Iterable[tp.Union[str, bytes]], timeout: float = 120
+    ) -> tp.List[web3.types.TxReceipt]:
+        deadline = time.monotonic() + timeout
+        futures = [(tx_hash, self.watch(tx_hash, timeout)) for tx_hash in tx_hashes]
+        receipts = []
+        for tx_hash, future in futures:
+            try:
+                receipts.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+            except FutureTimeoutError:
+                raise self._timeout_error(tx_hash, timeout)
+        return receipts
+
+    def _notify(self, tx_hash: str, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        try:
+            self.on_receipt(tx_hash, future.result())
+        except Exception as e:
+            LOG.warning(f"Receipt callback failed for {tx_hash}: {e}")
+
+    @staticmethod
+    def _timeout_error(tx_hash: tp.Union[str, bytes], timeout: tp.Optional[float] = None) -> TimeExhausted:
+        waited = f"{timeout} seconds" if timeout is not None else "the timeout"
+        return TimeExhausted(f"Transaction {HexBytes(tx_hash).hex()} is not in the chain after {waited}")
+
+    def _run(self) -> None:
+        subscription = None
+        # every run has its own subscription, it stops with the run even if watch() starts the next one meanwhile
+        stop_subscription = threading.Event()
+        if self.ws_url is not None:
+            subscription = threading.Thread(
+                target=self._follow_new_heads, args=(stop_subscription,), name="receipt-watcher-ws", daemon=True
+            )
+            subscription.start()
+        try:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        self._thread = None
+                        return
+                if subscription is not None and subscription.is_alive():
+                    # poll_interval based check is a safety net for lost notifications
+                    self._new_block.wait(10 * self.poll_interval)
+                else:
+                    self._new_block.wait(self.poll_interval)
+                self._new_block.clear()
+                try:
+                    self._check_pending()
+                except Exception as e:
+                    LOG.warning(f"Can't get transaction receipts: {e}")
+        finally:
+            stop_subscription.set()
+
+    @staticmethod
+    def _format_receipt(receipt: dict) -> web3.types.TxReceipt:
+        """Batch returns raw json, format it the way wait_for_transaction_receipt does"""
+        return AttributeDict.recursive(receipt_formatter(receipt))
+
+    def _check_pending(self) -> None:
+        with self._lock:
+            tx_hashes = list(self._pending)
+        try:
+            for start in range(0, len(tx_hashes), self.max_batch_size):
+                chunk = tx_hashes[start: start + self.max_batch_size]
+                receipts = self.web3_client.get_transaction_receipts(chunk)
+                for tx_hash, receipt in zip(chunk, receipts):
+                    if receipt is None:
+                        continue
+                    with self._lock:
+                        future, _ = self._pending.pop(tx_hash, (None, None))
+                    if future is None or future.done():
+                        continue
+                    try:
+                        future.set_result(self._format_receipt(receipt))
+                    except Exception as e:
+                        future.set_exception(e)
+        finally:
+            # expired transactions fail even when the proxy doesn't answer
+            self._expire_pending()
+
+    def _expire_pending(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            expired = [tx_hash for tx_hash, (_, expires_at) in self._pending.items() if expires_at < now]
+            for tx_hash in expired:
+                future, _ = self._pending.pop(tx_hash)
+                if not future.done():
+                    future.set_exception(self._timeout_error(tx_hash))
+
+    def _follow_new_heads(self, stop: threading.Event) -> None:
+        try:
+            from websockets.sync.client import connect
+        except ImportError:
+            LOG.warning("websockets sync client is not available, receipts are polled")
+            return
+        try:
+            with connect(self.ws_url) as ws:
+                ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+                response = json.loads(ws.recv())
+                if "error" in response:
+                    LOG.warning(f"newHeads subscription to {self.ws_url} is rejected, receipts are polled: {response}")
+                    return
+                while not stop.is_set():
+                    try:
+                        # the timeout lets a stopped run close the connection without waiting for a block
+                        ws.recv(timeout=10 * self.poll_interval)
+                    except TimeoutError:
+                        continue
+                    self._new_block.set()
+        except Exception as e:
+            LOG.warning(f"newHeads subscription to {self.ws_url} failed, receipts are polled: {e}")
+        finally:
+            self._new_block.set()
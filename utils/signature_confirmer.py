@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+import typing as tp
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from solana.rpc.commitment import Commitment, Confirmed
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus, TransactionStatus
+
+
+LOG = logging.getLogger(__name__)
+
+# getSignatureStatuses accepts up to 256 signatures
+MAX_SIGNATURES_PER_REQUEST = 256
+COMMITMENT_ORDER = ["processed", "confirmed", "finalized"]
+CONFIRMATION_STATUS_ORDER = [
+    TransactionConfirmationStatus.Processed,
+    TransactionConfirmationStatus.Confirmed,
+    TransactionConfirmationStatus.Finalized,
+]
+
+
+def status_reached(status: TransactionStatus, commitment: Commitment) -> bool:
+    if status.confirmation_status is None:
+        # nodes don't report the level of rooted transactions
+        return True
+    return CONFIRMATION_STATUS_ORDER.index(status.confirmation_status) >= COMMITMENT_ORDER.index(commitment)
+
+
+class SignatureConfirmer:
+    """Confirms many Solana transactions with one getSignatureStatuses request per poll instead of a loop per signature
+
+    Futures resolve with the TransactionStatus once the transaction reaches the requested commitment or fails,
+    the error is in status.err. The poll thread runs only while there are pending signatures.
+    """
+
+    def __init__(self, solana_client, poll_interval: float = 0.4, max_batch_size: int = MAX_SIGNATURES_PER_REQUEST):
+        self.solana_client = solana_client
+        self.poll_interval = poll_interval
+        self.max_batch_size = min(max_batch_size, MAX_SIGNATURES_PER_REQUEST)
+        # signature -> waiters as (future, commitment, time when the confirmer stops looking for it)
+        self._pending: tp.Dict[Signature, tp.List[tp.Tuple[Future, Commitment, float]]] = {}
+        self._lock = threading.Lock()
+        self._thread: tp.Optional[threading.Thread] = None
+
+    def watch(
+        self, signature: Signature, commitment: Commitment = Confirmed, timeout: float = 60
+    ) -> "Future[TransactionStatus]":
+        future = Future()
+        with self._lock:
+            self._pending.setdefault(signature, []).append((future, commitment, time.monotonic() + timeout))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="signature-confirmer", daemon=True)
+                self._thread.start()
+        return future
+
+    def wait(self, signature: Signature, commitment: Commitment = Confirmed, timeout: float = 60) -> TransactionStatus:
+        future = self.watch(signature, commitment, timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise self._timeout_error(signature, timeout)
+
+    def wait_all(
+        self, signatures: tp.Sequence[Signature], commitment: Commitment = Confirmed, timeout: float = 60
+    ) -> tp.List[tp.Optional[TransactionStatus]]:
+        """Statuses in the order of signatures, None for transactions which haven't landed in timeout"""
+        deadline = time.monotonic() + timeout
+        futures = [self.watch(signature, commitment, timeout) for signature in signatures]
+        statuses = []
+        for future in futures:
+            try:
+                statuses.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+            except (FutureTimeoutError, TimeoutError):
+                statuses.append(None)
+        return statuses
+
+    @staticmethod
+    def _timeout_error(signature: Signature, timeout: tp.Optional[float] = None) -> TimeoutError:
+        waited = f"{timeout} seconds" if timeout is not None else "the timeout"
+        return TimeoutError(f"Transaction {signature} is not confirmed after {waited}")
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+            time.sleep(self.poll_interval)
+            try:
+                self._check_pending()
+            except Exception as e:
+                LOG.warning(f"Can't get signature statuses: {e}")
+
+    def _check_pending(self) -> None:
+        with self._lock:
+            signatures = list(self._pending)
+        resolved = []
+        for start in range(0, len(signatures), self.max_batch_size):
+            chunk = signatures[start: start + self.max_batch_size]
+            statuses = self.solana_client.get_signature_statuses(chunk).value
+            with self._lock:
+                for signature, status in zip(chunk, statuses):
+                    if status is None or signature not in self._pending:
+                        continue
+                    waiting = []
+                    for future, commitment, expires_at in self._pending.pop(signature):
+                        if status.err is not None or status_reached(status, commitment):
+                            resolved.append((future, status))
+                        else:
+                            waiting.append((future, commitment, expires_at))
+                    if waiting:
+                        self._pending[signature] = waiting
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for signature in list(self._pending):
+                waiting = []
+                for future, commitment, expires_at in self._pending.pop(signature):
+                    if expires_at < now:
+                        expired.append((future, signature))
+                    else:
+                        waiting.append((future, commitment, expires_at))
+                if waiting:
+                    self._pending[signature] = waiting
+        for future, status in resolved:
+            if not future.done():
+                future.set_result(status)
+        for future, signature in expired:
+            if not future.done():
+                future.set_exception(self._timeout_error(signature))
+
+
+_confirmers: tp.Dict[str, SignatureConfirmer] = {}
+_confirmers_lock = threading.Lock()
+
+
+def get_signature_confirmer(solana_client) -> SignatureConfirmer:
+    """One confirmer per endpoint, so all tests and locust users of a process share its polls"""
+    with _confirmers_lock:
+        confirmer = _confirmers.get(solana_client.endpoint)
+        if confirmer is None:
+            confirmer = _confirmers[solana_client.endpoint] = SignatureConfirmer(solana_client)
+        return confirmer
@@ -1,10 +1,10 @@
+import copy
 import json
 import time
 import typing as tp
 import uuid
 
 import allure
-import requests
 import pathlib
 
 import solana.rpc.api
@@ -14,18 +14,25 @@ from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solana.rpc.commitment import Commitment, Finalized, Confirmed
 from solana.rpc.types import TxOpts
+from solders.rpc.responses import SendTransactionResp
 from solders.rpc.responses import GetTransactionResp
+from solders.hash import Hash
 from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+from solders.transaction_status import TransactionStatus
 from solders.system_program import TransferParams, transfer, create_account, CreateAccountParams
 from solana.transaction import Transaction
 from solders.rpc.errors import InternalErrorMessage
 from solders.rpc.responses import RequestAirdropResp
 from spl.token.instructions import get_associated_token_address, create_associated_token_account
 
-from utils.helpers import wait_condition
+from utils.blockhash_provider import get_blockhash_provider
+from utils.helpers import wait_condition, observed_slot_time, step_exponential, retry_on_blockhash_not_found
+from utils.http_session import get_shared_session
+from utils.pda import find_program_address
+from utils.signature_confirmer import MAX_SIGNATURES_PER_REQUEST, get_signature_confirmer
 from spl.token.constants import TOKEN_PROGRAM_ID
 
-
 class SolanaClient(solana.rpc.api.Client):
     def __init__(self, endpoint, account_seed_version="\3"):
         super().__init__(endpoint=endpoint, timeout=120)
@@ -50,7 +57,14 @@ class SolanaClient(solana.rpc.api.Client):
                 break
         else:
             raise AssertionError(f"Can't get airdrop from solana: {airdrop_resp}")
-        wait_condition(lambda: self.get_balance(pubkey).value >= lamports, timeout_sec=30)
+        wait_condition(
+            lambda: self.get_balance(pubkey).value >= lamports,
+            timeout_sec=30,
+            delay=lambda: observed_slot_time(self),
+            step_function=step_exponential(),
+            max_delay=3,
+            jitter=0.2,
+        )
         return airdrop_resp
 
     def send_sol(self, from_: Keypair, to: Pubkey, amount_lamports: int):
@@ -72,7 +86,7 @@ class SolanaClient(solana.rpc.api.Client):
         if token_address.startswith("0x"):
             token_address = token_address[2:]
         neon_contract_addressbytes = bytes.fromhex(token_address)
-        return Pubkey.find_program_address(
+        return find_program_address(
             [
                 self.account_seed_version,
                 b"AUTH",
@@ -100,19 +114,75 @@ class SolanaClient(solana.rpc.api.Client):
 
         return token_mint, assoc_addr
 
+    @property
+    def blockhash_provider(self):
+        return get_blockhash_provider(self)
+
+    def send_transaction(
+            self,
+            txn: tp.Union[VersionedTransaction, Transaction],
+            *signers: Keypair,
+            opts: tp.Optional[TxOpts] = None,
+            recent_blockhash: tp.Optional[Hash] = None,
+    ) -> SendTransactionResp:
+        """Legacy transactions without a blockhash get the shared cached one
+
+        The caller's transaction is not changed, a copy is signed and resent with a fresh blockhash on Blockhash not
+        found. Transactions with a blockhash set by the caller are sent as is, e.g. deliberate resends.
+        """
+        if isinstance(txn, VersionedTransaction) or recent_blockhash is not None:
+            return super().send_transaction(txn, *signers, opts=opts, recent_blockhash=recent_blockhash)
+        if txn.recent_blockhash not in (None, Hash.default()):
+            return super().send_transaction(txn, *signers, opts=opts, recent_blockhash=txn.recent_blockhash)
+        provider = self.blockhash_provider
+        opts = opts or TxOpts(preflight_commitment=self._commitment)
+
+        def send() -> SendTransactionResp:
+            signed = copy.copy(txn)
+            # the setter builds a new message for the copy, so signing it leaves the caller's transaction alone
+            signed.recent_blockhash = provider.get()
+            signed.sign(*signers)
+            return self.send_raw_transaction(signed.serialize(), opts=opts)
+
+        return retry_on_blockhash_not_found(send, on_retry=provider.refresh)
+
+    @property
+    def confirmer(self):
+        return get_signature_confirmer(self)
+
     def send_tx_and_check_status_ok(self, tx, *signers):
-        opts = TxOpts(skip_preflight=True, skip_confirmation=False)
+        opts = TxOpts(skip_preflight=True, skip_confirmation=True)
         sig = self.send_transaction(tx, *signers, opts=opts).value
-        statuses_resp = self.confirm_transaction(sig, commitment=Confirmed)
-        sig_status = json.loads(statuses_resp.to_json())
-        assert sig_status["result"]["value"][0]["status"] == {"Ok": None}, f"error:{sig_status}"
+        sig_status = self.confirmer.wait(sig, commitment=Confirmed)
+        assert sig_status.err is None, f"error:{sig_status}"
 
     def send_tx(self, trx: Transaction, *signers: Keypair, wait_status=Confirmed):
         result = self.send_transaction(trx, *signers,
                                        opts=TxOpts(skip_confirmation=True, preflight_commitment=wait_status))
-        self.confirm_transaction(result.value, commitment=Confirmed)
+        self.confirmer.wait(result.value, commitment=Confirmed)
         return self.get_transaction(result.value, commitment=Confirmed)
 
+    def get_signature_statuses_batch(
+            self, signatures: tp.Sequence[Signature]
+    ) -> tp.List[tp.Optional[TransactionStatus]]:
+        statuses = []
+        for start in range(0, len(signatures), MAX_SIGNATURES_PER_REQUEST):
+            chunk = list(signatures[start: start + MAX_SIGNATURES_PER_REQUEST])
+            statuses.extend(self.get_signature_statuses(chunk).value)
+        return statuses
+
+    def wait_signatures(
+            self,
+            signatures: tp.Sequence[Signature],
+            commitment: Commitment = Confirmed,
+            timeout: float = 60,
+    ) -> tp.List[tp.Optional[TransactionStatus]]:
+        """Wait until every signature reaches commitment or fails, see SignatureConfirmer.wait_all
+
+        Returns statuses in the order of signatures, None for transactions which haven't landed in timeout.
+        """
+        return self.confirmer.wait_all(signatures, commitment=commitment, timeout=timeout)
+
     def create_associate_token_acc(self, payer: Keypair, owner: Keypair, token_mint: Pubkey):
         ata: Pubkey = get_associated_token_address(owner.pubkey(), token_mint)
         if not self.account_exists(ata):
@@ -124,7 +194,11 @@ class SolanaClient(solana.rpc.api.Client):
         try:
             wait_condition(
                 lambda: self.get_transaction(Signature.from_string(tx), max_supported_transaction_version=0)
-                != GetTransactionResp(None)
+                != GetTransactionResp(None),
+                delay=lambda: observed_slot_time(self),
+                step_function=step_exponential(1.5),
+                max_delay=2,
+                jitter=0.2,
             )
         except TimeoutError:
             return None
@@ -152,7 +226,7 @@ class SolanaClient(solana.rpc.api.Client):
             "method": "getAccountInfo",
             "params": [f"{pubkey}", {"encoding": "base64", "commitment": "confirmed"}],
         }
-        response = requests.post(self.endpoint, json=body, headers={"Content-Type": "application/json"})
+        response = get_shared_session().post(self.endpoint, json=body, headers={"Content-Type": "application/json"})
         return response.json()
 
     def mint_spl_to(self, mint: Pubkey, dest: Keypair, amount: int, authority: tp.Optional[Keypair] = None):
@@ -202,6 +276,10 @@ class SolanaClient(solana.rpc.api.Client):
                 commitment=commitment,
                 max_supported_transaction_version=max_supported_transaction_version,
             ),
-            check_success=lambda trx: trx.value is not None
+            check_success=lambda trx: trx.value is not None,
+            delay=lambda: observed_slot_time(self),
+            step_function=step_exponential(1.5),
+            max_delay=2,
+            jitter=0.2,
         )
         return tx
@@ -0,0 +1,133 @@
+"""Parser of Solana transaction log messages
+
+iter_events turns log lines into typed events one by one and works for log sets of any size,
+parse_logs collects them together with compute units and the Neon exit status in one pass.
+"""
+import base64
+import binascii
+import dataclasses
+import enum
+import re
+import typing as tp
+
+
+INVOKE_RE = re.compile(r"^Program (\S+) invoke \[(\d+)\]$")
+CONSUMED_RE = re.compile(r"^Program (\S+) consumed (\d+) of (\d+) compute units$")
+SUCCESS_RE = re.compile(r"^Program (\S+) success$")
+FAILED_RE = re.compile(r"^Program (\S+) failed: (.*)$")
+EXIT_STATUS_RE = re.compile(r"exit_status=(0x[0-9a-fA-F]+)")
+
+LOG_PREFIX = "Program log: "
+DATA_PREFIX = "Program data: "
+RETURN_PREFIX = "Program return: "
+
+
+class EventKind(enum.Enum):
+    INVOKE = "invoke"
+    CONSUMED = "consumed"
+    SUCCESS = "success"
+    FAILED = "failed"
+    LOG = "log"
+    DATA = "data"
+    RETURN = "return"
+    OTHER = "other"
+
+
+@dataclasses.dataclass
+class LogEvent:
+    kind: EventKind
+    raw: str
+    # depth of the program invocation which produced the line, 0 for lines outside of any invocation
+    depth: int
+    program: tp.Optional[str] = None
+    text: tp.Optional[str] = None
+    data: tp.Tuple[bytes, ...] = ()
+    consumed: tp.Optional[int] = None
+    limit: tp.Optional[int] = None
+
+
+@dataclasses.dataclass
+class ParsedLogs:
+    events: tp.List[LogEvent]
+    # compute units of top level instructions
+    compute_units: int = 0
+    # compute units of the last "consumed" line, the last top level instruction of the transaction
+    last_consumed: tp.Optional[int] = None
+    exit_status: tp.Optional[str] = None
+    exit_error: bool = False
+    failed: tp.Optional[str] = None
+
+    @property
+    def neon_events(self) -> tp.List[tp.Tuple[bytes, ...]]:
+        return [event.data for event in self.events if event.kind is EventKind.DATA]
+
+
+def _decode(items: tp.List[str]) -> tp.Tuple[bytes, ...]:
+    decoded = []
+    for item in items:
+        try:
+            decoded.append(base64.b64decode(item))
+        except binascii.Error:
+            decoded.append(item.encode())
+    return tuple(decoded)
+
+
+def iter_events(log_messages: tp.Iterable[str]) -> tp.Iterator[LogEvent]:
+    programs: tp.List[str] = []
+    for line in log_messages:
+        depth = len(programs)
+        program = programs[-1] if programs else None
+        if line.startswith(LOG_PREFIX):
+            yield LogEvent(EventKind.LOG, line, depth, program, text=line[len(LOG_PREFIX):])
+        elif line.startswith(DATA_PREFIX):
+            yield LogEvent(EventKind.DATA, line, depth, program, data=_decode(line[len(DATA_PREFIX):].split(" ")))
+        elif line.startswith(RETURN_PREFIX):
+            _, _, encoded = line[len(RETURN_PREFIX):].partition(" ")
+            yield LogEvent(EventKind.RETURN, line, depth, program, data=_decode([encoded]))
+        elif match := CONSUMED_RE.match(line):
+            yield LogEvent(
+                EventKind.CONSUMED, line, depth, match[1], consumed=int(match[2]), limit=int(match[3])
+            )
+        elif match := INVOKE_RE.match(line):
+            programs.append(match[1])
+            yield LogEvent(EventKind.INVOKE, line, int(match[2]), match[1])
+        elif match := SUCCESS_RE.match(line):
+            yield LogEvent(EventKind.SUCCESS, line, depth, match[1])
+            if programs:
+                programs.pop()
+        elif match := FAILED_RE.match(line):
+            yield LogEvent(EventKind.FAILED, line, depth, match[1], text=match[2])
+            if programs:
+                programs.pop()
+        else:
+            yield LogEvent(EventKind.OTHER, line, depth, program, text=line)
+
+
+def parse_logs(log_messages: tp.Iterable[str]) -> ParsedLogs:
+    parsed = ParsedLogs(events=[])
+    for event in iter_events(log_messages):
+        parsed.events.append(event)
+        if event.kind is EventKind.CONSUMED:
+            parsed.last_consumed = event.consumed
+            if event.depth == 1:
+                parsed.compute_units += event.consumed
+        elif event.kind is EventKind.LOG or event.kind is EventKind.OTHER:
+            if "exit_status" in event.text:
+                match = EXIT_STATUS_RE.search(event.text)
+                parsed.exit_status = match[1] if match else event.text
+            if "ExitError" in event.text:
+                parsed.exit_error = True
+        elif event.kind is EventKind.FAILED and parsed.failed is None:
+            parsed.failed = event.text
+    return parsed
+
+
+def logs_text(log_messages: tp.Iterable[str]) -> str:
+    """Log lines joined into one string with Program data items decoded, for substring checks in tests"""
+    parts = []
+    for event in iter_events(log_messages):
+        if event.kind is EventKind.DATA:
+            parts.append("Program data: " + "".join(" " + str(item) for item in event.data))
+        else:
+            parts.append(event.raw)
+    return "".join(part + " " for part in parts)
@@ -0,0 +1,138 @@
+import dataclasses
+import logging
+import math
+import typing as tp
+from concurrent.futures import ThreadPoolExecutor
+
+from solana.rpc.commitment import Confirmed
+from solana.rpc.types import TxOpts
+from solana.transaction import Transaction
+from solders.keypair import Keypair
+from solders.rpc.responses import GetTransactionResp
+from solders.signature import Signature
+
+from utils.solana_logs import parse_logs
+
+
+LOG = logging.getLogger(__name__)
+
+# step transactions pre-sent at once, they all lock the holder account and run one after another anyway
+MAX_SPECULATION = 8
+# error of a step sent after the one which finished the transaction, the holder is finalized already
+ALREADY_FINALIZED = "already finalized"
+
+
+@dataclasses.dataclass
+class Step:
+    index: int
+    steps: int
+    signature: Signature
+    compute_units: tp.Optional[int] = None
+    err: tp.Any = None
+
+
+def plan_speculation(total_steps: tp.Optional[int], steps_per_iteration: int) -> int:
+    """Step transactions to pre-send for a transaction which takes total_steps EVM steps in emulation
+
+    One more iteration is added for the step which finalizes the holder.
+    """
+    if total_steps is None:
+        return 1
+    return min(math.ceil(total_steps / steps_per_iteration) + 1, MAX_SPECULATION)
+
+
+class StepExecutor:
+    """Executes an iterative Neon transaction, several step transactions with distinct indices are sent at once
+
+    make_step builds the step transaction for (index, steps). The executor stops at the round where one of the
+    transactions logs exit_status, speculative steps skip preflight and their "already finalized" errors are ignored.
+    Compute units of every sent step are kept in compute_units after run.
+    """
+
+    def __init__(
+        self,
+        solana_client,
+        make_step: tp.Callable[[int, int], Transaction],
+        signers: tp.Sequence[Keypair],
+        steps_per_iteration: int,
+        speculation: int = 1,
+        error_prefix: str = "Transaction failed with error",
+        timeout: float = 60,
+    ):
+        self.solana_client = solana_client
+        self.make_step = make_step
+        self.signers = signers
+        self.steps_per_iteration = steps_per_iteration
+        self.speculation = max(1, speculation)
+        self.error_prefix = error_prefix
+        self.timeout = timeout
+        self.steps: tp.List[Step] = []
+
+    @property
+    def compute_units(self) -> tp.List[tp.Optional[int]]:
+        return [step.compute_units for step in self.steps]
+
+    def run(self) -> GetTransactionResp:
+        index = 0
+        with ThreadPoolExecutor(max_workers=self.speculation, thread_name_prefix="step-executor") as executor:
+            while True:
+                round_steps = [self._send(index + offset, speculative=offset > 0) for offset in range(self.speculation)]
+                index += self.speculation
+                statuses = self.solana_client.confirmer.wait_all(
+                    [step.signature for step in round_steps], commitment=Confirmed, timeout=self.timeout
+                )
+                if any(status is None for status in statuses):
+                    raise TimeoutError(f"Step transactions are not confirmed in {self.timeout} seconds")
+                receipts = list(
+                    executor.map(
+                        lambda step: self.solana_client.get_transaction(step.signature, commitment=Confirmed),
+                        round_steps,
+                    )
+                )
+                result = self._check_round(round_steps, receipts)
+                if result is not None:
+                    LOG.info(f"Iterative transaction took {len(self.steps)} steps, compute units {self.compute_units}")
+                    return result
+
+    def _send(self, index: int, speculative: bool = False) -> Step:
+        trx = self.make_step(index, self.steps_per_iteration)
+        # preflight of a speculative step runs before the previous steps are executed, it would fail the send
+        opts = TxOpts(skip_confirmation=True, skip_preflight=speculative, preflight_commitment=Confirmed)
+        signature = self.solana_client.send_transaction(trx, *self.signers, opts=opts).value
+        step = Step(index=index, steps=self.steps_per_iteration, signature=signature)
+        self.steps.append(step)
+        return step
+
+    def _check_round(
+        self, round_steps: tp.List[Step], receipts: tp.List[GetTransactionResp]
+    ) -> tp.Optional[GetTransactionResp]:
+        finished = None
+        already_finalized = None
+        failed = None
+        for step, receipt in zip(round_steps, receipts):
+            meta = receipt.value.transaction.meta
+            step.compute_units = meta.compute_units_consumed
+            step.err = meta.err
+            if meta.err:
+                if is_already_finalized(receipt):
+                    already_finalized = already_finalized or receipt
+                else:
+                    failed = failed or receipt
+                continue
+            logs = parse_logs(meta.log_messages)
+            if logs.exit_error:
+                raise AssertionError(f"EVM Return error in logs: {receipt}")
+            if logs.exit_status is not None:
+                finished = receipt
+        if finished is not None:
+            return finished
+        if already_finalized is not None and failed is None:
+            return already_finalized
+        if failed is not None:
+            raise AssertionError(f"{self.error_prefix}: {failed.value.transaction.meta.err}")
+        return None
+
+
+def is_already_finalized(receipt: GetTransactionResp) -> bool:
+    meta = receipt.value.transaction.meta
+    return any(ALREADY_FINALIZED in message.lower() for message in meta.log_messages or [])
@@ -46,7 +46,7 @@ class StorageContract:
             estimate_gas=False,
         )
         del tx_obj["chainId"]
-        del tx_obj["nonce"]
+        tx_obj.pop("nonce", None)
 
         if request_type == "blockNumber":
             request_value = hex(receipt[request_type])
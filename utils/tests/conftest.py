@@ -0,0 +1,12 @@
+"""Unit tests of utils don't need a stand, so the stand-bound autouse session fixtures are replaced"""
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def allure_environment():
+    yield {}
+
+
+@pytest.fixture(scope="session", autouse=True)
+def faucet():
+    return None
@@ -0,0 +1,65 @@
+import pathlib
+
+import allure
+import pytest
+
+from utils.compilation_cache import CompilationCache
+
+
+@pytest.fixture
+def sources(tmp_path: pathlib.Path, monkeypatch) -> pathlib.Path:
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "Base.sol").write_text("pragma solidity ^0.8.0;\ncontract Base {}\n")
+    (tmp_path / "lib" / "Other.sol").write_text("pragma solidity ^0.8.0;\ncontract Other {}\n")
+    contract = tmp_path / "Main.sol"
+    contract.write_text('pragma solidity ^0.8.0;\nimport "./lib/Base.sol";\ncontract Main is Base {}\n')
+    return contract
+
+
+@pytest.fixture
+def cache(tmp_path: pathlib.Path) -> CompilationCache:
+    return CompilationCache(cache_dir=tmp_path / "cache")
+
+
+@allure.feature("Compilation cache")
+class TestCompilationCacheKey:
+    def test_key_is_stable(self, cache, sources):
+        assert cache.make_key(sources, "0.8.12") == cache.make_key(sources, "0.8.12")
+
+    def test_key_changes_with_imported_source(self, cache, sources):
+        key = cache.make_key(sources, "0.8.12")
+        (sources.parent / "lib" / "Base.sol").write_text("pragma solidity ^0.8.0;\ncontract Base { uint x; }\n")
+        assert cache.make_key(sources, "0.8.12") != key
+
+    def test_key_changes_with_imports(self, cache, sources):
+        key = cache.make_key(sources, "0.8.12")
+        sources.write_text('pragma solidity ^0.8.0;\nimport "./lib/Other.sol";\ncontract Main is Base {}\n')
+        assert cache.make_key(sources, "0.8.12") != key
+
+    def test_key_changes_with_remappings(self, cache, sources):
+        sources.write_text('pragma solidity ^0.8.0;\nimport "@lib/Base.sol";\ncontract Main is Base {}\n')
+        key = cache.make_key(sources, "0.8.12", import_remapping={"@lib/": "lib/"})
+        assert cache.make_key(sources, "0.8.12", import_remapping={"@lib/": "./lib/"}) != key
+        # a remapping to another file changes the key through the resolved source hash too
+        other_key = cache.make_key(sources, "0.8.12", import_remapping={"@lib/Base.sol": "lib/Other.sol"})
+        assert other_key != key
+
+    def test_key_changes_with_version(self, cache, sources):
+        assert cache.make_key(sources, "0.8.12") != cache.make_key(sources, "0.8.13")
+
+
+@allure.feature("Compilation cache")
+class TestCompilationCacheStorage:
+    def test_cache_dir_is_created_on_first_write(self, cache):
+        assert not cache.cache_dir.exists()
+        assert cache.get("key") is None
+        assert not cache.cache_dir.exists()
+        cache.set("key", {"Main.sol:Main": {"abi": [], "bin": ""}})
+        assert cache.get("key") == {"Main.sol:Main": {"abi": [], "bin": ""}}
+
+    def test_compilations_share_one_lock_file(self, cache):
+        for key in ("first", "second"):
+            with cache.lock_key(key):
+                pass
+        assert sorted(path.name for path in cache.cache_dir.glob("*.lock")) == [".compile.lock"]
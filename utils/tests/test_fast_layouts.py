@@ -0,0 +1,50 @@
+import os
+
+import allure
+import pytest
+
+from utils import fast_layouts, layouts
+
+LAYOUTS = [
+    "HOLDER_ACCOUNT_INFO_LAYOUT",
+    "FINALIZED_STORAGE_ACCOUNT_INFO_LAYOUT",
+    "CONTRACT_ACCOUNT_LAYOUT",
+    "BALANCE_ACCOUNT_LAYOUT",
+    "OPERATOR_BALANCE_ACCOUNT_LAYOUT",
+    "STORAGE_CELL_LAYOUT",
+    "COUNTER_ACCOUNT_LAYOUT",
+]
+
+
+@allure.feature("Fast layouts")
+@pytest.mark.parametrize("name", LAYOUTS)
+class TestFastLayouts:
+    def test_size_matches_construct(self, name):
+        assert getattr(fast_layouts, name).sizeof() == getattr(layouts, name).sizeof()
+
+    def test_parse_matches_construct(self, name):
+        slow, fast = getattr(layouts, name), getattr(fast_layouts, name)
+        for _ in range(20):
+            # account data is usually longer than the layout, both decoders read its head
+            data = os.urandom(fast.sizeof() + 16)
+            expected = slow.parse(data)
+            record = fast.parse(data)
+            assert record.as_dict() == {field: expected[field] for field in fast.fields}
+
+    def test_bulk_decoders_match_parse(self, name):
+        fast = getattr(fast_layouts, name)
+        buffers = [os.urandom(fast.sizeof()) for _ in range(10)]
+        expected = [fast.parse(data) for data in buffers]
+        assert fast.parse_many(buffers) == expected
+        assert fast.iter_unpack(b"".join(buffers)) == expected
+
+    def test_parse_array_matches_construct(self, name):
+        slow, fast = getattr(layouts, name), getattr(fast_layouts, name)
+        buffers = [os.urandom(fast.sizeof()) for _ in range(10)]
+        array = fast.parse_array(b"".join(buffers))
+        for row, data in zip(array, buffers):
+            expected = slow.parse(data)
+            for field in fast.fields:
+                value = row[field]
+                value = bytes(value) if isinstance(expected[field], bytes) else int(value)
+                assert value == expected[field], f"{field} differs"
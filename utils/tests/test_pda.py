@@ -0,0 +1,48 @@
+import allure
+import pytest
+from solders.pubkey import Pubkey
+
+from utils import pda
+
+PROGRAM_ID = Pubkey.from_string("eeLSJgWzzxrqKv1UxtRVVH8FX3qCQWUs9QuAjJpETGU")
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    pda._cache.clear()
+    yield
+    pda._cache.clear()
+
+
+@allure.feature("PDA cache")
+class TestFindProgramAddress:
+    def test_matches_solders_derivation(self):
+        seeds = [b"\x03", bytes.fromhex("11" * 20)]
+        assert pda.find_program_address(seeds, PROGRAM_ID) == Pubkey.find_program_address(seeds, PROGRAM_ID)
+
+    def test_second_call_is_served_from_cache(self, monkeypatch):
+        seeds = [b"\x03", b"ContractData", bytes.fromhex("22" * 20)]
+        expected = pda.find_program_address(seeds, PROGRAM_ID)
+        # the derivation would fail without solders
+        monkeypatch.setattr(pda, "Pubkey", None)
+        assert pda.find_program_address(seeds, PROGRAM_ID) == expected
+
+    def test_cache_is_bounded(self, monkeypatch):
+        monkeypatch.setattr(pda, "PDA_CACHE_SIZE", 2)
+        for index in range(3):
+            pda.find_program_address([bytes([index])], PROGRAM_ID)
+        assert pda.cache_info() == {"size": 2, "max_size": 2}
+        assert pda._key([b"\x00"], PROGRAM_ID) not in pda._cache
+
+
+@allure.feature("PDA cache")
+class TestFindProgramAddresses:
+    @pytest.mark.parametrize("processes", [1, 2])
+    def test_bulk_derivation_keeps_order(self, monkeypatch, processes):
+        monkeypatch.setattr(pda, "BULK_PROCESS_POOL_THRESHOLD", 2)
+        seeds_list = [[b"\x03", index.to_bytes(20, "big")] for index in range(6)]
+        # one address is cached already and one is asked twice
+        pda.find_program_address(seeds_list[2], PROGRAM_ID)
+        seeds_list.append(seeds_list[4])
+        expected = [Pubkey.find_program_address(seeds, PROGRAM_ID) for seeds in seeds_list]
+        assert pda.find_program_addresses(seeds_list, PROGRAM_ID, processes=processes) == expected
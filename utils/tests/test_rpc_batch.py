@@ -0,0 +1,65 @@
+import typing as tp
+
+import allure
+import pytest
+
+from utils.apiclient import send_rpc_batch
+
+
+class FakeResponse:
+    def __init__(self, body: tp.Any):
+        self.body = body
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self) -> tp.Any:
+        return self.body
+
+
+class FakeSession:
+    """Answers every request of a batch with its method and params, responses come in reversed order"""
+
+    def __init__(self, drop_ids: tp.Sequence[int] = (), reject: bool = False):
+        self.batches: tp.List[tp.List[dict]] = []
+        self.drop_ids = drop_ids
+        self.reject = reject
+
+    def post(self, url: str, json: tp.List[dict], timeout: float) -> FakeResponse:
+        self.batches.append(json)
+        if self.reject:
+            return FakeResponse({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "too big"}})
+        responses = [
+            {"jsonrpc": "2.0", "id": item["id"], "result": [item["method"], item.get("params")]}
+            for item in json
+            if item["id"] not in self.drop_ids
+        ]
+        return FakeResponse(list(reversed(responses)))
+
+
+@allure.feature("JSON-RPC batch")
+class TestSendRpcBatch:
+    def test_responses_follow_calls_order(self):
+        calls = [("eth_getBalance", ["0x1", "latest"]), ("eth_chainId", None), ("eth_getCode", "0x2")]
+        responses = send_rpc_batch(FakeSession(), "http://proxy", calls)
+        assert [response["result"] for response in responses] == [
+            ["eth_getBalance", ["0x1", "latest"]],
+            ["eth_chainId", None],
+            ["eth_getCode", ["0x2"]],
+        ]
+
+    def test_calls_are_split_by_max_batch_size(self):
+        session = FakeSession()
+        calls = [("eth_getBalance", [hex(i), "latest"]) for i in range(5)]
+        responses = send_rpc_batch(session, "http://proxy", calls, max_batch_size=2)
+        assert [len(batch) for batch in session.batches] == [2, 2, 1]
+        assert [response["result"][1][0] for response in responses] == [hex(i) for i in range(5)]
+
+    def test_missing_response_fails(self):
+        calls = [("eth_blockNumber", None), ("eth_chainId", None)]
+        with pytest.raises(AssertionError, match="No response for eth_chainId"):
+            send_rpc_batch(FakeSession(drop_ids=[1]), "http://proxy", calls)
+
+    def test_rejected_batch_fails(self):
+        with pytest.raises(AssertionError, match="Batch request failed"):
+            send_rpc_batch(FakeSession(reject=True), "http://proxy", [("eth_chainId", None)])
@@ -0,0 +1,49 @@
+import allure
+
+from utils.solana_logs import EventKind, parse_logs
+
+EVM_LOADER = "eeLSJgWzzxrqKv1UxtRVVH8FX3qCQWUs9QuAjJpETGU"
+COMPUTE_BUDGET = "ComputeBudget111111111111111111111111111111"
+SYSTEM_PROGRAM = "11111111111111111111111111111111"
+
+EXIT_STATUS_LOGS = [
+    f"Program {COMPUTE_BUDGET} invoke [1]",
+    f"Program {COMPUTE_BUDGET} success",
+    f"Program {EVM_LOADER} invoke [1]",
+    "Program log: Instruction: Execute Transaction from Account",
+    f"Program {SYSTEM_PROGRAM} invoke [2]",
+    f"Program {SYSTEM_PROGRAM} success",
+    "Program data: SElU AQI=",
+    "Program log: exit_status=0x12",
+    f"Program {EVM_LOADER} consumed 25000 of 1399850 compute units",
+    f"Program return: {EVM_LOADER} Eg==",
+    f"Program {EVM_LOADER} success",
+]
+
+EXIT_ERROR_LOGS = [
+    f"Program {EVM_LOADER} invoke [1]",
+    "Program log: Instruction: Execute Transaction from Instruction",
+    "Program log: ExitError(OutOfGas)",
+    f"Program {EVM_LOADER} consumed 1400000 of 1400000 compute units",
+    f"Program {EVM_LOADER} failed: exceeded CUs meter at BPF instruction",
+]
+
+
+@allure.feature("Solana logs")
+class TestParseLogs:
+    def test_exit_status(self):
+        parsed = parse_logs(EXIT_STATUS_LOGS)
+        assert parsed.exit_status == "0x12"
+        assert not parsed.exit_error
+        assert parsed.failed is None
+        assert parsed.compute_units == 25000
+        assert parsed.last_consumed == 25000
+        assert parsed.neon_events == [(b"HIT", b"\x01\x02")]
+        assert [event.depth for event in parsed.events if event.kind is EventKind.INVOKE] == [1, 1, 2]
+
+    def test_exit_error(self):
+        parsed = parse_logs(EXIT_ERROR_LOGS)
+        assert parsed.exit_error
+        assert parsed.exit_status is None
+        assert parsed.failed == "exceeded CUs meter at BPF instruction"
+        assert parsed.compute_units == 1400000
@@ -0,0 +1,59 @@
+import allure
+import pytest
+
+from utils.tx_corpus import iter_corpus, user_slot, worker_share, write_corpus
+
+
+def spread(users: int, workers: int, order: list) -> list:
+    """Users of each worker when the master gives users to workers in turn, in the given order of workers"""
+    counts = [0] * workers
+    for user in range(users):
+        counts[order[user % workers]] += 1
+    return counts
+
+
+@allure.feature("Transactions corpus")
+class TestUserSlots:
+    @pytest.mark.parametrize("users, workers", [(1, 1), (10, 1), (10, 3), (12, 4), (3, 8), (100, 7)])
+    @pytest.mark.parametrize("reverse", [False, True], ids=["in_order", "reversed"])
+    def test_slots_are_disjoint(self, users, workers, reverse):
+        order = list(range(workers))[::-1] if reverse else list(range(workers))
+        counts = spread(users, workers, order)
+        assert max(counts) <= worker_share(users, workers)
+        slots = [
+            user_slot(number, index, users, workers) for index in range(workers) for number in range(counts[index])
+        ]
+        assert len({slot for slot, _ in slots}) == users
+        assert all(slot < total for slot, total in slots)
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_senders_are_split_between_users(self, workers):
+        users, senders = 9, 20
+        counts = spread(users, workers, list(range(workers)))
+        owners = {}
+        for index in range(workers):
+            for number in range(counts[index]):
+                slot, slots = user_slot(number, index, users, workers)
+                for sender in range(slot, senders, slots):
+                    assert sender not in owners
+                    owners[sender] = (index, number)
+        assert sorted(owners) == list(range(senders))
+
+    def test_extra_user_of_a_worker_fails(self):
+        with pytest.raises(AssertionError):
+            user_slot(worker_share(10, 3), 0, 10, 3)
+
+    def test_worker_index_out_of_workers_fails(self):
+        with pytest.raises(AssertionError):
+            user_slot(0, 3, 10, 3)
+
+
+@allure.feature("Transactions corpus")
+class TestCorpusFile:
+    def test_records_of_senders(self, tmp_path):
+        path = tmp_path / "corpus.bin"
+        records = [(0, b"\x01"), (1, b"\x02\x03"), (0, b"\x04"), (2, b"")]
+        assert write_corpus(path, {"senders": ["a", "b", "c"]}, records) == len(records)
+        assert [(sender, bytes(raw)) for sender, raw in iter_corpus(path)] == records
+        assert [bytes(raw) for _, raw in iter_corpus(path, {0})] == [b"\x01", b"\x04"]
+        assert list(iter_corpus(path, set())) == []
@@ -0,0 +1,149 @@
+"""Corpus of pre-signed transactions for load tests
+
+File layout: MAGIC, u32 length of the JSON header, the header, then records of
+u16 sender index, u32 length and the raw signed transaction. Records go nonce by nonce over all senders,
+so any prefix of the file keeps nonces of every sender sequential.
+"""
+import json
+import mmap
+import pathlib
+import struct
+import typing as tp
+
+import web3
+from eth_account.signers.local import LocalAccount
+
+from utils.erc20 import ERC20
+from utils.funding import create_funded_accounts
+from utils.web3client import NeonChainWeb3Client
+
+
+MAGIC = b"NEONTXC1"
+HEADER_LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<HI")
+GAS_MULTIPLIER = 1.2
+
+Record = tp.Tuple[int, bytes]
+
+
+def worker_share(users: int, workers: int) -> int:
+    """Max users the locust master gives to one worker, it spreads users between workers evenly"""
+    return max(-(-users // workers), 1)
+
+
+def user_slot(user_number: int, worker_index: int, users: int, workers: int) -> tp.Tuple[int, int]:
+    """Slot of the user_number-th user of a worker and the number of slots, a slot gets senders index % slots
+
+    Every worker has worker_share slots, the n-th user of worker i takes slot n * workers + i. Slots of all users
+    are distinct however the master spreads users, slots of workers which get fewer users stay empty.
+    """
+    if worker_index >= workers:
+        raise AssertionError(f"Worker index {worker_index} is out of {workers} workers, slots would overlap")
+    share = worker_share(users, workers)
+    if user_number >= share:
+        raise AssertionError(f"Worker {worker_index} got more than its {share} of {users} users, slots would overlap")
+    return user_number * workers + worker_index, share * workers
+
+
+def write_corpus(path: tp.Union[str, pathlib.Path], header: tp.Dict[str, tp.Any], records: tp.Iterable[Record]) -> int:
+    count = 0
+    encoded_header = json.dumps(header).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC + HEADER_LENGTH.pack(len(encoded_header)) + encoded_header)
+        for sender, raw in records:
+            f.write(RECORD_HEADER.pack(sender, len(raw)))
+            f.write(raw)
+            count += 1
+    return count
+
+
+def read_header(path: tp.Union[str, pathlib.Path]) -> tp.Dict[str, tp.Any]:
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a transactions corpus")
+        (length,) = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+        return json.loads(f.read(length))
+
+
+def iter_corpus(
+    path: tp.Union[str, pathlib.Path], senders: tp.Optional[tp.Container[int]] = None
+) -> tp.Iterator[Record]:
+    """Records of the corpus read through mmap, only of the given sender indexes if senders is set"""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a transactions corpus")
+        (length,) = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+        offset = len(MAGIC) + HEADER_LENGTH.size + length
+        while offset < len(data):
+            sender, size = RECORD_HEADER.unpack_from(data, offset)
+            offset += RECORD_HEADER.size
+            if senders is None or sender in senders:
+                yield sender, data[offset: offset + size]
+            offset += size
+
+
+def _sign_rounds(
+    web3_client: NeonChainWeb3Client,
+    senders: tp.Sequence[LocalAccount],
+    per_account: int,
+    make_transaction: tp.Callable[[int], tp.Dict[str, tp.Any]],
+) -> tp.Iterator[Record]:
+    nonces = web3_client.get_nonces([account.address for account in senders])
+    for round_ in range(per_account):
+        for index, account in enumerate(senders):
+            transaction = make_transaction(index)
+            transaction["nonce"] = nonces[index] + round_
+            yield index, web3_client.eth.account.sign_transaction(transaction, account.key).rawTransaction
+
+
+def generate_corpus(
+    web3_client: NeonChainWeb3Client,
+    faucet,
+    path: tp.Union[str, pathlib.Path],
+    accounts: int = 20,
+    per_account: int = 1000,
+    kind: str = "neon",
+    balance: float = 1000,
+) -> int:
+    """Create and fund sender accounts and store per_account signed transfers of each of them
+
+    kind is "neon" for NEON transfers or "erc20" for transfers of an ERC20 token deployed for the corpus.
+    Returns the number of stored transactions.
+    """
+    senders = create_funded_accounts(web3_client, accounts, balance, faucet=faucet)
+    recipients = [web3_client.create_account().address for _ in range(10)]
+    chain_id = web3_client.chain_id
+    gas_price = web3_client.gas_price()
+    header = {
+        "proxy_url": web3_client._proxy_url,  # noqa
+        "chain_id": chain_id,
+        "kind": kind,
+        "senders": [account.address for account in senders],
+    }
+
+    if kind == "neon":
+        value = web3.Web3.to_wei(0.0001, "ether")
+        gas = web3_client.eth.estimate_gas({"from": senders[0].address, "to": recipients[0], "value": value})
+        template = {"chainId": chain_id, "value": value, "gas": int(gas * GAS_MULTIPLIER), "gasPrice": gas_price}
+
+        def make_transaction(index: int) -> tp.Dict[str, tp.Any]:
+            return dict(template, to=recipients[index % len(recipients)])
+
+    elif kind == "erc20":
+        erc20 = ERC20(web3_client, faucet, owner=senders[0], amount=per_account * accounts * 10)
+        for account in senders[1:]:
+            erc20.transfer(erc20.owner, account, per_account)
+        header["contract"] = erc20.contract.address
+        call = erc20.contract.functions.transfer(recipients[0], 1)
+        gas = int(call.estimate_gas({"from": senders[0].address}) * GAS_MULTIPLIER)
+        data = call._encode_transaction_data()  # noqa
+        template = {"chainId": chain_id, "to": erc20.contract.address, "value": 0, "gas": gas, "gasPrice": gas_price}
+
+        def make_transaction(index: int) -> tp.Dict[str, tp.Any]:
+            # the calldata is encoded once, all transfers send 1 token to the same recipient
+            return dict(template, data=data)
+
+    else:
+        raise ValueError(f"Unknown corpus kind {kind}")
+
+    return write_corpus(path, header, _sign_rounds(web3_client, senders, per_account, make_transaction))
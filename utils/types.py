@@ -45,6 +45,7 @@ TestGroup = tp.Literal[
     "ui",
     "evm",
     "compiler_compatibility",
+    "utils",
 ]
 
 
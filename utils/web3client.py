@@ -3,22 +3,30 @@ import pathlib
 import sys
 import time
 import typing as tp
+from concurrent.futures import Future, ThreadPoolExecutor
 from decimal import Decimal
 
 import logging
 import allure
 import eth_account.signers.local
-import requests
+from eth_account.datastructures import SignedTransaction
 import web3
 import web3.types
 from eth_abi import abi
 from eth_typing import BlockIdentifier
+from hexbytes import HexBytes
 from web3.exceptions import TransactionNotFound
 
 from utils.types import TransactionType
 from utils import helpers
+from utils.apiclient import RpcCall, send_rpc_batch
+from utils.compilation_cache import compilation_cache, contracts_bundle
 from utils.consts import InputTestConstants, Unit
+from utils.fee_oracle import FeeOracle
 from utils.helpers import decode_function_signature, case_snake_to_camel
+from utils.http_session import get_shared_session
+from utils.nonce_manager import NonceManager, account_file_lock, is_resync_error
+from utils.receipt_watcher import ReceiptWatcher
 
 
 LOG = logging.getLogger(__name__)
@@ -30,11 +38,37 @@ class Web3Client:
         proxy_url: str,
         tracer_url: tp.Optional[tp.Any] = None,
         session: tp.Optional[tp.Any] = None,
+        nonce_manager: tp.Optional[NonceManager] = None,
+        fee_cache_ttl: tp.Optional[float] = None,
+        fee_refresh_interval: tp.Optional[float] = None,
+        fee_oracle: tp.Optional[FeeOracle] = None,
     ):
         self._proxy_url = proxy_url
         self._tracer_url = tracer_url
         self._chain_id = None
-        self._web3 = web3.Web3(web3.HTTPProvider(proxy_url, session=session, request_kwargs={"timeout": 30}))
+        self._nonce_manager = nonce_manager
+        self._session = session or get_shared_session()
+        self._web3 = web3.Web3(web3.HTTPProvider(proxy_url, session=self._session, request_kwargs={"timeout": 30}))
+        self._receipt_watcher: tp.Optional[ReceiptWatcher] = None
+        # an oracle of another client is shared, e.g. by all load test users of a process
+        self._fee_oracle: tp.Optional[FeeOracle] = fee_oracle
+        if fee_oracle is None and fee_cache_ttl is not None:
+            self._fee_oracle = self.create_fee_oracle(fee_cache_ttl, fee_refresh_interval)
+
+    def create_fee_oracle(self, ttl: float, refresh_interval: tp.Optional[float] = None) -> FeeOracle:
+        """Fee cache which fetches values with this client, it can be passed to other clients as fee_oracle"""
+        fee_oracle = FeeOracle(
+            {
+                "gas_price": lambda: self._web3.eth.gas_price,
+                "base_fee_per_gas": self._fetch_base_fee_per_gas,
+                "max_priority_fee": lambda: self._web3.eth._max_priority_fee(),  # noqa
+                "token_usd_gas_price": self._fetch_token_usd_gas_price,
+            },
+            ttl=ttl,
+            refresh_interval=refresh_interval,
+        )
+        fee_oracle.start()
+        return fee_oracle
 
     def __getattr__(self, item):
         return getattr(self._web3, item)
@@ -56,7 +90,7 @@ class Web3Client:
 
     @allure.step("Get evm info")
     def _get_evm_info(self, method):
-        resp = requests.post(
+        resp = self._session.post(
             self._proxy_url,
             json={"jsonrpc": "2.0", "method": method, "params": [], "id": 1},
         )
@@ -67,6 +101,52 @@ class Web3Client:
         except json.JSONDecodeError as e:
             raise RuntimeError(f"Failed to decode EVM info: {resp.text}")
 
+    @allure.step("Send batch request")
+    def batch_rpc(self, calls: tp.Sequence[RpcCall], max_batch_size: int = 100) -> tp.List[tp.Dict]:
+        """Send (method, params) calls as JSON-RPC batches, response bodies are in the order of calls"""
+        return send_rpc_batch(self._session, self._proxy_url, calls, max_batch_size=max_batch_size)
+
+    def _batch_results(self, calls: tp.Sequence[RpcCall]) -> tp.List[tp.Any]:
+        results = []
+        for (method, params), response in zip(calls, self.batch_rpc(calls)):
+            if "error" in response:
+                raise ValueError(f"{method}{params} failed: {response['error']}")
+            results.append(response["result"])
+        return results
+
+    @allure.step("Get balances")
+    def get_balances(
+        self,
+        addresses: tp.Sequence[tp.Union[str, eth_account.signers.local.LocalAccount]],
+        unit=Unit.WEI,
+    ) -> tp.List[tp.Union[int, Decimal]]:
+        addresses = [address if isinstance(address, str) else address.address for address in addresses]
+        results = self._batch_results([("eth_getBalance", [address, "pending"]) for address in addresses])
+        balances = [int(result, 16) for result in results]
+        if unit != Unit.WEI:
+            balances = [self._web3.from_wei(balance, unit.value) for balance in balances]
+        return balances
+
+    @allure.step("Get nonces")
+    def get_nonces(
+        self,
+        addresses: tp.Sequence[tp.Union[str, eth_account.signers.local.LocalAccount]],
+        block: BlockIdentifier = "pending",
+    ) -> tp.List[int]:
+        addresses = [address if isinstance(address, str) else address.address for address in addresses]
+        results = self._batch_results([("eth_getTransactionCount", [address, block]) for address in addresses])
+        return [int(result, 16) for result in results]
+
+    @allure.step("Get transaction receipts")
+    def get_transaction_receipts(self, tx_hashes: tp.Sequence[tp.Union[str, bytes]]) -> tp.List[tp.Optional[dict]]:
+        """Raw receipts as returned by the proxy, None for not yet executed transactions"""
+        tx_hashes = [tx_hash if isinstance(tx_hash, str) else HexBytes(tx_hash).hex() for tx_hash in tx_hashes]
+        return self._batch_results([("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes])
+
+    @allure.step("Get logs")
+    def get_logs_batch(self, filters: tp.Sequence[dict]) -> tp.List[tp.List[dict]]:
+        return self._batch_results([("eth_getLogs", [log_filter]) for log_filter in filters])
+
     @allure.step("Get proxy version")
     def get_proxy_version(self):
         return self._get_evm_info("neon_proxyVersion")
@@ -85,7 +165,7 @@ class Web3Client:
 
     @allure.step("Get neon emulate")
     def get_neon_emulate(self, params):
-        return requests.post(
+        return self._session.post(
             self._proxy_url,
             json={
                 "jsonrpc": "2.0",
@@ -97,7 +177,7 @@ class Web3Client:
 
     @allure.step("Get solana trx by neon")
     def get_solana_trx_by_neon(self, tr_id: str):
-        return requests.post(
+        return self._session.post(
             self._proxy_url,
             json={
                 "jsonrpc": "2.0",
@@ -116,15 +196,29 @@ class Web3Client:
 
     @allure.step("Get gas price")
     def gas_price(self):
+        if self._fee_oracle is not None:
+            return self._fee_oracle.get("gas_price")
         gas = self._web3.eth.gas_price
         return gas
 
     @allure.step("Get base fee per gas")
     def base_fee_per_gas(self) -> int:
+        if self._fee_oracle is not None:
+            return self._fee_oracle.get("base_fee_per_gas")
         latest_block: web3.types.BlockData = self._web3.eth.get_block(block_identifier="latest")  # noqa
         base_fee = latest_block.baseFeePerGas  # noqa
         return base_fee
 
+    def _fetch_base_fee_per_gas(self) -> int:
+        # eth_feeHistory returns only fees, not the whole latest block
+        return self._web3.eth.fee_history(1, "latest")["baseFeePerGas"][0]
+
+    @allure.step("Get max priority fee per gas")
+    def max_priority_fee(self) -> int:
+        if self._fee_oracle is not None:
+            return self._fee_oracle.get("max_priority_fee")
+        return self._web3.eth._max_priority_fee()  # noqa
+
     @allure.step("Create account")
     def create_account(self) -> eth_account.signers.local.LocalAccount:
         return self._web3.eth.account.create()
@@ -146,9 +240,56 @@ class Web3Client:
         address = address if isinstance(address, str) else address.address
         return self._web3.eth.get_transaction_count(address, block)
 
+    def allocate_nonce(self, address: tp.Union[eth_account.signers.local.LocalAccount, str]) -> int:
+        """Next nonce from the nonce manager if the client has it, otherwise the pending nonce from the chain"""
+        if self._nonce_manager is None:
+            return self.get_nonce(address)
+        address = address if isinstance(address, str) else address.address
+        return self._nonce_manager.allocate(self, address)
+
+    def _send_raw_transaction(
+        self,
+        address: tp.Union[eth_account.signers.local.LocalAccount, str],
+        raw_transaction: bytes,
+    ) -> HexBytes:
+        try:
+            return self._web3.eth.send_raw_transaction(raw_transaction)
+        except Exception as e:
+            # only a rejected nonce or price means the nonce is not used, after a timeout or another error
+            # the proxy may have accepted the transaction and a re-synced nonce would be sent twice
+            if self._nonce_manager is not None and is_resync_error(e):
+                self._nonce_manager.reset(self, address if isinstance(address, str) else address.address)
+            raise
+
+    def _sign_and_send(self, account: eth_account.signers.local.LocalAccount, transaction: tp.Dict) -> HexBytes:
+        """Sign and send a transaction, a missing nonce is allocated right before sending"""
+        if "nonce" not in transaction:
+            transaction = {**transaction, "nonce": self.allocate_nonce(account)}
+        signed_tx = self._web3.eth.account.sign_transaction(transaction, account.key)
+        return self._send_raw_transaction(account, signed_tx.rawTransaction)
+
+    @allure.step("Send raw transaction")
+    def send_raw_transaction(
+        self,
+        account: tp.Union[eth_account.signers.local.LocalAccount, str],
+        raw_transaction: bytes,
+    ) -> HexBytes:
+        """Send a signed transaction of account without waiting for the receipt"""
+        return self._send_raw_transaction(account, raw_transaction)
+
+    def enable_receipt_watcher(self, watcher: tp.Optional[ReceiptWatcher] = None, **kwargs) -> ReceiptWatcher:
+        """Wait for receipts through a shared watcher which checks all pending transactions together"""
+        self._receipt_watcher = watcher or ReceiptWatcher(self, **kwargs)
+        return self._receipt_watcher
+
+    def _wait_receipt(self, tx_hash, timeout=120) -> web3.types.TxReceipt:
+        if self._receipt_watcher is not None:
+            return self._receipt_watcher.wait(tx_hash, timeout=timeout)
+        return self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+
     @allure.step("Wait for transaction receipt")
     def wait_for_transaction_receipt(self, tx_hash, timeout=120):
-        return self._web3.eth.wait_for_transaction_receipt(tx_hash, timeout=timeout)
+        return self._wait_receipt(tx_hash, timeout=timeout)
 
     @allure.step("Get contract")
     def deploy_contract(
@@ -169,7 +310,6 @@ class Web3Client:
         tx_params = {
             "from": from_.address,
             "gas": gas,
-            "nonce": self.get_nonce(from_),
             "value": value,
             "chainId": self.chain_id,
         }
@@ -181,9 +321,8 @@ class Web3Client:
         if transaction["gas"] == 0:
             transaction["gas"] = self._web3.eth.estimate_gas(transaction)
 
-        signed_tx = self._web3.eth.account.sign_transaction(transaction, from_.key)
-        tx = self._web3.eth.send_raw_transaction(signed_tx.rawTransaction)
-        return self._web3.eth.wait_for_transaction_receipt(tx)
+        tx = self._sign_and_send(from_, transaction)
+        return self._wait_receipt(tx)
 
     @allure.step("Make raw tx")
     def make_raw_tx(
@@ -214,10 +353,6 @@ class Web3Client:
                 transaction["value"] = amount
             if data:
                 transaction["data"] = data
-            if nonce is None:
-                transaction["nonce"] = self.get_nonce(from_)
-            else:
-                transaction["nonce"] = nonce
 
             if chain_id is None:
                 transaction["chainId"] = self.chain_id
@@ -231,6 +366,12 @@ class Web3Client:
                 gas = self._web3.eth.estimate_gas(transaction)
             if gas:
                 transaction["gas"] = gas
+            if nonce is not None:
+                transaction["nonce"] = nonce
+            elif self._nonce_manager is None:
+                transaction["nonce"] = self.get_nonce(from_)
+            # with the nonce manager the nonce is allocated when the transaction is sent, so a transaction which
+            # is built and never sent doesn't leave a gap in allocated nonces
         else:
             if gas_price is not None and gas is not None:
                 max_priority_fee_per_gas, max_fee_per_gas = self.gas_price_to_eip1559_params(gas_price=gas_price)
@@ -259,9 +400,64 @@ class Web3Client:
         gas_multiplier: tp.Optional[float] = None,  # fix for some event depends transactions
         timeout: int = 120,
     ) -> web3.types.TxReceipt:
-        instruction_tx = self._web3.eth.account.sign_transaction(transaction, account.key)
-        signature = self._web3.eth.send_raw_transaction(instruction_tx.rawTransaction)
-        return self._web3.eth.wait_for_transaction_receipt(signature, timeout=timeout)
+        signature = self._sign_and_send(account, transaction)
+        return self._wait_receipt(signature, timeout=timeout)
+
+    @allure.step("Send transactions pipelined")
+    def send_transactions_pipelined(
+        self,
+        account: eth_account.signers.local.LocalAccount,
+        transactions: tp.Iterable[tp.Union[tp.Dict, bytes, SignedTransaction]],
+        max_in_flight: int = 16,
+        timeout: int = 120,
+    ) -> tp.List["Future[web3.types.TxReceipt]"]:
+        """Send transactions back-to-back without waiting for receipts of previous ones
+
+        Unsigned transactions get sequential nonces from the nonce manager of the client or tracked locally
+        (one eth_getTransactionCount per call),
+        missing chainId, gasPrice and gas are filled in; signed transactions are sent as is.
+        Sending never waits for receipts, they are waited by max_in_flight threads through _wait_receipt.
+        Returns when all receipts are received, the futures keep receipts in the order of transactions;
+        sending stops on the first failed send, then the last future keeps its error.
+        """
+        nonce = None
+        gas_price = None
+        futures = []
+
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="receipt-waiter") as executor:
+            for transaction in transactions:
+                try:
+                    if isinstance(transaction, SignedTransaction):
+                        raw_tx = transaction.rawTransaction
+                    elif isinstance(transaction, (bytes, bytearray)):
+                        raw_tx = bytes(transaction)
+                    else:
+                        transaction = dict(transaction)
+                        transaction.setdefault("from", account.address)
+                        transaction.setdefault("chainId", self.chain_id)
+                        if "maxFeePerGas" not in transaction and "gasPrice" not in transaction:
+                            gas_price = gas_price or self.gas_price()
+                            transaction["gasPrice"] = gas_price
+                        if not transaction.get("gas"):
+                            transaction["gas"] = self._web3.eth.estimate_gas(transaction)
+                        # allocated after the estimation, so a failed one doesn't leave a gap in nonces
+                        if self._nonce_manager is not None:
+                            nonce = self.allocate_nonce(account)
+                        elif nonce is None:
+                            nonce = self.get_nonce(account)
+                        transaction["nonce"] = nonce
+                        raw_tx = self._web3.eth.account.sign_transaction(transaction, account.key).rawTransaction
+                        nonce += 1
+                    tx_hash = self._send_raw_transaction(account, raw_tx)
+                except Exception as e:
+                    failed = Future()
+                    failed.set_exception(e)
+                    futures.append(failed)
+                    LOG.error(f"Pipelined send stopped after {len(futures) - 1} transactions: {e}")
+                    break
+                # the same hook as single transactions, so the receipt watcher and tracers see them
+                futures.append(executor.submit(self._wait_receipt, tx_hash, timeout=timeout))
+        return futures
 
     @allure.step("Create raw transaction EIP-1559")
     def make_raw_tx_eip_1559(
@@ -311,7 +507,7 @@ class Web3Client:
             "chain_id": lambda: self.chain_id,
             "nonce": lambda: self.get_nonce(from_),
             "gas": lambda: self._web3.eth.estimate_gas(params),
-            "max_priority_fee_per_gas": self._web3.eth._max_priority_fee,  # noqa
+            "max_priority_fee_per_gas": self.max_priority_fee,
             "max_fee_per_gas": lambda: int((base_fee_per_gas * base_fee_multiplier) + params["maxPriorityFeePerGas"]),
         }
 
@@ -319,6 +515,9 @@ class Web3Client:
         for param_name, param_value in kwargs.items():
             if param_value is None:
                 continue
+            if param_name == "nonce" and param_value == "auto" and self._nonce_manager is not None:
+                # allocated when the transaction is sent, see _sign_and_send
+                continue
 
             if param_value == "auto":
                 # get the auto value
@@ -371,12 +570,14 @@ class Web3Client:
 
     @allure.step("Compile by vyper and deploy")
     def compile_by_vyper_and_deploy(self, account, contract_name, constructor_args=None):
-        import vyper  # Import here because vyper prevent override decimal precision (uses in economy tests)
+        contract_path = pathlib.Path.cwd() / "contracts" / "vyper" / f"{contract_name}.vy"
+        contract_interface = contracts_bundle.get_vyper(compilation_cache.make_vyper_key(contract_path))
+        if contract_interface is None:
+            import vyper  # Import here because vyper prevent override decimal precision (uses in economy tests)
 
-        contract_path = pathlib.Path.cwd() / "contracts" / "vyper"
-        with open(contract_path / f"{contract_name}.vy") as f:
-            contract_code = f.read()
-            contract_interface = vyper.compile_code(contract_code, output_formats=["abi", "bytecode"])
+            with open(contract_path) as f:
+                contract_code = f.read()
+                contract_interface = vyper.compile_code(contract_code, output_formats=["abi", "bytecode"])
 
         contract_deploy_tx = self.deploy_contract(
             account,
@@ -462,9 +663,8 @@ class Web3Client:
                 max_priority_fee_per_gas=max_priority_fee_per_gas,
                 max_fee_per_gas=max_fee_per_gas,
             )
-        signed_tx = self.eth.account.sign_transaction(transaction, from_.key)
-        tx = self.eth.send_raw_transaction(signed_tx.rawTransaction)
-        return self.eth.wait_for_transaction_receipt(tx)
+        tx = self._sign_and_send(from_, transaction)
+        return self._wait_receipt(tx)
 
     @allure.step("Send tokens under EIP-1559")
     def send_tokens_eip_1559(
@@ -517,9 +717,8 @@ class Web3Client:
 
         if transaction["value"] > 0:
             transaction["value"] = web3.Web3.to_wei(transaction["value"], Unit.WEI)
-            signed_tx = self.eth.account.sign_transaction(transaction, from_.key)
-            tx = self.eth.send_raw_transaction(signed_tx.rawTransaction)
-            self.eth.wait_for_transaction_receipt(tx)
+            tx = self._sign_and_send(from_, transaction)
+            self._wait_receipt(tx)
         else:
             LOG.info(f"Not enough funds to send all neons from {from_.address} account")
 
@@ -539,7 +738,12 @@ class Web3Client:
         return gas_used_in_tx
 
     def get_token_usd_gas_price(self):
-        resp = requests.post(
+        if self._fee_oracle is not None:
+            return self._fee_oracle.get("token_usd_gas_price")
+        return self._fetch_token_usd_gas_price()
+
+    def _fetch_token_usd_gas_price(self):
+        resp = self._session.post(
             self._proxy_url,
             json={
                 "jsonrpc": "2.0",
@@ -567,8 +771,14 @@ class NeonChainWeb3Client(Web3Client):
         proxy_url: str,
         tracer_url: tp.Optional[tp.Any] = None,
         session: tp.Optional[tp.Any] = None,
+        nonce_manager: tp.Optional[NonceManager] = None,
+        fee_cache_ttl: tp.Optional[float] = None,
+        fee_refresh_interval: tp.Optional[float] = None,
+        fee_oracle: tp.Optional[FeeOracle] = None,
     ):
-        super().__init__(proxy_url, tracer_url, session)
+        super().__init__(
+            proxy_url, tracer_url, session, nonce_manager, fee_cache_ttl, fee_refresh_interval, fee_oracle
+        )
 
     @allure.step("Create account with balance")
     def create_account_with_balance(
@@ -580,7 +790,9 @@ class NeonChainWeb3Client(Web3Client):
         """Creates a new account with balance"""
         account = self.create_account()
         if bank_account is not None:
-            self.send_neon(bank_account, account, amount)
+            # the bank account is shared by xdist workers
+            with account_file_lock(bank_account.address):
+                self.send_neon(bank_account, account, amount)
         else:
             faucet.request_neon(account.address, amount=amount)
         return account